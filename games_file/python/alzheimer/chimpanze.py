@@ -1,27 +1,61 @@
+import os
 import random
+import sys
 import time
 
 import cv2
 import mediapipe as mp
 
+# The games' shared code is in games_file/python, next to this directory.
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..')))
+
+from cv2_utils import (FramePool, HandService, HitGrid,  # noqa: E402
+                       display_from_env, metrics_from_env, open_source,
+                       source_from_env)
+
+
 width, height = 1280, 720
 
 num_numbers = 10
 display_time = 5
 
-positions = [(random.randint(50, width - 50), random.randint(50, height - 50))
-             for _ in range(num_numbers)]
-numbers = list(range(1, num_numbers + 1))
-random.shuffle(numbers)
+correct_order = list(range(1, num_numbers + 1))
+
+
+def new_round():
+    # Also started again by the 'r' key.
+    global positions, numbers, hits, selected_numbers, game_over, start_time
+    positions = [(random.randint(50, width - 50),
+                  random.randint(50, height - 50))
+                 for _ in range(num_numbers)]
+    numbers = list(range(1, num_numbers + 1))
+    random.shuffle(numbers)
+
+    # Pinch targets: the 40x40 square around each number.
+    hits = HitGrid(width, height)
+    for i, (x, y) in enumerate(positions):
+        hits.add(numbers[i], bounds=(x - 20, y - 20, x + 20, y + 20))
+
+    selected_numbers = []
+    game_over = False
+    start_time = time.time()
 
-selected_numbers = []
-correct_order = sorted(numbers)
-game_over = False
 
 mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(min_detection_confidence=0.5,
-                       min_tracking_confidence=0.5)
 mp_drawing = mp.solutions.drawing_utils
+try:
+    # hand_tracking.py is running: it already owns the camera and the
+    # detector.
+    service = HandService()
+except (OSError, ValueError):
+    # Not running, or crashed and left its files behind.
+    service = None
+if service is not None:
+    hands = service
+else:
+    hands = mp_hands.Hands(min_detection_confidence=0.5,
+                           min_tracking_confidence=0.5)
 
 
 def draw_numbers(img, positions, numbers, show):
@@ -33,8 +67,16 @@ def draw_numbers(img, positions, numbers, show):
             cv2.circle(img, pos, 20, (255, 255, 255), -1)
 
 
+def select_at(x, y):
+    global game_over
+    number = hits.hit(x, y)
+    if number is not None and number not in selected_numbers:
+        selected_numbers.append(number)
+        if len(selected_numbers) == num_numbers:
+            game_over = True
+
+
 def check_pinch(hand_landmarks, img):
-    global selected_numbers, game_over
     index_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
     thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
 
@@ -42,31 +84,10 @@ def check_pinch(hand_landmarks, img):
     tx, ty = int(thumb_tip.x * width), int(thumb_tip.y * height)
 
     if abs(ix - tx) < 20 and abs(iy - ty) < 20:
-        for i, pos in enumerate(positions):
-            if abs(ix - pos[0]) < 20 and abs(iy - pos[1]) < 20:
-                if numbers[i] not in selected_numbers:
-                    selected_numbers.append(numbers[i])
-                    if len(selected_numbers) == num_numbers:
-                        game_over = True
-
-
-start_time = time.time()
+        select_at(ix, iy)
 
-cap = cv2.VideoCapture(0)
-
-while cap.isOpened():
-    success, image = cap.read()
-    if not success:
-        break
-
-    image = cv2.flip(image, 1)
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    results = hands.process(image_rgb)
-
-    img = image.copy()
-
-    elapsed_time = time.time() - start_time
 
+def draw_screen(img, elapsed_time):
     if elapsed_time < display_time:
         draw_numbers(img, positions, numbers, show=True)
     else:
@@ -85,17 +106,61 @@ while cap.isOpened():
                 cv2.putText(img, "Game over!", (width // 2 - 100, height // 2),
                             cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 3)
 
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            mp_drawing.draw_landmarks(img, hand_landmarks,
-                                      mp_hands.HAND_CONNECTIONS)
-            check_pinch(hand_landmarks, img)
 
-    cv2.imshow('Game', img)
+new_round()
+
+cap = service if service is not None else open_source(source_from_env())
+pool = FramePool()
+metrics = metrics_from_env()
+display = display_from_env('Game')
 
-    if cv2.waitKey(1) & 0xFF == 27:
+while cap.isOpened():
+    metrics.frame()
+    with metrics.span('capture'):
+        if service is not None:
+            # Already mirrored, and the service does the detection.
+            success, image = cap.read()
+            image_rgb = image
+        else:
+            success, image = pool.read(cap)
+            if success:
+                image, image_rgb = pool.convert(image)
+    if not success:
         break
 
+    with metrics.span('detect'):
+        results = hands.process(image_rgb)
+
+    with metrics.span('render'):
+        # The frame buffer is overwritten by a later capture anyway.
+        img = image
+        draw_screen(img, time.time() - start_time)
+
+    with metrics.span('gesture'):
+        if results.multi_hand_landmarks:
+            for hand_landmarks in results.multi_hand_landmarks:
+                mp_drawing.draw_landmarks(img, hand_landmarks,
+                                          mp_hands.HAND_CONNECTIONS)
+                if service is None:
+                    check_pinch(hand_landmarks, img)
+        if service is not None:
+            # The pinches recognized by hand_tracking.py.
+            for event in service.events:
+                if event.name == 'pinch' and event.type == 'start':
+                    select_at(*service.scale(event.x, event.y,
+                                             (width, height)))
+
+    metrics.draw_overlay(img)
+    with metrics.span('show'):
+        display.show(img)
+
+        key = display.poll()
+        if key == 27:
+            break
+        if key == ord('r'):
+            new_round()
+
+metrics.close()
 hands.close()
 cap.release()
-cv2.destroyAllWindows()
+display.close()
@@ -1,301 +1,27 @@
 #!/usr/bin/env python3
+import os
 import random
 import sys
 
-import cv2
 import mediapipe as mp
+import numpy as np
 
+# The games' shared code is in games_file/python, next to this directory
+# (the launcher's games/memo runs this file).
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..')))
 
-def draw_rounded_rectangle(img, top_left, bottom_right, color, thickness,
-                           radius):
-    x1, y1 = top_left
-    x2, y2 = bottom_right
-
-    # Ensure radius is not greater than half of the width or height
-    radius = min(radius, (x2 - x1) // 2, (y2 - y1) // 2)
-
-    # Draw four rounded corners
-    cv2.ellipse(img, (x1 + radius, y1 + radius), (radius, radius), 180, 0, 90,
-                color, thickness)
-    cv2.ellipse(img, (x2 - radius, y1 + radius), (radius, radius), 270, 0, 90,
-                color, thickness)
-    cv2.ellipse(img, (x1 + radius, y2 - radius), (radius, radius), 90, 0, 90,
-                color, thickness)
-    cv2.ellipse(img, (x2 - radius, y2 - radius), (radius, radius), 0, 0, 90,
-                color, thickness)
-
-    # Draw four lines
-    cv2.line(img, (x1 + radius, y1), (x2 - radius, y1), color, thickness)
-    cv2.line(img, (x1 + radius, y2), (x2 - radius, y2), color, thickness)
-    cv2.line(img, (x1, y1 + radius), (x1, y2 - radius), color, thickness)
-    cv2.line(img, (x2, y1 + radius), (x2, y2 - radius), color, thickness)
-
-
-def draw_filled_rounded_rectangle(img, top_left, bottom_right, color, radius):
-    x1, y1 = top_left
-    x2, y2 = bottom_right
-
-    # Ensure radius is not greater than half of the width or height
-    radius = min(radius, (x2 - x1) // 2, (y2 - y1) // 2)
-
-    # Draw four rounded corners
-    cv2.ellipse(img, (x1 + radius, y1 + radius), (radius, radius), 180, 0, 90,
-                color, -1)
-    cv2.ellipse(img, (x2 - radius, y1 + radius), (radius, radius), 270, 0, 90,
-                color, -1)
-    cv2.ellipse(img, (x1 + radius, y2 - radius), (radius, radius), 90, 0, 90,
-                color, -1)
-    cv2.ellipse(img, (x2 - radius, y2 - radius), (radius, radius), 0, 0, 90,
-                color, -1)
-
-    # Draw four rectangles
-    cv2.rectangle(img, (x1 + radius, y1), (x2 - radius, y2), color, -1)
-    cv2.rectangle(img, (x1, y1 + radius), (x1 + radius, y2 - radius), color,
-                  -1)
-    cv2.rectangle(img, (x2 - radius, y1 + radius), (x2, y2 - radius), color,
-                  -1)
-    cv2.rectangle(img, (x1 + radius, y1), (x2 - radius, y1 + radius), color,
-                  -1)
-    cv2.rectangle(img, (x1 + radius, y2 - radius), (x2 - radius, y2), color,
-                  -1)
-
-
-def draw_rounded_shadow_rectangle(img, top_left, bottom_right, color, radius,
-                                  shadow_offset,
-                                  shadow_color, highlight_color):
-    shadow_top_left = (
-        top_left[0] + shadow_offset, top_left[1] + shadow_offset)
-    shadow_bottom_right = (
-        bottom_right[0] + shadow_offset, bottom_right[1] + shadow_offset)
-
-    highlight_top_left = (
-        top_left[0] - shadow_offset, top_left[1] - shadow_offset)
-    highlight_bottom_right = (
-        bottom_right[0] - shadow_offset, bottom_right[1] - shadow_offset)
-
-    # Draw the shadow
-    draw_filled_rounded_rectangle(img, shadow_top_left, shadow_bottom_right,
-                                  shadow_color, radius)
-
-    draw_filled_rounded_rectangle(img, highlight_top_left,
-                                  highlight_bottom_right,
-                                  highlight_color, radius)
-
-    # Draw the main filled rounded rectangle on top of the shadow
-    draw_filled_rounded_rectangle(img, top_left, bottom_right, color, radius)
-
-
-def draw_line(lm, i, w, h):
-    start = (int(lm.landmark[i].x * w),
-             int(lm.landmark[i].y * h))
-    end = (int(lm.landmark[i + 1].x * w),
-           int(lm.landmark[i + 1].y * h))
-    return start, end
-
-
-class Camera:
-    def __init__(self):
-        self.camera = cv2.VideoCapture(0)
-        self.resolution = (800, 600)
-        self.framerate = 24
-        self.camera.set(3, 940)
-
-    def __del__(self):
-        self.close()
+from cv2_utils import (Camera, Hands, HandService, HitGrid,  # noqa: E402
+                       Label, Rectangle, Scene, display_from_env,
+                       metrics_from_env, source_from_env)
 
-    def close(self):
-        self.camera.release()
-
-    def get_rgb_img(self):
-        ret, frame = self.camera.read()
-        frame = cv2.flip(frame, 1)
-        return frame
-
-
-class Rectangle:
-    def __init__(self, x, y, width, height, color=(200, 200, 200),
-                 thickness=-1,
-                 text="",
-                 corner_radius=24):
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = height
-        self.color = color
-        self.thickness = thickness
-        self.text = text
-        self.text_color = (0, 0, 0)
-        self.highlight_color = (255, 255, 255)
-        self.shadow_color = (96, 96, 96)
-        self.corner_radius = corner_radius
-        self.is_clicked = False
-
-    def draw(self, img):
-        if self.thickness == -1:
-            draw_rounded_shadow_rectangle(img, (self.x, self.y),
-                                          (self.x + self.width,
-                                           self.y + self.height),
-                                          self.color, self.corner_radius, 5,
-                                          self.shadow_color,
-                                          self.highlight_color)
-        else:
-            draw_rounded_rectangle(img, (self.x, self.y),
-                                   (self.x + self.width, self.y + self.height),
-                                   radius=self.corner_radius, color=self.color,
-                                   thickness=self.thickness)
-        if self.text != "" and self.is_clicked:
-            cv2.putText(img, self.text,
-                        (
-                            self.x + self.width // 2 - len(self.text) * 10,
-                            self.y + self.height // 2),
-                        cv2.FONT_HERSHEY_COMPLEX, 1, self.text_color, 3)
-
-
-class Hands:
-    def __init__(self, result, img):
-        self.landmarks = result.multi_hand_landmarks
-        self.is_pinching = False
-        self.img = img
-        self.pinch_pos = (0, 0)
-        self.pinch_length = 50
-        self.pinch_length_open = 100
-
-    def draw(self, thickness=20, color=(0, 255, 0)):
-        lm = self.landmarks[0]
-        h, w, c = self.img.shape
-        for i in range(21):
-            if i < 4:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-            if i == 4:
-                start = (int(lm.landmark[1].x * w),
-                         int(lm.landmark[1].y * h))
-                end = (int(lm.landmark[5].x * w),
-                       int(lm.landmark[5].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-            if 4 < i < 8:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-
-            if i == 8:
-                start = (int(lm.landmark[5].x * w),
-                         int(lm.landmark[5].y * h))
-                end = (int(lm.landmark[9].x * w),
-                       int(lm.landmark[9].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-
-            if 8 < i < 12:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-
-            if i == 12:
-                start = (int(lm.landmark[9].x * w),
-                         int(lm.landmark[9].y * h))
-                end = (int(lm.landmark[13].x * w),
-                       int(lm.landmark[13].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-
-            if 12 < i < 16:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-
-            if i == 16:
-                start = (int(lm.landmark[13].x * w),
-                         int(lm.landmark[13].y * h))
-                end = (int(lm.landmark[17].x * w),
-                       int(lm.landmark[17].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-
-            if 16 < i < 20:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-            if i == 17:
-                start = (int(lm.landmark[17].x * w),
-                         int(lm.landmark[17].y * h))
-                end = (int(lm.landmark[0].x * w),
-                       int(lm.landmark[0].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-
-    def draw_on_img(self, img, thickness=20, color=(0, 255, 0)):
-        lm = self.landmarks[0]
-        h, w, c = self.img.shape
-        for i in range(21):
-            if i < 4:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-            if i == 4:
-                start = (int(lm.landmark[1].x * w),
-                         int(lm.landmark[1].y * h))
-                end = (int(lm.landmark[5].x * w),
-                       int(lm.landmark[5].y * h))
-                cv2.line(img, start, end, color, thickness)
-            if 4 < i < 8:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-
-            if i == 8:
-                start = (int(lm.landmark[5].x * w),
-                         int(lm.landmark[5].y * h))
-                end = (int(lm.landmark[9].x * w),
-                       int(lm.landmark[9].y * h))
-                cv2.line(img, start, end, color, thickness)
-
-            if 8 < i < 12:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-
-            if i == 12:
-                start = (int(lm.landmark[9].x * w),
-                         int(lm.landmark[9].y * h))
-                end = (int(lm.landmark[13].x * w),
-                       int(lm.landmark[13].y * h))
-                cv2.line(img, start, end, color, thickness)
-
-            if 12 < i < 16:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-
-            if i == 16:
-                start = (int(lm.landmark[13].x * w),
-                         int(lm.landmark[13].y * h))
-                end = (int(lm.landmark[17].x * w),
-                       int(lm.landmark[17].y * h))
-                cv2.line(img, start, end, color, thickness)
-
-            if 16 < i < 20:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-            if i == 17:
-                start = (int(lm.landmark[17].x * w),
-                         int(lm.landmark[17].y * h))
-                end = (int(lm.landmark[0].x * w),
-                       int(lm.landmark[0].y * h))
-                cv2.line(img, start, end, color, thickness)
-
-    def get_pinch_pos(self):
-        tx, ty = 0, 0
-        for hand_landmarks in self.landmarks:
-            self.draw()
-            for i, lm in enumerate(hand_landmarks.landmark):
-                h, w, c = self.img.shape
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                if i == 4:
-                    tx, ty = cx, cy
-
-                if i == 8:
-                    length = ((cx - tx) ** 2 + (cy - ty) ** 2) ** 0.5
-                    if length < self.pinch_length and not self.is_pinching:
-                        self.is_pinching = True
-                        self.pinch_pos = (cx, cy)
-                        return cx, cy
-                    elif length > self.pinch_length_open and self.is_pinching:
-                        self.is_pinching = False
-
-    def is_pinched_inside(self, r):
-        x, y = self.pinch_pos
-        if r.x < x < r.x + r.width and r.y < y < r.y + r.height:
-            return True
-        return False
+
+def mirror_landmarks(results):
+    # Detected on an unflipped frame: mirrored as if it had been flipped.
+    for hand_landmarks in results.multi_hand_landmarks or []:
+        for lm in hand_landmarks.landmark:
+            lm.x = 1.0 - lm.x
+    return results
 
 
 def setup_game(rows=4, cols=5):
@@ -313,132 +39,203 @@ def setup_game(rows=4, cols=5):
     return cards
 
 
-def win():
-    is_running = True
-    has_to_replay = True
-
-    mp_hands = mp.solutions.hands
-    hands_detector = mp_hands.Hands(max_num_hands=1,
-                                    min_detection_confidence=0.7,
-                                    min_tracking_confidence=0.7)
-
-    cam = Camera()
-    img = cam.get_rgb_img()
-    background = Rectangle(0, 0, img.shape[1], img.shape[0],
-                           (0, 0, 0), corner_radius=0)
-    replay = Rectangle(int(img.shape[1] * 0.3), int(img.shape[0] * 0.5), 200,
+class App:
+    window = "Memo"
+
+    def __init__(self, cam=None, hands_detector=None, display=None):
+        # One camera and one hand detector for the whole session, shared by
+        # every screen. When hand_tracking.py is running it already owns
+        # both, and the frames and landmarks are read from it instead.
+        # display defaults to a window, or to headless rendering as set by
+        # THERADUTY_HEADLESS.
+        if cam is not None:
+            self.cam = cam
+            self.hands_detector = hands_detector or self.create_detector()
+        else:
+            try:
+                # The screens never show the camera frame.
+                self.cam = self.hands_detector = HandService(frames=False)
+            except (OSError, ValueError):
+                # Not running, or crashed and left its files behind.
+                # The screens never show the camera frame, so it is not
+                # flipped: the landmarks are mirrored instead.
+                self.cam = Camera(threaded=True, mirror_pixels=False,
+                                  device=source_from_env())
+                self.hands_detector = self.create_detector()
+        self.mirror_landmarks = not getattr(self.cam, 'mirror_pixels', True)
+        img, self.rgb = self.cam.read_frames()
+        self.height, self.width = img.shape[:2]
+        # Screens render into this buffer while the camera frame is only
+        # used for detection.
+        self.canvas = np.zeros_like(img)
+        # Run the graph once so the first screen does not pay for loading
+        # the model.
+        self.hands_detector.process(self.rgb)
+        self.wait_release = False
+        self.metrics = metrics_from_env()
+        self.display = display or display_from_env(self.window, (1280, 720))
+
+    @staticmethod
+    def create_detector():
+        return mp.solutions.hands.Hands(max_num_hands=1,
+                                        min_detection_confidence=0.7,
+                                        min_tracking_confidence=0.7)
+
+    def run(self, screen):
+        while screen is not None:
+            # A pinch still held from the previous screen must not click
+            # whatever is at the same place on the next one.
+            self.wait_release = True
+            screen = screen(self)
+
+    def set_title(self, title):
+        self.display.set_title(title)
+
+    def capture(self):
+        # The frame; its RGB twin is kept for track().
+        with self.metrics.span('capture'):
+            img, self.rgb = self.cam.read_frames(wait_new=True)
+            return img
+
+    def render(self, scene):
+        with self.metrics.span('render'):
+            return scene.render(self.canvas)
+
+    def track(self, img, canvas):
+        with self.metrics.span('detect'):
+            results = self.hands_detector.process(self.rgb)
+            if self.mirror_landmarks:
+                mirror_landmarks(results)
+        with self.metrics.span('gesture'):
+            hands = Hands(results, canvas)
+            if isinstance(self.cam, HandService):
+                hands.apply_events(self.cam.events, self.cam.pinch)
+            elif hands.landmarks:
+                hands.get_pinch_pos()
+        if self.wait_release:
+            if not hands.is_pinching:
+                self.wait_release = False
+            hands.pinch_pos = (0, 0)
+        return hands
+
+    def show(self, img):
+        self.metrics.draw_overlay(img)
+        with self.metrics.span('show'):
+            self.display.show(img)
+        self.metrics.frame()
+
+    def key(self):
+        return self.display.poll()
+
+    def close(self):
+        self.metrics.close()
+        self.hands_detector.close()
+        self.display.close()
+        if not isinstance(self.cam, HandService):
+            self.cam.close()
+
+
+def win(app):
+    app.set_title("Win")
+    scene = Scene(app.width, app.height)
+    replay = Rectangle(int(app.width * 0.3), int(app.height * 0.5), 200,
                        100, (0, 200, 0))
     replay.text = "Rejouer"
     replay.is_clicked = True
     replay.shadow_color = (0, 155, 0)
     replay.highlight_color = (0, 255, 0)
 
-    quit_button = Rectangle(int(img.shape[1] * 0.6), int(img.shape[0] * 0.5),
+    quit_button = Rectangle(int(app.width * 0.6), int(app.height * 0.5),
                             200, 100, (0, 0, 200))
     quit_button.text = "Quitter"
     quit_button.is_clicked = True
     quit_button.shadow_color = (0, 0, 155)
     quit_button.highlight_color = (0, 0, 255)
 
-    while is_running:
-        img = cam.get_rgb_img()
-        results = hands_detector.process(img)
-        hands = Hands(results, img)
-
-        background.draw(img)
-        cv2.putText(img, "Victoire !", (img.shape[1] // 2 - 100, 100),
-                    cv2.FONT_HERSHEY_COMPLEX, 1, (255, 255, 255), 3)
-        replay.draw(img)
-        quit_button.draw(img)
-
-        if hands.landmarks:
-            hands.get_pinch_pos()
+    scene.add(Label("Victoire !", app.width // 2 - 100, 100), replay,
+              quit_button)
+    hits = HitGrid(app.width, app.height)
+    hits.add(replay)
+    hits.add(quit_button)
 
-        if hands.is_pinched_inside(quit_button):
-            is_running = False
-            has_to_replay = False
-        if hands.is_pinched_inside(replay):
-            is_running = False
-            has_to_replay = True
+    while True:
+        img = app.capture()
+        frame = app.render(scene)
+        hands = app.track(img, frame)
 
-        cv2.imshow("Win", img)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            is_running = False
-            has_to_replay = False
+        pinched = hits.dispatch(hands.pinch_pos)
+        if pinched is quit_button:
+            return None
+        if pinched is replay:
+            return launch_game
 
-    destroy_all_windows(cam.camera)
-    if has_to_replay:
-        launch_game()
+        app.show(frame)
+        key = app.key()
+        if key == ord('q'):
+            return None
+        if key == ord('r'):
+            return launch_game
 
 
-def launch_game():
+def launch_game(app):
     first_card = None
     second_card = None
     is_not_matched = False
     go_to_menu = False
     is_running = True
 
-    cam = Camera()
-
-    cv2.namedWindow("Memo", cv2.WINDOW_NORMAL)
-    cv2.resizeWindow("Memo", 1280, 720)
+    app.set_title("Memo")
     card_val_grid = setup_game()
 
-    mp_hands = mp.solutions.hands
-    hands_detector = mp_hands.Hands(max_num_hands=1,
-                                    min_detection_confidence=0.7,
-                                    min_tracking_confidence=0.7)
-
-    game_img = cam.get_rgb_img()
-    background = Rectangle(0, 0, game_img.shape[1], game_img.shape[0],
-                           (0, 0, 0), corner_radius=0)
+    scene = Scene(app.width, app.height)
 
-    menu_button = Rectangle(100, int(game_img.shape[0] * 0.8), 200, 100,
+    menu_button = Rectangle(100, int(app.height * 0.8), 200, 100,
                             text="Menu")
     menu_button.is_clicked = True
 
     for card in card_val_grid:
-        card.x += game_img.shape[0] // 2
+        card.x += app.height // 2
         card.y += 100
 
-    while is_running:
-        img = cam.get_rgb_img()
-        game_img = cam.get_rgb_img()
-        results = hands_detector.process(img)
-        hands = Hands(results, img)
-
-        background.draw(game_img)
-        menu_button.draw(game_img)
-        for card in card_val_grid:
-            card.draw(game_img)
-        if hands.landmarks:
-            hands.draw_on_img(game_img)
-            hands.get_pinch_pos()
+    scene.add(menu_button, *card_val_grid)
+
+    def open_menu(button):
+        nonlocal is_running, go_to_menu
+        is_running = False
+        go_to_menu = True
+
+    def pick_card(card):
+        nonlocal first_card, second_card, is_not_matched
+        if card.color == (0, 200, 0):
+            return
+        if is_not_matched:
+            first_card.is_clicked = False
+            second_card.is_clicked = False
+            first_card.text_color = (0, 0, 0)
+            second_card.text_color = (0, 0, 0)
+            first_card = None
+            second_card = None
+            is_not_matched = False
+        if first_card is None:
+            card.is_clicked = True
+            first_card = card
+        elif second_card is None and first_card != card:
+            second_card = card
+            second_card.is_clicked = True
+
+    hits = HitGrid(app.width, app.height)
+    hits.add(menu_button, open_menu)
+    for card in card_val_grid:
+        hits.add(card, pick_card)
 
-        if hands.is_pinched_inside(menu_button):
-            is_running = False
-            go_to_menu = True
+    while is_running:
+        img = app.capture()
+        game_img = app.render(scene)
+        hands = app.track(img, game_img)
 
-        for card in card_val_grid:
-            if hands.is_pinched_inside(card) and card.color != (
-                    0, 200, 0):
-                if is_not_matched:
-                    first_card.is_clicked = False
-                    second_card.is_clicked = False
-                    first_card.text_color = (0, 0, 0)
-                    second_card.text_color = (0, 0, 0)
-                    first_card = None
-                    second_card = None
-                    is_not_matched = False
-                if first_card is None:
-                    card.is_clicked = True
-                    first_card = card
-                elif second_card is None and first_card != card:
-                    second_card = card
-                    second_card.is_clicked = True
-                break
+        hits.dispatch(hands.pinch_pos)
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if app.key() == ord('q'):
             break
 
         if first_card is not None and second_card is not None:
@@ -459,8 +256,7 @@ def launch_game():
                 second_card.text_color = (0, 0, 200)
                 is_not_matched = True
 
-        cv2.waitKey(1)
-        cv2.imshow("Memo", game_img)
+        app.show(game_img)
 
         for card in card_val_grid:
             if card.color != (0, 200, 0):
@@ -468,61 +264,48 @@ def launch_game():
             is_running = False
 
     if go_to_menu:
-        destroy_all_windows(cam.camera)
-        menu()
-    else:
-        destroy_all_windows(cam.camera)
-        win()
-
-
-def destroy_all_windows(cam):
-    cam.release()
-    cv2.destroyAllWindows()
-
-
-def how_to_play():
-    is_in_how_to_play = True
-    mp_hands = mp.solutions.hands
-    hands_detector = mp_hands.Hands(max_num_hands=1,
-                                    min_detection_confidence=0.7,
-                                    min_tracking_confidence=0.7)
-    cam = Camera()
-    img = cam.get_rgb_img()
-    card_example = Rectangle(int(img.shape[1] * 0.6), int(img.shape[0] * 0.1),
+        return menu
+    return win
+
+
+def how_to_play(app):
+    app.set_title("How to play")
+    card_example = Rectangle(int(app.width * 0.6), int(app.height * 0.1),
                              150, 200, text="1")
-    card_example_2 = Rectangle(int(img.shape[1] * 0.8),
-                               int(img.shape[0] * 0.1), 150, 200,
+    card_example_2 = Rectangle(int(app.width * 0.8),
+                               int(app.height * 0.1), 150, 200,
                                text="1")
 
-    play_button = Rectangle(int(img.shape[1] * 0.7), int(img.shape[0] * 0.7),
+    play_button = Rectangle(int(app.width * 0.7), int(app.height * 0.7),
                             200, 100, text="Jouer")
     play_button.is_clicked = True
 
-    quit_button = Rectangle(int(img.shape[1] * 0.2), int(img.shape[0] * 0.7),
+    quit_button = Rectangle(int(app.width * 0.2), int(app.height * 0.7),
                             200, 100, text="Quitter")
     quit_button.is_clicked = True
-
-    background = Rectangle(0, 0, img.shape[1], img.shape[0], (0, 0, 0),
-                           -1, corner_radius=0)
-
-    while is_in_how_to_play:
-        img = cam.get_rgb_img()
-        results = hands_detector.process(img)
-        hands = Hands(results, img)
-        background.draw(img)
-        cv2.putText(img, "Le but du jeu est de trouver les paires de cartes",
-                    (10, 90),
-                    cv2.FONT_HERSHEY_COMPLEX, 1, (255, 255, 255), 3)
-        cv2.putText(img, "en les retournant deux par deux",
-                    (10, 120),
-                    cv2.FONT_HERSHEY_COMPLEX, 1, (255, 255, 255), 3)
-        cv2.putText(img, "Testez avec ces cartes pour jouer au jeu",
-                    (10, 180),
-                    cv2.FONT_HERSHEY_COMPLEX, 1, (255, 255, 255), 3)
-
-        card_example.draw(img)
-        card_example_2.draw(img)
-        quit_button.draw(img)
+    play_button.visible = False
+
+    scene = Scene(app.width, app.height)
+    scene.add(Label("Le but du jeu est de trouver les paires de cartes",
+                    10, 90),
+              Label("en les retournant deux par deux", 10, 120),
+              Label("Testez avec ces cartes pour jouer au jeu", 10, 180),
+              card_example, card_example_2, quit_button, play_button)
+
+    def turn(card):
+        card.is_clicked = True
+
+    hits = HitGrid(app.width, app.height)
+    hits.add(card_example, turn)
+    hits.add(card_example_2, turn)
+    hits.add(quit_button)
+    # Only hit while visible, once both example cards are turned.
+    hits.add(play_button)
+
+    while True:
+        img = app.capture()
+        frame = app.render(scene)
+        hands = app.track(img, frame)
 
         if card_example.is_clicked and card_example_2.is_clicked:
             card_example.color = (0, 200, 0)
@@ -534,123 +317,75 @@ def how_to_play():
             card_example_2.text_color = (0, 255, 0)
             card_example_2.shadow_color = (0, 155, 0)
             card_example_2.highlight_color = (0, 255, 0)
-            play_button.draw(img)
-
-        if hands.landmarks:
-            hands.draw()
-            hands.get_pinch_pos()
-
-        if hands.is_pinched_inside(card_example):
-            card_example.is_clicked = True
-
-        if hands.is_pinched_inside(card_example_2):
-            card_example_2.is_clicked = True
-
-        if hands.is_pinched_inside(play_button):
-            is_in_how_to_play = False
-            destroy_all_windows(cam.camera)
-            launch_game()
-
-        if hands.is_pinched_inside(quit_button):
-            destroy_all_windows(cam.camera)
-            sys.exit(0)
-
-        cv2.imshow("How to play", img)
-        if cv2.waitKey(1) & 0xFF == ord('s'):
-            is_in_how_to_play = False
-        elif cv2.waitKey(1) & 0xFF == ord('q'):
-            is_in_how_to_play = False
-            destroy_all_windows(cam.camera)
-
-
-def draw_menu(img, first_rect: Rectangle, second_rect: Rectangle,
-              third_rect: Rectangle):
-    cv2.putText(img, "Appuyez sur 's' pour commencer le jeu",
-                (10, 30),
-                cv2.FONT_HERSHEY_COMPLEX, 1, (0, 0, 0), 3)
-    cv2.putText(img, "Appuyez sur 'q' pour quitter",
-                (10, 60),
-                cv2.FONT_HERSHEY_COMPLEX, 1, (0, 0, 0), 3)
-
-    first_rect.draw(img)
-    second_rect.draw(img)
-    third_rect.draw(img)
-
-
-def menu():
-    is_in_menu = True
-    has_to_quit = False
-    go_to_play = False
-    go_to_how_to_play = False
-
-    mp_hands = mp.solutions.hands
-    hands_detector = mp_hands.Hands(max_num_hands=1,
-                                    min_detection_confidence=0.7,
-                                    min_tracking_confidence=0.7)
-
-    cam = Camera()
-    img = cam.get_rgb_img()
+            play_button.visible = True
+
+        pinched = hits.dispatch(hands.pinch_pos)
+        if pinched is play_button:
+            return launch_game
+        if pinched is quit_button:
+            return None
+
+        app.show(frame)
+        if app.key() in (ord('s'), ord('q')):
+            return None
+
+
+def build_menu(scene, first_rect: Rectangle, second_rect: Rectangle,
+               third_rect: Rectangle):
+    scene.add(Label("Appuyez sur 's' pour commencer le jeu", 10, 30,
+                    (0, 0, 0)),
+              Label("Appuyez sur 'q' pour quitter", 10, 60, (0, 0, 0)),
+              first_rect, second_rect, third_rect)
+
+
+def menu(app):
+    app.set_title("Menu")
     rectangle_width = 300
-    play_button = Rectangle(img.shape[1] // 2 - 100,
-                            img.shape[0] // 2 - 200,
+    play_button = Rectangle(app.width // 2 - 100,
+                            app.height // 2 - 200,
                             rectangle_width, 100, text="Jouer",
                             corner_radius=24)
-    quit_button = Rectangle(img.shape[1] // 2 - 100,
-                            img.shape[0] // 2 + 200,
+    quit_button = Rectangle(app.width // 2 - 100,
+                            app.height // 2 + 200,
                             rectangle_width, 100, text="Quitter",
                             corner_radius=24)
-    htp_button = Rectangle(img.shape[1] // 2 - 100, img.shape[0] // 2,
+    htp_button = Rectangle(app.width // 2 - 100, app.height // 2,
                            rectangle_width, 100, text="Comment jouer",
                            corner_radius=24)
-    background = Rectangle(0, 0, img.shape[1], img.shape[0], (0, 0, 0),
-                           -1, corner_radius=0)
-
     play_button.is_clicked = True
     htp_button.is_clicked = True
     quit_button.is_clicked = True
 
-    while is_in_menu:
-        img = cam.get_rgb_img()
-        results = hands_detector.process(img)
-        hands = Hands(results, img)
-
-        background.draw(img)
-
-        draw_menu(img, play_button, htp_button, quit_button)
-
-        if hands.landmarks:
-            hands.get_pinch_pos()
-
-        if hands.is_pinched_inside(play_button):
-            is_in_menu = False
-            go_to_play = True
-        if hands.is_pinched_inside(htp_button):
-            is_in_menu = False
-            go_to_how_to_play = True
-        if hands.is_pinched_inside(quit_button):
-            is_in_menu = False
-            has_to_quit = True
-
-        cv2.imshow("Menu", img)
-        if cv2.waitKey(1) & 0xFF == ord('s'):
-            is_in_menu = False
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            is_in_menu = False
-            has_to_quit = True
-
-    if has_to_quit:
-        destroy_all_windows(cam.camera)
-        return
-    if go_to_how_to_play:
-        destroy_all_windows(cam.camera)
-        how_to_play()
-    if go_to_play:
-        destroy_all_windows(cam.camera)
-        launch_game()
+    scene = Scene(app.width, app.height)
+    build_menu(scene, play_button, htp_button, quit_button)
+    hits = HitGrid(app.width, app.height)
+    for button in (play_button, htp_button, quit_button):
+        hits.add(button)
+
+    while True:
+        img = app.capture()
+        frame = app.render(scene)
+        hands = app.track(img, frame)
+
+        pinched = hits.dispatch(hands.pinch_pos)
+        if pinched is play_button:
+            return launch_game
+        if pinched is htp_button:
+            return how_to_play
+        if pinched is quit_button:
+            return None
+
+        app.show(frame)
+        if app.key() in (ord('s'), ord('q')):
+            return None
 
 
 def main():
-    menu()
+    app = App()
+    try:
+        app.run(menu)
+    finally:
+        app.close()
 
 
 if __name__ == '__main__':
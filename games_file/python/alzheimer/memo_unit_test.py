@@ -1,7 +1,9 @@
 import unittest
+from types import SimpleNamespace
 
-from games_file.python.cv2_utils import Rectangle
-from memo import setup_game
+from hand_tracking.hand_tracking_lib.display import HeadlessDisplay, KeyScript
+from memo import (App, Camera, Rectangle, launch_game, menu, setup_game,
+                  win)
 
 
 class TestSetupGame(unittest.TestCase):
@@ -26,5 +28,37 @@ class TestSetupGame(unittest.TestCase):
             self.assertIsInstance(card, Rectangle)
 
 
+class NoHands:
+    def process(self, img):
+        return SimpleNamespace(multi_hand_landmarks=None)
+
+    def close(self):
+        pass
+
+
+class TestHeadless(unittest.TestCase):
+    def run_screen(self, screen, keys):
+        display = HeadlessDisplay(keys=KeyScript(keys))
+        # Threaded and unflipped, as App opens the camera itself.
+        camera = Camera(threaded=True, mirror_pixels=False,
+                        device='synthetic:320x240@1000', resolution=None)
+        app = App(camera, NoHands(), display)
+        try:
+            return screen(app), display
+        finally:
+            app.close()
+
+    def test_scripted_quit_ends_the_screen(self):
+        next_screen, display = self.run_screen(menu, '3:q')
+        self.assertIsNone(next_screen)
+        self.assertEqual(display.frames, 4)
+        self.assertEqual(display.title, "Menu")
+
+    def test_scripted_replay_starts_a_new_game(self):
+        next_screen, display = self.run_screen(win, '0:r')
+        self.assertIs(next_screen, launch_game)
+        self.assertEqual(display.frames, 1)
+
+
 if __name__ == '__main__':
     unittest.main()
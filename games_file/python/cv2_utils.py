@@ -1,4 +1,30 @@
+import os
+import sys
+from collections import OrderedDict, namedtuple
+
 import cv2
+import numpy as np
+
+# The shared memory layout, frame sources, display, metrics and the
+# (optionally threaded) Camera are the hand tracking library's, imported
+# from the repository root so that hand_tracking.py and the games share
+# one definition; the games import them from here.
+ROOT = os.path.normpath(os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..', '..'))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from hand_tracking.hand_tracking_lib.cv2_utils import (  # noqa: E402, F401
+    Camera)
+from hand_tracking.hand_tracking_lib.display import (  # noqa: E402
+    HeadlessDisplay, KeyScript, Window, open_sink)
+from hand_tracking.hand_tracking_lib.frames import (  # noqa: E402, F401
+    FramePool)
+from hand_tracking.hand_tracking_lib.metrics import Metrics  # noqa: E402
+from hand_tracking.hand_tracking_lib.service import (  # noqa: E402
+    SERVICE_NAME, HandSubscriber)
+from hand_tracking.hand_tracking_lib.sources import (  # noqa: E402, F401
+    open_source)
 
 
 def draw_rounded_rectangle(img, top_left, bottom_right, color, thickness,
@@ -80,34 +106,213 @@ def draw_rounded_shadow_rectangle(img, top_left, bottom_right, color, radius,
     draw_filled_rounded_rectangle(img, top_left, bottom_right, color, radius)
 
 
-def draw_line(lm, i, w, h):
-    start = (int(lm.landmark[i].x * w),
-             int(lm.landmark[i].y * h))
-    end = (int(lm.landmark[i + 1].x * w),
-           int(lm.landmark[i + 1].y * h))
-    return start, end
+# Bones of the hand skeleton as pairs of MediaPipe landmark indices.
+HAND_BONES = np.array([(0, 1), (1, 2), (2, 3), (3, 4),
+                       (1, 5), (5, 6), (6, 7), (7, 8),
+                       (5, 9), (9, 10), (10, 11), (11, 12),
+                       (9, 13), (13, 14), (14, 15), (15, 16),
+                       (13, 17), (17, 18), (18, 19), (19, 20),
+                       (17, 0)], np.int32)
+
+
+def draw_hands(img, multi_hand_landmarks, thickness=20, color=(0, 255, 0),
+               joint_radius=0, joint_color=(0, 0, 255)):
+    if not multi_hand_landmarks:
+        return img
+    h, w = img.shape[:2]
+    xy = np.array([[(lm.x * w, lm.y * h) for lm in hand.landmark]
+                   for hand in multi_hand_landmarks]).astype(np.int32)
+    # Every bone of every hand in a single polylines call.
+    cv2.polylines(img, xy[:, HAND_BONES].reshape(-1, 2, 2), False, color,
+                  thickness)
+    if joint_radius:
+        # Zero-length segments render as round dots of the line thickness.
+        joints = np.repeat(xy.reshape(-1, 1, 2), 2, axis=1)
+        cv2.polylines(img, joints, False, joint_color, joint_radius * 2)
+    return img
+
+
+def source_from_env():
+    # THERADUTY_SOURCE: where a game reads frames when hand_tracking.py is
+    # not running, any spec of open_source(); the first camera if unset.
+    return os.environ.get('THERADUTY_SOURCE', '0')
+
+
+def display_from_env(name, size=None):
+    # THERADUTY_HEADLESS=SINK runs the game without a window, the keys
+    # are then the ones of THERADUTY_KEYS, e.g. "300:q".
+    sink = os.environ.get('THERADUTY_HEADLESS')
+    if not sink:
+        return Window(name, size)
+    return HeadlessDisplay(open_sink(sink),
+                           KeyScript(os.environ.get('THERADUTY_KEYS', '')))
+
+
+class Landmark(namedtuple('Landmark', 'x y z')):
+    # Just enough of MediaPipe's NormalizedLandmark for Hands and
+    # mp.solutions.drawing_utils.
+    def HasField(self, name):
+        return False
 
 
-class Camera:
-    def __init__(self):
-        self.camera = cv2.VideoCapture(0)
-        self.resolution = (800, 600)
-        self.framerate = 24
-        self.camera.set(3, 940)
+HandLandmarkList = namedtuple('HandLandmarkList', 'landmark')
+HandResults = namedtuple('HandResults',
+                         'multi_hand_landmarks multi_handedness')
+
+
+class HandService:
+    # Client of hand_tracking.py, which owns the camera and the detector
+    # and publishes every frame in shared memory, read here through
+    # hand_tracking_lib's HandSubscriber. It stands in for both the Camera
+    # and the MediaPipe Hands object. Raises OSError when the service is
+    # not running or left its files behind after a crash, ValueError when
+    # it is of another version. Without frames, read() gives a blank frame
+    # of the camera's size and the service does not copy the frames.
+    def __init__(self, name=SERVICE_NAME, timeout=1.0, frames=True):
+        self.timeout = timeout
+        self.subscriber = HandSubscriber(name, frames)
+
+    @property
+    def pinch(self):
+        return self.subscriber.pinch
+
+    @property
+    def pinch_pos(self):
+        return self.subscriber.pinch_pos
+
+    @property
+    def timestamp(self):
+        return self.subscriber.timestamp
+
+    @property
+    def events(self):
+        # GestureEvents recognized by hand_tracking.py since the previous
+        # read(), in pixels of its frames.
+        return self.subscriber.events
+
+    def scale(self, x, y, size):
+        # Event pixels in a picture of another (width, height).
+        h, w = self.subscriber.frame_shape[:2]
+        return x * size[0] // w, y * size[1] // h
+
+    def read(self):
+        # Same contract as cv2.VideoCapture.read(); the frame is already
+        # mirrored and its buffer is reused by the next call.
+        if not self.subscriber.wait(self.timeout) or \
+                not self.subscriber.read():
+            return False, None
+        return True, self.subscriber.frame
 
-    def __del__(self):
+    def get_rgb_img(self):
+        return self.read()[1]
+
+    def read_frames(self, wait_new=True):
+        # Always the next frame. process() ignores the frame, so it needs
+        # no RGB copy.
+        frame = self.read()[1]
+        return frame, frame
+
+    def process(self, img):
+        # Landmarks of the frame last returned by read().
+        landmarks = self.subscriber.landmarks
+        if not landmarks.count:
+            return HandResults(None, None)
+        hands = [HandLandmarkList([Landmark(*lm) for lm in hand.tolist()])
+                 for hand in landmarks.norm[:landmarks.count]]
+        return HandResults(hands, None)
+
+    def isOpened(self):
+        return self.subscriber is not None
+
+    def release(self):
         self.close()
 
     def close(self):
-        self.camera.release()
-
-    def get_rgb_img(self):
-        ret, frame = self.camera.read()
-        frame = cv2.flip(frame, 1)
-        return frame
+        if self.subscriber is None:
+            return
+        self.subscriber.close()
+        self.subscriber = None
+
+
+def metrics_from_env():
+    # THERADUTY_METRICS=1 shows the overlay, a file path also dumps the
+    # timings there as JSON every 5 seconds.
+    value = os.environ.get('THERADUTY_METRICS')
+    metrics = Metrics(enabled=bool(value))
+    if value and value != '1':
+        metrics.dump_every(value)
+    return metrics
+
+
+class SpriteCache:
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+        self.misses += 1
+        sprite = render()
+        self.sprites[key] = sprite
+        # Least recently used looks go first, e.g. the colours of cards
+        # that are no longer on screen.
+        if len(self.sprites) > self.max_size:
+            self.sprites.popitem(last=False)
+        return sprite
+
+
+sprite_cache = SpriteCache()
+
+
+class Sprite:
+    def __init__(self, bgra, dx, dy):
+        # The BGRA tile is split once into a contiguous colour plane and an
+        # opaque mask so blitting is mostly a single masked copy.
+        self.bgra = bgra
+        self.dx = dx
+        self.dy = dy
+        alpha = bgra[:, :, 3]
+        self.color = np.ascontiguousarray(bgra[:, :, :3])
+        self.mask = (alpha == 255).astype(np.uint8)
+
+        # Anti-aliased edges over transparent pixels (text sticking out of
+        # the box) hold a partial alpha and a premultiplied colour, they
+        # are blended one by one.
+        self.edge_y, self.edge_x = np.nonzero((alpha > 0) & (alpha < 255))
+        self.edge_color = bgra[self.edge_y, self.edge_x, :3].astype(
+            np.float32) + 0.5
+        self.edge_keep = 1 - alpha[self.edge_y, self.edge_x, None].astype(
+            np.float32) / 255
+
+    def blit(self, img, x, y):
+        x += self.dx
+        y += self.dy
+        h, w = self.mask.shape
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + w, img.shape[1]), min(y + h, img.shape[0])
+        if x1 >= x2 or y1 >= y2:
+            return
+        cv2.copyTo(self.color[y1 - y:y2 - y, x1 - x:x2 - x],
+                   self.mask[y1 - y:y2 - y, x1 - x:x2 - x],
+                   img[y1:y2, x1:x2])
+        if len(self.edge_x):
+            ex = self.edge_x + x
+            ey = self.edge_y + y
+            inside = (ex >= x1) & (ex < x2) & (ey >= y1) & (ey < y2)
+            ex, ey = ex[inside], ey[inside]
+            img[ey, ex] = img[ey, ex] * self.edge_keep[inside] + \
+                self.edge_color[inside]
 
 
 class Rectangle:
+    shadow_offset = 5
+
     def __init__(self, x, y, width, height, color=(200, 200, 200),
                  thickness=-1,
                  text="",
@@ -124,28 +329,227 @@ class Rectangle:
         self.shadow_color = (96, 96, 96)
         self.corner_radius = corner_radius
         self.is_clicked = False
-
-    def draw(self, img):
+        self.visible = True
+
+    def sprite_key(self):
+        return (self.width, self.height, self.thickness, self.corner_radius,
+                tuple(self.color), tuple(self.shadow_color),
+                tuple(self.highlight_color), tuple(self.text_color),
+                self.text if self.is_clicked else "")
+
+    def sprite(self):
+        return sprite_cache.get(self.sprite_key(), self.render)
+
+    def draw(self, img, origin=(0, 0)):
+        # Each distinct look is rasterized once into a BGRA tile, then
+        # copied into place on every frame.
+        if self.visible:
+            self.sprite().blit(img, self.x - origin[0], self.y - origin[1])
+
+    def state(self):
+        return self.x, self.y, self.visible, self.sprite_key()
+
+    def bounds(self):
+        sprite = self.sprite()
+        h, w = sprite.mask.shape
+        x, y = self.x + sprite.dx, self.y + sprite.dy
+        return x, y, x + w, y + h
+
+    def render(self):
+        offset = self.shadow_offset
+        left, top = -offset, -offset
+        right, bottom = self.width + offset, self.height + offset
+        if self.text != "" and self.is_clicked:
+            text_x = self.width // 2 - len(self.text) * 10
+            text_y = self.height // 2
+            (text_w, text_h), baseline = cv2.getTextSize(
+                self.text, cv2.FONT_HERSHEY_COMPLEX, 1, 3)
+            left = min(left, text_x - 2)
+            top = min(top, text_y - text_h - 2)
+            right = max(right, text_x + text_w + 2)
+            bottom = max(bottom, text_y + baseline + 2)
+
+        # Rendering over black and over white gives both the premultiplied
+        # colour and the coverage of every pixel, anti-aliased text included.
+        shape = (bottom - top + 1, right - left + 1, 3)
+        on_black = np.zeros(shape, np.uint8)
+        on_white = np.full(shape, 255, np.uint8)
+        for canvas in (on_black, on_white):
+            self.rasterize(canvas, -left, -top)
+        alpha = 255 - cv2.subtract(on_white, on_black).max(axis=2)
+        return Sprite(np.dstack((on_black, alpha)), left, top)
+
+    def rasterize(self, img, x, y):
+        offset = self.shadow_offset
         if self.thickness == -1:
-            draw_rounded_shadow_rectangle(img, (self.x, self.y),
-                                          (self.x + self.width,
-                                           self.y + self.height),
-                                          self.color, self.corner_radius, 5,
-                                          self.shadow_color,
+            draw_rounded_shadow_rectangle(img, (x, y),
+                                          (x + self.width,
+                                           y + self.height),
+                                          self.color, self.corner_radius,
+                                          offset, self.shadow_color,
                                           self.highlight_color)
         else:
-            draw_rounded_rectangle(img, (self.x, self.y),
-                                   (self.x + self.width, self.y + self.height),
+            draw_rounded_rectangle(img, (x, y),
+                                   (x + self.width, y + self.height),
                                    radius=self.corner_radius, color=self.color,
                                    thickness=self.thickness)
         if self.text != "" and self.is_clicked:
             cv2.putText(img, self.text,
                         (
-                            self.x + self.width // 2 - len(self.text) * 10,
-                            self.y + self.height // 2),
+                            x + self.width // 2 - len(self.text) * 10,
+                            y + self.height // 2),
                         cv2.FONT_HERSHEY_COMPLEX, 1, self.text_color, 3)
 
 
+class Label:
+    def __init__(self, text, x, y, color=(255, 255, 255), font_scale=1,
+                 thickness=3):
+        self.text = text
+        self.x = x
+        self.y = y
+        self.color = color
+        self.font_scale = font_scale
+        self.thickness = thickness
+        self.visible = True
+
+    def draw(self, img, origin=(0, 0)):
+        if self.visible:
+            cv2.putText(img, self.text,
+                        (self.x - origin[0], self.y - origin[1]),
+                        cv2.FONT_HERSHEY_COMPLEX, self.font_scale,
+                        self.color, self.thickness)
+
+    def state(self):
+        return (self.text, self.x, self.y, self.visible, tuple(self.color),
+                self.font_scale, self.thickness)
+
+    def bounds(self):
+        (w, h), baseline = cv2.getTextSize(self.text, cv2.FONT_HERSHEY_COMPLEX,
+                                           self.font_scale, self.thickness)
+        pad = self.thickness
+        return (self.x - pad, self.y - h - pad, self.x + w + pad,
+                self.y + baseline + pad)
+
+
+class Scene:
+    def __init__(self, width, height, background=(0, 0, 0)):
+        # Widgets are registered once. The composite keeps the last
+        # rendering and only the areas of widgets whose state changed are
+        # re-rasterized into it.
+        self.base = np.empty((height, width, 3), np.uint8)
+        self.base[:] = background
+        self.composite = self.base.copy()
+        self.widgets = []
+        self.states = []
+        self.areas = []
+        self.redraws = 0
+
+    def add(self, *widgets):
+        for widget in widgets:
+            self.widgets.append(widget)
+            self.states.append(None)
+            self.areas.append(None)
+
+    def update(self):
+        dirty = []
+        for i, widget in enumerate(self.widgets):
+            state = widget.state()
+            if state == self.states[i]:
+                continue
+            self.states[i] = state
+            old_area = self.areas[i]
+            self.areas[i] = widget.bounds() if widget.visible else None
+            if old_area is not None:
+                dirty.append(old_area)
+            if self.areas[i] is not None and self.areas[i] != old_area:
+                dirty.append(self.areas[i])
+        for area in dirty:
+            self.redraw(area)
+
+    def redraw(self, area):
+        h, w = self.base.shape[:2]
+        x1, y1 = max(area[0], 0), max(area[1], 0)
+        x2, y2 = min(area[2], w), min(area[3], h)
+        if x1 >= x2 or y1 >= y2:
+            return
+        view = self.composite[y1:y2, x1:x2]
+        view[:] = self.base[y1:y2, x1:x2]
+        # Every widget overlapping the area is drawn again in order, clipped
+        # to the area, so overlaps stay correct.
+        for widget, other in zip(self.widgets, self.areas):
+            if other is not None and other[0] < x2 and other[2] > x1 and \
+                    other[1] < y2 and other[3] > y1:
+                widget.draw(view, (x1, y1))
+                self.redraws += 1
+
+    def render(self, img):
+        self.update()
+        np.copyto(img, self.composite)
+        return img
+
+
+class HitGrid:
+    def __init__(self, width, height, cell=64):
+        # Pinch targets indexed by the cells of a uniform grid they
+        # overlap, so resolving a position only looks at the few widgets of
+        # one cell, however many there are on screen.
+        self.width = width
+        self.height = height
+        self.cell = cell
+        self.cells = {}
+        # Widgets are their own keys: objects by identity, plain values
+        # such as numbers by value.
+        self.entries = {}
+
+    def _keys(self, bounds):
+        x1, y1, x2, y2 = bounds
+        for row in range(max(y1, 0) // self.cell,
+                         min(y2, self.height - 1) // self.cell + 1):
+            for col in range(max(x1, 0) // self.cell,
+                             min(x2, self.width - 1) // self.cell + 1):
+                yield col, row
+
+    def add(self, widget, on_pinch=None, bounds=None):
+        # Widgets added later are on top. bounds defaults to the same
+        # rectangle as Hands.is_pinched_inside.
+        if bounds is None:
+            bounds = (widget.x, widget.y, widget.x + widget.width,
+                      widget.y + widget.height)
+        entry = (widget, bounds, on_pinch)
+        for key in self._keys(bounds):
+            self.cells.setdefault(key, []).append(entry)
+        self.entries[widget] = entry
+        return widget
+
+    def remove(self, widget):
+        entry = self.entries.pop(widget, None)
+        if entry is None:
+            return
+        for key in self._keys(entry[1]):
+            self.cells[key].remove(entry)
+
+    def hit(self, x, y):
+        # Top-most visible widget strictly inside at (x, y), or None.
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        for widget, (x1, y1, x2, y2), _ in reversed(
+                self.cells.get((x // self.cell, y // self.cell), ())):
+            if x1 < x < x2 and y1 < y < y2 and \
+                    getattr(widget, 'visible', True):
+                return widget
+        return None
+
+    def dispatch(self, pos):
+        # Calls the on_pinch callback of the widget at pos, if any, and
+        # returns that widget.
+        widget = self.hit(*pos)
+        if widget is not None:
+            on_pinch = self.entries[widget][2]
+            if on_pinch is not None:
+                on_pinch(widget)
+        return widget
+
+
 class Hands:
     def __init__(self, result, img):
         self.landmarks = result.multi_hand_landmarks
@@ -155,122 +559,20 @@ class Hands:
         self.pinch_length = 50
         self.pinch_length_open = 100
 
-    def draw(self, thickness=20, color=(0, 255, 0)):
-        lm = self.landmarks[0]
-        h, w, c = self.img.shape
-        for i in range(21):
-            if i < 4:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-            if i == 4:
-                start = (int(lm.landmark[1].x * w),
-                         int(lm.landmark[1].y * h))
-                end = (int(lm.landmark[5].x * w),
-                       int(lm.landmark[5].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-            if 4 < i < 8:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-
-            if i == 8:
-                start = (int(lm.landmark[5].x * w),
-                         int(lm.landmark[5].y * h))
-                end = (int(lm.landmark[9].x * w),
-                       int(lm.landmark[9].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-
-            if 8 < i < 12:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-
-            if i == 12:
-                start = (int(lm.landmark[9].x * w),
-                         int(lm.landmark[9].y * h))
-                end = (int(lm.landmark[13].x * w),
-                       int(lm.landmark[13].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-
-            if 12 < i < 16:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-
-            if i == 16:
-                start = (int(lm.landmark[13].x * w),
-                         int(lm.landmark[13].y * h))
-                end = (int(lm.landmark[17].x * w),
-                       int(lm.landmark[17].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-
-            if 16 < i < 20:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-            if i == 17:
-                start = (int(lm.landmark[17].x * w),
-                         int(lm.landmark[17].y * h))
-                end = (int(lm.landmark[0].x * w),
-                       int(lm.landmark[0].y * h))
-                cv2.line(self.img, start, end, color, thickness)
+    def draw(self, thickness=20, color=(0, 255, 0), img=None,
+             joint_radius=0, joint_color=(0, 0, 255)):
+        if img is None:
+            img = self.img
+        draw_hands(img, self.landmarks, thickness, color, joint_radius,
+                   joint_color)
 
     def draw_on_img(self, img, thickness=20, color=(0, 255, 0)):
-        lm = self.landmarks[0]
-        h, w, c = self.img.shape
-        for i in range(21):
-            if i < 4:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-            if i == 4:
-                start = (int(lm.landmark[1].x * w),
-                         int(lm.landmark[1].y * h))
-                end = (int(lm.landmark[5].x * w),
-                       int(lm.landmark[5].y * h))
-                cv2.line(img, start, end, color, thickness)
-            if 4 < i < 8:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-
-            if i == 8:
-                start = (int(lm.landmark[5].x * w),
-                         int(lm.landmark[5].y * h))
-                end = (int(lm.landmark[9].x * w),
-                       int(lm.landmark[9].y * h))
-                cv2.line(img, start, end, color, thickness)
-
-            if 8 < i < 12:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-
-            if i == 12:
-                start = (int(lm.landmark[9].x * w),
-                         int(lm.landmark[9].y * h))
-                end = (int(lm.landmark[13].x * w),
-                       int(lm.landmark[13].y * h))
-                cv2.line(img, start, end, color, thickness)
-
-            if 12 < i < 16:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-
-            if i == 16:
-                start = (int(lm.landmark[13].x * w),
-                         int(lm.landmark[13].y * h))
-                end = (int(lm.landmark[17].x * w),
-                       int(lm.landmark[17].y * h))
-                cv2.line(img, start, end, color, thickness)
-
-            if 16 < i < 20:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-            if i == 17:
-                start = (int(lm.landmark[17].x * w),
-                         int(lm.landmark[17].y * h))
-                end = (int(lm.landmark[0].x * w),
-                       int(lm.landmark[0].y * h))
-                cv2.line(img, start, end, color, thickness)
+        self.draw(thickness, color, img=img)
 
     def get_pinch_pos(self):
         tx, ty = 0, 0
+        self.draw()
         for hand_landmarks in self.landmarks:
-            self.draw()
             for i, lm in enumerate(hand_landmarks.landmark):
                 h, w, c = self.img.shape
                 cx, cy = int(lm.x * w), int(lm.y * h)
@@ -286,6 +588,16 @@ class Hands:
                     elif length > self.pinch_length_open and self.is_pinching:
                         self.is_pinching = False
 
+    def apply_events(self, events, pinching=False):
+        # Pinches recognized by hand_tracking.py's GestureEngine instead of
+        # the pinch_length thresholds: a click where each pinch starts.
+        if self.landmarks:
+            self.draw()
+        self.is_pinching = pinching
+        for event in events:
+            if event.name == 'pinch' and event.type == 'start':
+                self.pinch_pos = (event.x, event.y)
+
     def is_pinched_inside(self, r):
         x, y = self.pinch_pos
         if r.x < x < r.x + r.width and r.y < y < r.y + r.height:
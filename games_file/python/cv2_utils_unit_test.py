@@ -0,0 +1,188 @@
+import os
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from games_file.python.cv2_utils import (HandService, Hands, HitGrid, Label,
+                                         Rectangle, Scene, SpriteCache,
+                                         sprite_cache)
+from hand_tracking.hand_tracking_lib.gestures import GestureEvent
+from hand_tracking.hand_tracking_lib.landmarks import HandLandmarks
+from hand_tracking.hand_tracking_lib.landmarks_unit_test import (
+    make_results, straight_hand)
+from hand_tracking.hand_tracking_lib.service import HandPublisher
+
+
+class TestSpriteCache(unittest.TestCase):
+    def test_least_recently_used_sprite_is_evicted(self):
+        cache = SpriteCache(max_size=2)
+        cache.get('a', lambda: 1)
+        cache.get('b', lambda: 2)
+        cache.get('a', lambda: 1)
+        cache.get('c', lambda: 3)
+        self.assertEqual(list(cache.sprites), ['a', 'c'])
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_cached_draw_matches_direct_drawing(self):
+        for rect in (Rectangle(40, 30, 150, 200, text="7"),
+                     Rectangle(-20, -10, 120, 60, text="Comment jouer"),
+                     Rectangle(0, 0, 320, 240, (0, 0, 0), corner_radius=0),
+                     Rectangle(50, 50, 100, 100, thickness=3)):
+            rect.is_clicked = True
+            expected = np.full((240, 320, 3), 80, np.uint8)
+            actual = expected.copy()
+            rect.rasterize(expected, rect.x, rect.y)
+            rect.draw(actual)
+            np.testing.assert_array_equal(actual, expected)
+
+    def test_state_change_uses_a_new_sprite(self):
+        card = Rectangle(0, 0, 150, 200, text="1")
+        first = sprite_cache.get(card.sprite_key(), card.render)
+        card.color = (0, 200, 0)
+        self.assertIsNot(sprite_cache.get(card.sprite_key(), card.render),
+                         first)
+
+
+class TestScene(unittest.TestCase):
+    def setUp(self):
+        self.cards = [Rectangle(20 + i * 60, 40, 50, 80, text=str(i))
+                      for i in range(5)]
+        self.title = Label("Memo", 10, 30)
+        self.scene = Scene(320, 160)
+        self.scene.add(self.title, *self.cards)
+
+    def full_redraw(self):
+        img = np.zeros((160, 320, 3), np.uint8)
+        self.title.draw(img)
+        for card in self.cards:
+            card.draw(img)
+        return img
+
+    def test_render_matches_full_redraw(self):
+        img = np.full((160, 320, 3), 255, np.uint8)
+        self.scene.render(img)
+        np.testing.assert_array_equal(img, self.full_redraw())
+
+    def test_only_changed_widgets_are_redrawn(self):
+        img = np.zeros((160, 320, 3), np.uint8)
+        self.scene.render(img)
+        self.scene.redraws = 0
+        self.scene.render(img)
+        self.assertEqual(self.scene.redraws, 0)
+
+        self.cards[2].is_clicked = True
+        self.cards[4].visible = False
+        self.scene.render(img)
+        self.assertLess(self.scene.redraws, len(self.scene.widgets))
+        np.testing.assert_array_equal(img, self.full_redraw())
+
+
+class TestHitGrid(unittest.TestCase):
+    def test_matches_is_pinched_inside(self):
+        rng = np.random.default_rng(1)
+        widgets = [Rectangle(int(x), int(y), 150, 200)
+                   for x, y in rng.integers(0, 1000, (30, 2))]
+        grid = HitGrid(1280, 720, cell=50)
+        for widget in widgets:
+            grid.add(widget)
+        hands = Hands(SimpleNamespace(multi_hand_landmarks=None), None)
+        for x, y in rng.integers(0, 1280, (500, 2)):
+            hands.pinch_pos = (int(x), int(y % 720))
+            inside = [w for w in widgets if hands.is_pinched_inside(w)]
+            expected = inside[-1] if inside else None
+            self.assertIs(grid.hit(*hands.pinch_pos), expected)
+
+    def test_hidden_and_removed_widgets_are_not_hit(self):
+        grid = HitGrid(640, 480)
+        below = grid.add(Rectangle(10, 10, 100, 100))
+        above = grid.add(Rectangle(50, 50, 100, 100))
+        self.assertIs(grid.hit(60, 60), above)
+        above.visible = False
+        self.assertIs(grid.hit(60, 60), below)
+        grid.remove(below)
+        self.assertIsNone(grid.hit(60, 60))
+        # Edges are outside, like Hands.is_pinched_inside.
+        self.assertIsNone(grid.hit(50, 120))
+
+    def test_dispatch_calls_the_widget_callback(self):
+        grid = HitGrid(640, 480)
+        pinched = []
+        card = grid.add(Rectangle(0, 0, 100, 100), pinched.append)
+        button = grid.add(Rectangle(200, 0, 100, 100))
+        self.assertIs(grid.dispatch((20, 20)), card)
+        self.assertIs(grid.dispatch((220, 20)), button)
+        self.assertIsNone(grid.dispatch((0, 0)))
+        self.assertEqual(pinched, [card])
+
+    def test_values_are_keyed_by_value(self):
+        # Numbers beyond the small ints CPython caches are distinct
+        # objects of equal value.
+        grid = HitGrid(640, 480)
+        pinched = []
+        grid.add(int('1000'), pinched.append, bounds=(0, 0, 40, 40))
+        self.assertEqual(grid.dispatch((20, 20)), 1000)
+        self.assertEqual(pinched, [1000])
+        grid.remove(int('1000'))
+        self.assertIsNone(grid.hit(20, 20))
+
+
+class TestHandService(unittest.TestCase):
+    def setUp(self):
+        # The service side lives in the hand tracking library: this checks
+        # both copies of the shared memory layout agree.
+        name = "theraduty_game_test_%d" % os.getpid()
+        self.publisher = HandPublisher((48, 64, 3), max_hands=1, name=name)
+        self.service = HandService(name, timeout=0.01)
+
+    def tearDown(self):
+        self.service.close()
+        self.publisher.close()
+
+    def test_no_frame_without_the_service_publishing(self):
+        self.assertEqual(self.service.read(), (False, None))
+
+    def test_frames_and_landmarks_come_from_the_service(self):
+        landmarks = HandLandmarks(1).update(
+            make_results([straight_hand(0.3)], ["Right"]), (48, 64, 3))
+        self.publisher.write_frame(np.full((48, 64, 3), 3, np.uint8))
+        self.publisher.publish(landmarks, 1.0, True, (5, 6))
+        ok, img = self.service.read()
+        self.assertTrue(ok)
+        self.assertTrue((img == 3).all())
+        self.assertEqual(self.service.pinch_pos, (5, 6))
+        results = self.service.process(img)
+        self.assertEqual(len(results.multi_hand_landmarks), 1)
+        tip = results.multi_hand_landmarks[0].landmark[8]
+        self.assertAlmostEqual(tip.x, float(landmarks.norm[0, 8, 0]))
+        self.assertAlmostEqual(tip.y, float(landmarks.norm[0, 8, 1]))
+
+    def test_pinches_come_from_the_service_events(self):
+        landmarks = HandLandmarks(1).update(
+            make_results([straight_hand(0.3)], ["Right"]), (48, 64, 3))
+        start = GestureEvent('pinch', 'start', 0, 32, 12, 1.0)
+        self.publisher.write_frame(np.zeros((48, 64, 3), np.uint8))
+        self.publisher.publish(landmarks, 1.0, True, (32, 12),
+                               [GestureEvent('grab', 'start', 0, 1, 1, 1.0),
+                                start])
+        ok, img = self.service.read()
+        self.assertTrue(ok)
+        self.assertEqual(self.service.events[-1], start)
+        self.assertEqual(self.service.scale(32, 12, (128, 96)), (64, 24))
+
+        hands = Hands(self.service.process(img), img)
+        hands.apply_events(self.service.events, self.service.pinch)
+        self.assertTrue(hands.is_pinching)
+        self.assertEqual(hands.pinch_pos, (32, 12))
+
+        # Held: still pinching, but no new click.
+        self.publisher.publish(landmarks, 2.0, True, (32, 12))
+        ok, img = self.service.read()
+        hands = Hands(self.service.process(img), img)
+        hands.apply_events(self.service.events, self.service.pinch)
+        self.assertTrue(hands.is_pinching)
+        self.assertEqual(hands.pinch_pos, (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
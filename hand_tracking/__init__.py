@@ -1 +1 @@
-from hand_tracking_lib import *
+from .hand_tracking_lib import *
@@ -1,28 +1,170 @@
+import argparse
+import sys
+
+from hand_tracking_lib.capture import BACKENDS, parse_resolution
 from hand_tracking_lib.cv2_utils import *
+from hand_tracking_lib.display import (HeadlessDisplay, KeyScript, Window,
+                                       open_sink)
+from hand_tracking_lib.emission import EmissionPolicy
+from hand_tracking_lib.eventlog import LEVELS, event_log, parse_sampling
+from hand_tracking_lib.gestures import (DEFAULT_GESTURES, PINCH,
+                                        GestureEngine, pinch_gesture)
+from hand_tracking_lib.metrics import Metrics
+from hand_tracking_lib.prediction import PinchPredictor
+from hand_tracking_lib.recording import FrameRecorder, ReplayCamera
+from hand_tracking_lib.scheduler import InferenceScheduler
+from hand_tracking_lib.sender import get_sender
+from hand_tracking_lib.service import HandPublisher
+from hand_tracking_lib.tracker import HandTracker
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('server_url', nargs='?',
+                        default="http://127.0.0.1:8080",
+                        help="http://..., udp://host:port or unix:///path")
+    parser.add_argument('--record', metavar='PATH',
+                        help="save the camera frames to PATH.mkv/.npy")
+    parser.add_argument('--replay', metavar='PATH',
+                        help="read a recorded session instead of the camera")
+    parser.add_argument('--fast', action='store_true',
+                        help="replay as fast as possible")
+    parser.add_argument('--camera', default='0',
+                        help="camera index or device path, video file, "
+                             "image directory or synthetic:WxH@FPS")
+    parser.add_argument('--camera-size', metavar='WxH', default='800x600',
+                        type=parse_resolution)
+    parser.add_argument('--camera-fps', type=float, default=24)
+    parser.add_argument('--camera-fourcc', metavar='FOURCC',
+                        help="e.g. MJPG or YUYV, see hand_tracking_lib.probe")
+    parser.add_argument('--camera-backend', choices=sorted(BACKENDS))
+    parser.add_argument('--camera-buffer', type=int, default=1,
+                        help="frames queued in the driver")
+    parser.add_argument('--debug', action='store_true',
+                        help="show the camera window")
+    parser.add_argument('--headless', action='store_true',
+                        help="no window and no GUI events, see --sink")
+    parser.add_argument('--sink', default='null',
+                        help="where --headless --debug frames go: null, "
+                             "file:PATH or shm[:NAME]")
+    parser.add_argument('--keys', metavar='FRAME:KEY,...', default='',
+                        help="keys pressed in --headless, e.g. 300:q")
+    parser.add_argument('--pinch-on', type=float,
+                        default=PINCH.conditions[0].on,
+                        help="thumb to index distance, in hand sizes (wrist "
+                             "to middle finger MCP), under which a pinch "
+                             "starts; the former fixed 190 px was about "
+                             "1.3 to 1.6 with the hand a fifth of the frame "
+                             "high")
+    parser.add_argument('--pinch-off', type=float,
+                        default=PINCH.conditions[0].off,
+                        help="distance, in hand sizes, over which it ends")
+    parser.add_argument('--metrics', action='store_true',
+                        help="time every stage, with an overlay in --debug")
+    parser.add_argument('--metrics-port', type=int,
+                        help="serve the stage timings as JSON on this port")
+    parser.add_argument('--metrics-dump', metavar='PATH',
+                        help="write the stage timings to PATH every 5 s")
+    parser.add_argument('--log-level', choices=sorted(LEVELS),
+                        default='info')
+    parser.add_argument('--log-sample', metavar='CAT=N,...', default='',
+                        help="keep one event in N of these categories")
+    args = parser.parse_args(argv)
+    if not 0 < args.pinch_on < args.pinch_off:
+        parser.error("--pinch-on must be positive and under --pinch-off")
+    return args
 
 
 def main():
-    debug = False
-    # Initialize the camera
-    camera = Camera()
+    args = parse_args(sys.argv[1:])
+    debug = args.debug
+    server_url = args.server_url
+    event_log.level = LEVELS[args.log_level]
+    event_log.sampling.update(parse_sampling(args.log_sample))
+    metrics = Metrics(enabled=bool(args.metrics or args.metrics_port or
+                                   args.metrics_dump))
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    if args.metrics_dump:
+        metrics.dump_every(args.metrics_dump)
+    if metrics.enabled:
+        get_sender(server_url).metrics = metrics
+    # Initialize the camera. Frames stay unflipped: the landmarks are
+    # mirrored instead, and pixels only when a frame is shown.
+    if args.replay:
+        camera = ReplayCamera(args.replay, realtime=not args.fast,
+                              mirror_pixels=False)
+    else:
+        recorder = FrameRecorder(args.record) if args.record else None
+        camera = Camera(threaded=True, recorder=recorder,
+                        mirror_pixels=False, device=args.camera,
+                        resolution=args.camera_size,
+                        framerate=args.camera_fps,
+                        fourcc=args.camera_fourcc,
+                        backend=args.camera_backend,
+                        buffer_size=args.camera_buffer)
+    event_log.info('camera', **camera.settings)
 
     is_running = True
-    detector = HandDetector()
+    detector = HandDetector(roi_tracking=True, inference_size=320,
+                            scheduler=InferenceScheduler(), mirror=True)
+    if args.headless:
+        display = HeadlessDisplay(open_sink(args.sink),
+                                  KeyScript(args.keys))
+    else:
+        display = Window('Game DEBUG')
+    # Per-hand state, for as many hands as the detector finds.
+    hands = detector.max_num_hands
+    policy = EmissionPolicy(max_hands=hands)
+    predictor = PinchPredictor()
+    engine = GestureEngine([pinch_gesture(args.pinch_on, args.pinch_off)] +
+                           [g for g in DEFAULT_GESTURES if g is not PINCH],
+                           max_hands=hands)
+    tracker = HandTracker(max_hands=hands)
+    # Games read frames, landmarks and pinches from here instead of
+    # opening the camera and running their own detector.
+    img, rgb = camera.read_frames()
+    publisher = HandPublisher(img.shape, max_hands=hands)
 
-    while is_running:
-        img = camera.get_rgb_img()
-        hand = Hands(detector, img)
-        hand.pinch_length = 190
-        hand.get_pinch_pos()
+    # img is None at the end of a replayed session. The loop waits for the
+    # next camera frame, or hands the latest one out again after a second
+    # without any: only new frames are detected and published.
+    last_seq = None
+    while is_running and img is not None:
+        if camera.frame_seq != last_seq:
+            last_seq = camera.frame_seq
+            metrics.frame()
+            with metrics.span('publish_frame'):
+                publisher.write_frame(img, mirror=True)
+            with metrics.span('detect'):
+                hand = Hands(detector, None, camera.frame_time, tracker, rgb)
+            with metrics.span('gesture'):
+                hand.get_pinch_pos(server_url=server_url, policy=policy,
+                                   predictor=predictor, engine=engine)
+                for event in engine.events:
+                    event_log.info('gesture', **event._asdict())
+            with metrics.span('publish'):
+                publisher.publish(hand.landmarks, hand.timestamp,
+                                  hand.is_pinching, hand.pinch_pos,
+                                  engine.events)
 
-        if debug:
-            cv2.imshow('Game DEBUG', img)
+            if debug:
+                with metrics.span('show'):
+                    shown = camera.display(img)
+                    hand.draw(img=shown)
+                    metrics.draw_overlay(shown)
+                    display.show(shown)
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if display.poll() == ord('q'):
             is_running = False
+        with metrics.span('capture'):
+            img, rgb = camera.read_frames(wait_new=True)
 
+    metrics.close()
+    event_log.close()
+    publisher.close()
     camera.close()
-    cv2.destroyAllWindows()
+    display.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+
+from .cv2_utils import HandDetector, Hands
+from .display import HeadlessDisplay
+from .emission import EmissionPolicy
+from .gestures import GestureEngine
+from .recording import ReplayCamera
+from .scheduler import InferenceScheduler
+from .sender import LandmarkSender
+from .service import HandPublisher
+from .tracker import HandTracker
+
+# Headless end-to-end benchmark: replays a recorded session (see
+# recording.py) through the hand_tracking.py loop and through every memo
+# screen, without camera or window.
+#   python -m hand_tracking_lib.benchmark SESSION --output run.json
+#   python -m hand_tracking_lib.benchmark SESSION --baseline run.json
+
+MEMO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                        '..', 'games_file', 'python', 'alzheimer')
+MEMO_SCREENS = ['menu', 'how_to_play', 'launch_game', 'win']
+
+
+class StopBenchmark(Exception):
+    pass
+
+
+class StageTimer:
+    def __init__(self, frames):
+        self.frames = frames
+        self.samples = defaultdict(list)
+        # Bytes allocated on top of what was live at the frame start, only
+        # measured while tracemalloc is tracing.
+        self.allocated = []
+        self.reset()
+
+    def reset(self):
+        self.frame = 0
+        self.samples.clear()
+        self.allocated.clear()
+        self._frame_start = None
+        self._frame_memory = 0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - start)
+
+    def next_frame(self):
+        # Closes the running frame and opens the next one; raises
+        # StopBenchmark once the requested number of frames is done.
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.samples['frame'].append(now - self._frame_start)
+            if tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                self.allocated.append(peak - self._frame_memory)
+        if self.frame == self.frames:
+            raise StopBenchmark
+        self.frame += 1
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._frame_memory = tracemalloc.get_traced_memory()[0]
+        self._frame_start = time.perf_counter()
+
+    def summary(self):
+        stages = {}
+        for name, samples in self.samples.items():
+            ms = 1000 * np.array(samples)
+            stages[name] = {'mean_ms': float(ms.mean()),
+                            'p50_ms': float(np.percentile(ms, 50)),
+                            'p95_ms': float(np.percentile(ms, 95)),
+                            'p99_ms': float(np.percentile(ms, 99))}
+        frame = self.samples.get('frame')
+        result = {'frames': len(frame) if frame else 0,
+                  'fps': len(frame) / sum(frame) if frame else 0.0,
+                  'stages': stages}
+        if self.allocated:
+            result['alloc_kib_per_frame'] = \
+                float(np.mean(self.allocated)) / 1024
+        return result
+
+
+def measure(run, frames, alloc_frames):
+    # Timing and allocations come from two passes: tracemalloc slows
+    # every allocation down and would skew the latencies.
+    timer = StageTimer(frames)
+    run(timer)
+    result = timer.summary()
+    if alloc_frames:
+        timer = StageTimer(alloc_frames)
+        tracemalloc.start()
+        try:
+            run(timer)
+        finally:
+            tracemalloc.stop()
+        result['alloc_kib_per_frame'] = \
+            timer.summary().get('alloc_kib_per_frame', 0.0)
+    return result
+
+
+class TimedSender:
+    def __init__(self, sender, timer):
+        self.sender = sender
+        self.timer = timer
+
+    def send(self, data):
+        with self.timer.stage('send'):
+            self.sender.send(data)
+
+
+def bench_tracking(camera, detector, sender, timer):
+    # Same steps as hand_tracking.py's loop, unflipped frames and mirrored
+    # landmarks included. 'send' is nested in 'gesture'.
+    hands = detector.max_num_hands
+    policy = EmissionPolicy(max_hands=hands)
+    engine = GestureEngine(max_hands=hands)
+    tracker = HandTracker(max_hands=hands)
+    publisher = None
+    sender = TimedSender(sender, timer)
+    mirror_pixels, camera.mirror_pixels = camera.mirror_pixels, False
+    mirror, detector.mirror = detector.mirror, True
+    try:
+        while True:
+            timer.next_frame()
+            with timer.stage('capture'):
+                frame = camera.read_latest()
+            with timer.stage('convert'):
+                img, rgb = camera.convert(frame)
+            if publisher is None:
+                publisher = HandPublisher(
+                    img.shape, max_hands=hands,
+                    name="theraduty_bench_%d" % os.getpid())
+            with timer.stage('publish_frame'):
+                publisher.write_frame(img, mirror=True)
+            with timer.stage('detect'):
+                hand = Hands(detector, None, camera.frame_time, tracker, rgb)
+            with timer.stage('gesture'):
+                hand.get_pinch_pos(sender=sender, policy=policy,
+                                   engine=engine)
+            with timer.stage('publish'):
+                publisher.publish(hand.landmarks, hand.timestamp,
+                                  hand.is_pinching, hand.pinch_pos,
+                                  engine.events)
+    except StopBenchmark:
+        pass
+    finally:
+        camera.mirror_pixels = mirror_pixels
+        detector.mirror = mirror
+        if publisher is not None:
+            publisher.close()
+
+
+def load_memo():
+    if MEMO_DIR not in sys.path:
+        sys.path.append(MEMO_DIR)
+    import memo
+    return memo
+
+
+def bench_memo_screen(memo, screen, camera, hands_detector, timer):
+    # Runs one memo screen on replayed frames. The screens own their loop,
+    # so a frame ends whenever they ask the camera for the next one. When
+    # a pinch leaves the screen, it is simply entered again.
+    class TimedCamera:
+        def read_frames(self, wait_new=False):
+            timer.next_frame()
+            with timer.stage('capture'):
+                return camera.read_frames(wait_new)
+
+    class TimedDetector:
+        def process(self, img):
+            with timer.stage('detect'):
+                return hands_detector.process(img)
+
+    class TimedScene(memo.Scene):
+        def render(self, img):
+            with timer.stage('render'):
+                return super().render(img)
+
+    class BenchApp(memo.App):
+        def track(self, img, canvas):
+            # 'detect' is nested in 'track'.
+            with timer.stage('track'):
+                return super().track(img, canvas)
+
+    scene = memo.Scene
+    memo.Scene = TimedScene
+    try:
+        # Headless: no window and no GUI events to pump.
+        app = BenchApp(TimedCamera(), TimedDetector(),
+                       HeadlessDisplay())
+        # Not the App's own warm-up frame.
+        timer.reset()
+        while True:
+            app.wait_release = True
+            getattr(memo, screen)(app)
+    except StopBenchmark:
+        pass
+    finally:
+        memo.Scene = scene
+
+
+def compare(results, baseline, tolerance=0.15):
+    # Latencies that got slower than the baseline by more than tolerance.
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if base is None:
+            continue
+        for stage, stats in result['stages'].items():
+            before = base['stages'].get(stage)
+            if before is None:
+                continue
+            for key in ('p50_ms', 'p95_ms'):
+                if stats[key] > before[key] * (1 + tolerance):
+                    regressions.append("%s %s %s: %.2f -> %.2f" % (
+                        name, stage, key, before[key], stats[key]))
+        if result['fps'] < base['fps'] * (1 - tolerance):
+            regressions.append("%s fps: %.1f -> %.1f" % (
+                name, base['fps'], result['fps']))
+    return regressions
+
+
+def run(session, frames=300, alloc_frames=100, server_url=None,
+        only=None):
+    results = {'session': session, 'frames': frames, 'benchmarks': {}}
+    camera = ReplayCamera(session, realtime=False, loop=True)
+    try:
+        if only in (None, 'tracking'):
+            detector = HandDetector(roi_tracking=True, inference_size=320,
+                                    scheduler=InferenceScheduler())
+            sender = LandmarkSender(server_url or "udp://127.0.0.1:8091")
+            results['benchmarks']['tracking'] = measure(
+                lambda timer: bench_tracking(camera, detector, sender,
+                                             timer),
+                frames, alloc_frames)
+            sender.close()
+        if only in (None, 'memo'):
+            memo = load_memo()
+            for screen in MEMO_SCREENS:
+                hands_detector = memo.App.create_detector()
+                results['benchmarks']['memo.' + screen] = measure(
+                    lambda timer: bench_memo_screen(memo, screen, camera,
+                                                    hands_detector, timer),
+                    frames, alloc_frames)
+                hands_detector.close()
+    finally:
+        camera.close()
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="hand_tracking_lib.benchmark")
+    parser.add_argument('session', help="recorded session (PATH.mkv/.npy)")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--alloc-frames', type=int, default=100,
+                        help="frames of the allocation pass, 0 to skip it")
+    parser.add_argument('--only', choices=['tracking', 'memo'])
+    parser.add_argument('--server-url',
+                        help="where the tracking loop sends positions")
+    parser.add_argument('--output', help="write the results to this file")
+    parser.add_argument('--baseline', help="results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    results = run(args.session, args.frames, args.alloc_frames,
+                  args.server_url, args.only)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION:", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hand_tracking.hand_tracking_lib import benchmark
+from hand_tracking.hand_tracking_lib.cv2_utils_unit_test import (
+    FakeGraph, make_detector)
+from hand_tracking.hand_tracking_lib.recording import (FrameRecorder,
+                                                       ReplayCamera)
+
+
+class ListSender:
+    def __init__(self):
+        self.messages = []
+
+    def send(self, data):
+        self.messages.append(data)
+
+
+class TestStageTimer(unittest.TestCase):
+    def test_frames_stop_at_the_requested_count(self):
+        timer = benchmark.StageTimer(3)
+        with self.assertRaises(benchmark.StopBenchmark):
+            while True:
+                timer.next_frame()
+                with timer.stage('work'):
+                    pass
+        summary = timer.summary()
+        self.assertEqual(summary['frames'], 3)
+        self.assertEqual(len(timer.samples['work']), 3)
+        self.assertGreater(summary['fps'], 0)
+        self.assertEqual(set(summary['stages']['work']),
+                         {'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'})
+
+    def test_compare_reports_slower_stages(self):
+        def result(p50, fps):
+            return {'benchmarks': {'tracking': {
+                'fps': fps, 'stages': {'detect': {'p50_ms': p50,
+                                                  'p95_ms': p50}}}}}
+        self.assertEqual(benchmark.compare(result(10.5, 30),
+                                           result(10, 30)), [])
+        regressions = benchmark.compare(result(20, 15), result(10, 30))
+        self.assertEqual(len(regressions), 3)
+
+
+class TestPipelines(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "session")
+        recorder = FrameRecorder(path)
+        for i in range(3):
+            recorder.write(np.zeros((480, 640, 3), np.uint8), i / 30)
+        recorder.close()
+        self.camera = ReplayCamera(path, realtime=False, loop=True)
+        self.graph = FakeGraph((300, 200, 380, 300), (640, 480))
+
+    def tearDown(self):
+        self.camera.close()
+        self.tmp.cleanup()
+
+    def test_tracking_loop(self):
+        sender = ListSender()
+        result = benchmark.measure(
+            lambda timer: benchmark.bench_tracking(
+                self.camera, make_detector(self.graph), sender, timer),
+            frames=5, alloc_frames=2)
+        self.assertEqual(result['frames'], 5)
+        for stage in ('capture', 'convert', 'detect', 'gesture', 'send',
+                      'publish'):
+            self.assertIn(stage, result['stages'])
+        self.assertIn('alloc_kib_per_frame', result)
+        self.assertTrue(sender.messages)
+
+    def test_memo_screen(self):
+        memo = benchmark.load_memo()
+        timer = benchmark.StageTimer(4)
+        benchmark.bench_memo_screen(memo, 'menu', self.camera, self.graph,
+                                    timer)
+        result = timer.summary()
+        self.assertEqual(result['frames'], 4)
+        for stage in ('capture', 'render', 'track', 'detect'):
+            self.assertEqual(len(timer.samples[stage]), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
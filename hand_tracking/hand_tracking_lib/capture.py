@@ -0,0 +1,59 @@
+import cv2
+
+# Opening and configuring the camera. Drivers take the requested mode as a
+# hint: negotiate() asks for it and returns what was actually granted, as
+# read back from the capture.
+
+BACKENDS = {'any': cv2.CAP_ANY, 'v4l2': cv2.CAP_V4L2,
+            'dshow': cv2.CAP_DSHOW, 'msmf': cv2.CAP_MSMF,
+            'avfoundation': cv2.CAP_AVFOUNDATION,
+            'gstreamer': cv2.CAP_GSTREAMER}
+
+
+def fourcc_to_str(value):
+    value = int(value)
+    text = ''.join(chr((value >> 8 * i) & 0xFF) for i in range(4))
+    return text if text.isprintable() and value else ''
+
+
+def open_capture(device=0, backend=None):
+    if backend is None:
+        return cv2.VideoCapture(device)
+    return cv2.VideoCapture(device, BACKENDS.get(backend, backend))
+
+
+def negotiate(capture, resolution=None, framerate=None, fourcc=None,
+              buffer_size=None):
+    # V4L2 picks the frame sizes and rates offered for the current pixel
+    # format, so the format goes first, then the size, then the rate.
+    if fourcc:
+        capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    if resolution:
+        capture.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+        capture.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+    if framerate:
+        capture.set(cv2.CAP_PROP_FPS, framerate)
+    if buffer_size is not None:
+        # Frames queued in the driver are frames of latency; not every
+        # backend lets this change.
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return get_settings(capture)
+
+
+def get_settings(capture):
+    try:
+        backend = capture.getBackendName()
+    except cv2.error:
+        backend = ''
+    return {'width': int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': float(capture.get(cv2.CAP_PROP_FPS)),
+            'fourcc': fourcc_to_str(capture.get(cv2.CAP_PROP_FOURCC)),
+            'buffer_size': int(capture.get(cv2.CAP_PROP_BUFFERSIZE)),
+            'backend': backend}
+
+
+def parse_resolution(text):
+    # "640x480" -> (640, 480)
+    width, height = text.lower().split('x')
+    return int(width), int(height)
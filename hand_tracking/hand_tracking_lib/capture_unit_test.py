@@ -0,0 +1,98 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from hand_tracking.hand_tracking_lib.capture import (fourcc_to_str,
+                                                     negotiate,
+                                                     parse_resolution)
+
+
+class FakeDriver:
+    # A camera with a few modes: requests snap to the closest one of the
+    # current pixel format, as V4L2 does.
+    MODES = {'MJPG': [(640, 480, 30.0), (1280, 720, 30.0)],
+             'YUYV': [(640, 480, 30.0), (1280, 720, 10.0)]}
+
+    def __init__(self):
+        self.props = {cv2.CAP_PROP_FOURCC: cv2.VideoWriter_fourcc(*'YUYV'),
+                      cv2.CAP_PROP_FRAME_WIDTH: 640,
+                      cv2.CAP_PROP_FRAME_HEIGHT: 480,
+                      cv2.CAP_PROP_FPS: 30.0,
+                      cv2.CAP_PROP_BUFFERSIZE: 4}
+        self.calls = []
+        self.reads = 0
+
+    def set(self, prop, value):
+        self.calls.append(prop)
+        if prop == cv2.CAP_PROP_FOURCC:
+            if fourcc_to_str(value) not in self.MODES:
+                return False
+        self.props[prop] = value
+        modes = self.MODES[fourcc_to_str(self.props[cv2.CAP_PROP_FOURCC])]
+        w, h, fps = min(modes, key=lambda m: (
+            abs(m[0] - self.props[cv2.CAP_PROP_FRAME_WIDTH]) +
+            abs(m[1] - self.props[cv2.CAP_PROP_FRAME_HEIGHT])))
+        self.props[cv2.CAP_PROP_FRAME_WIDTH] = w
+        self.props[cv2.CAP_PROP_FRAME_HEIGHT] = h
+        self.props[cv2.CAP_PROP_FPS] = min(self.props[cv2.CAP_PROP_FPS],
+                                           fps) or fps
+        return True
+
+    def get(self, prop):
+        return self.props.get(prop, 0)
+
+    def getBackendName(self):
+        return 'FAKE'
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        self.reads += 1
+        w = int(self.props[cv2.CAP_PROP_FRAME_WIDTH])
+        h = int(self.props[cv2.CAP_PROP_FRAME_HEIGHT])
+        return True, np.zeros((h, w, 3), np.uint8)
+
+    def release(self):
+        pass
+
+
+class TestNegotiate(unittest.TestCase):
+    def test_reports_the_granted_mode(self):
+        driver = FakeDriver()
+        settings = negotiate(driver, (1280, 720), 30, 'MJPG', buffer_size=1)
+        self.assertEqual(settings, {'width': 1280, 'height': 720,
+                                    'fps': 30.0, 'fourcc': 'MJPG',
+                                    'buffer_size': 1, 'backend': 'FAKE'})
+
+        # YUYV has no 1280x720 at 30 FPS on this camera.
+        settings = negotiate(FakeDriver(), (1280, 720), 30, 'YUYV')
+        self.assertEqual((settings['fourcc'], settings['fps']),
+                         ('YUYV', 10.0))
+
+    def test_format_is_set_before_size_and_rate(self):
+        driver = FakeDriver()
+        negotiate(driver, (640, 480), 30, 'MJPG', buffer_size=1)
+        self.assertEqual(driver.calls, [cv2.CAP_PROP_FOURCC,
+                                        cv2.CAP_PROP_FRAME_WIDTH,
+                                        cv2.CAP_PROP_FRAME_HEIGHT,
+                                        cv2.CAP_PROP_FPS,
+                                        cv2.CAP_PROP_BUFFERSIZE])
+
+    def test_nothing_requested_keeps_the_driver_defaults(self):
+        driver = FakeDriver()
+        settings = negotiate(driver)
+        self.assertEqual(driver.calls, [])
+        self.assertEqual((settings['width'], settings['fourcc']),
+                         (640, 'YUYV'))
+
+    def test_helpers(self):
+        self.assertEqual(fourcc_to_str(cv2.VideoWriter_fourcc(*'MJPG')),
+                         'MJPG')
+        self.assertEqual(fourcc_to_str(0), '')
+        self.assertEqual(parse_resolution('1280X720'), (1280, 720))
+
+
+if __name__ == '__main__':
+    unittest.main()
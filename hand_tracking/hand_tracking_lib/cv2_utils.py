@@ -1,8 +1,16 @@
+import threading
 import time
 
 import cv2
 import mediapipe as mp
-import requests
+import numpy as np
+
+from .capture import negotiate
+from .eventlog import event_log
+from .frames import FramePool
+from .landmarks import HandLandmarks
+from .sender import get_sender
+from .sources import open_source
 
 
 def draw_rounded_rectangle(img, top_left, bottom_right, color, thickness,
@@ -84,31 +92,168 @@ def draw_rounded_shadow_rectangle(img, top_left, bottom_right, color, radius,
     draw_filled_rounded_rectangle(img, top_left, bottom_right, color, radius)
 
 
-def draw_line(lm, i, w, h):
-    start = (int(lm.landmark[i].x * w),
-             int(lm.landmark[i].y * h))
-    end = (int(lm.landmark[i + 1].x * w),
-           int(lm.landmark[i + 1].y * h))
-    return start, end
+# Bones of the hand skeleton as pairs of MediaPipe landmark indices.
+HAND_BONES = np.array([(0, 1), (1, 2), (2, 3), (3, 4),
+                       (1, 5), (5, 6), (6, 7), (7, 8),
+                       (5, 9), (9, 10), (10, 11), (11, 12),
+                       (9, 13), (13, 14), (14, 15), (15, 16),
+                       (13, 17), (17, 18), (18, 19), (19, 20),
+                       (17, 0)], np.int32)
+
+
+def draw_hands(img, landmarks, thickness=20, color=(0, 255, 0),
+               joint_radius=0, joint_color=(0, 0, 255)):
+    if not landmarks:
+        return img
+    xy = landmarks.hands[:, :, :2].astype(np.int32)
+    # Every bone of every hand in a single polylines call.
+    cv2.polylines(img, xy[:, HAND_BONES].reshape(-1, 2, 2), False, color,
+                  thickness)
+    if joint_radius:
+        # Zero-length segments render as round dots of the line thickness.
+        joints = np.repeat(xy.reshape(-1, 1, 2), 2, axis=1)
+        cv2.polylines(img, joints, False, joint_color, joint_radius * 2)
+    return img
 
 
 class Camera:
-    def __init__(self):
-        self.camera = cv2.VideoCapture(0)
-        self.resolution = (800, 600)
-        self.framerate = 24
-        self.camera.set(3, 940)
+    def __init__(self, threaded=False, recorder=None, mirror_pixels=True,
+                 device=0, resolution=(800, 600), framerate=24, fourcc=None,
+                 backend=None, buffer_size=1):
+        # device: a camera index or any spec of sources.open_source(),
+        # such as a video file or "synthetic:640x480@30". fourcc: 'MJPG',
+        # 'YUYV'...; backend: a key of capture.BACKENDS. None keeps the
+        # driver's choice. settings holds what the driver actually
+        # granted.
+        self.camera = open_source(device, backend)
+        self.settings = negotiate(self.camera, resolution, framerate, fourcc,
+                                  buffer_size)
+        self.resolution = (self.settings['width'], self.settings['height'])
+        self.framerate = self.settings['fps']
+
+        # Threaded capture: a worker keeps overwriting a single "latest
+        # frame" slot so the main loop never waits on the sensor.
+        self.threaded = threaded
+        self.frame_seq = 0
+        self.frame_time = 0.0
+        self.dropped_frames = 0
+        self.last_dropped = 0
+        self._latest = None
+        self._latest_seq = 0
+        self._latest_time = 0.0
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._running = False
+        self._thread = None
+        # Frames are decoded, mirrored and converted into preallocated
+        # buffers. The worker never writes into the latest frame nor into
+        # the one the main loop is converting.
+        self.pool = FramePool()
+        self._latest_index = -1
+        self._reading = -1
+        self.rgb = None
+        # Without mirror_pixels, frames come unflipped: the detector then
+        # mirrors the landmarks (HandDetector(mirror=True)) and only the
+        # frames that are shown get flipped, with display().
+        self.mirror_pixels = mirror_pixels
+        # Optional FrameRecorder, fed every new frame the pipeline gets.
+        self.recorder = recorder
+        self._recorded_seq = 0
+        if threaded:
+            self.start()
 
     def __del__(self):
         self.close()
 
+    def start(self):
+        if self._thread is not None:
+            return
+        self.threaded = True
+        self.frame_seq = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop,
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
     def close(self):
+        self.stop()
         self.camera.release()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def _capture_loop(self):
+        while self._running:
+            with self._lock:
+                i = next(i for i in range(len(self.pool))
+                         if i not in (self._latest_index, self._reading))
+            ret, frame = self.pool.read(self.camera, i)
+            if not ret:
+                time.sleep(0.005)
+                continue
+            now = time.monotonic()
+            with self._lock:
+                self._latest = frame
+                self._latest_index = i
+                self._latest_seq += 1
+                self._latest_time = now
+                self._new_frame.notify_all()
+
+    def read_latest(self, timeout=1.0, wait_new=False):
+        # The first call waits until the worker has delivered a frame;
+        # afterwards the newest frame is returned as is, or with wait_new
+        # once a frame newer than frame_seq came (the same one again after
+        # timeout), so that a loop does not spin on a frame it already has.
+        with self._new_frame:
+            since = self.frame_seq if wait_new else 0
+            self._new_frame.wait_for(lambda: self._latest_seq > since,
+                                     timeout)
+            frame = self._latest
+            self._reading = self._latest_index
+            seq = self._latest_seq
+            timestamp = self._latest_time
+        if self.frame_seq and seq > self.frame_seq:
+            self.last_dropped = seq - self.frame_seq - 1
+        else:
+            self.last_dropped = 0
+        self.dropped_frames += self.last_dropped
+        self.frame_seq = seq
+        self.frame_time = timestamp
+        return frame
+
+    def convert(self, frame):
+        # (mirrored BGR frame to show, the same in RGB for the detector),
+        # both reused two calls later.
+        img, self.rgb = self.pool.convert(frame, self.mirror_pixels)
+        return img, self.rgb
+
+    def display(self, img):
+        # img from read_frames(), mirrored for showing.
+        return img if self.mirror_pixels else self.pool.mirror(img)
+
+    def read_frames(self, wait_new=False):
+        if self.threaded:
+            frame = self.read_latest(wait_new=wait_new)
+        else:
+            _, frame = self.pool.read(self.camera)
+            self.frame_seq += 1
+            self.frame_time = time.monotonic()
+        if self.recorder is not None and self.frame_seq != self._recorded_seq:
+            self.recorder.write(frame, self.frame_time)
+            self._recorded_seq = self.frame_seq
+        if frame is None:
+            return None, None
+        return self.convert(frame)
 
     def get_rgb_img(self):
-        _, frame = self.camera.read()
-        frame = cv2.flip(frame, 1)
-        return frame
+        # Despite the name, the mirrored BGR frame; its RGB twin is
+        # self.rgb.
+        return self.read_frames()[0]
 
 
 class Rectangle:
@@ -152,16 +297,57 @@ class Rectangle:
 
 class HandDetector:
     def __init__(self, static_image_mode=False, max_num_hands=2,
-                 min_detection_confidence=0.5, min_tracking_confidence=0.5):
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 roi_tracking=False, inference_size=None, roi_margin=0.3,
+                 full_frame_interval=30, scheduler=None, mirror=False):
         self.mp_hands = mp.solutions.hands
         self.hands_detector = self.mp_hands.Hands(
             static_image_mode=static_image_mode,
             max_num_hands=max_num_hands,
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence)
+        self.max_num_hands = max_num_hands
+        self.landmark_array = HandLandmarks(max_num_hands)
+
+        # ROI tracking: detection runs on a crop around the hands of the
+        # previous frame, optionally downscaled so its longest side is
+        # inference_size pixels. Landmarks are mapped back to the full
+        # frame, which is used again whenever the hands are lost.
+        self.roi_tracking = roi_tracking
+        self.inference_size = inference_size
+        self.roi_margin = roi_margin
+        self.full_frame_interval = full_frame_interval
+        self.roi = None
+        self.frames_since_full = 0
+        self.hand_count = 0
+
+        # Optional InferenceScheduler: skips detection on some frames and
+        # extrapolates the landmark array instead.
+        self.scheduler = scheduler
+
+        # mirror: the frames are not flipped (Camera(mirror_pixels=False)),
+        # the landmark array is mirrored instead. The ROI stays in frame
+        # coordinates.
+        self.mirror = mirror
 
     def find_hands(self, img, draw=False):
-        results = self.hands_detector.process(img)
+        h, w = img.shape[:2]
+        roi = self.roi
+        if roi is not None and self.frames_since_full >= \
+                self.full_frame_interval and \
+                self.hand_count < self.max_num_hands:
+            # Look for hands entering outside the ROI once in a while.
+            roi = None
+        results = self._process(img, roi)
+        if roi is not None and not results.multi_hand_landmarks:
+            roi = None
+            results = self._process(img, roi)
+        self.frames_since_full = 0 if roi is None else \
+            self.frames_since_full + 1
+        self.hand_count = len(results.multi_hand_landmarks or [])
+        if self.roi_tracking:
+            self.roi = self._next_roi(results, roi, w, h)
+
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
                 if draw:
@@ -170,193 +356,224 @@ class HandDetector:
                                                               self.mp_hands.HAND_CONNECTIONS)
         return results
 
+    def _process(self, img, roi):
+        h, w = img.shape[:2]
+        x1, y1, x2, y2 = roi if roi is not None else (0, 0, w, h)
+        crop = img[y1:y2, x1:x2]
+        if self.inference_size:
+            scale = self.inference_size / max(crop.shape[:2])
+            if scale < 1:
+                crop = cv2.resize(crop, (int(crop.shape[1] * scale),
+                                         int(crop.shape[0] * scale)),
+                                  interpolation=cv2.INTER_AREA)
+        results = self.hands_detector.process(crop)
+        if roi is not None and results.multi_hand_landmarks:
+            # Normalized crop coordinates back to the full frame; a plain
+            # downscale keeps normalized coordinates unchanged.
+            sx, sy = (x2 - x1) / w, (y2 - y1) / h
+            ox, oy = x1 / w, y1 / h
+            for hand_landmarks in results.multi_hand_landmarks:
+                for lm in hand_landmarks.landmark:
+                    lm.x = lm.x * sx + ox
+                    lm.y = lm.y * sy + oy
+                    lm.z = lm.z * sx
+        return results
+
+    def _next_roi(self, results, roi, w, h):
+        if not results.multi_hand_landmarks:
+            return None
+        xs = [lm.x for hand in results.multi_hand_landmarks
+              for lm in hand.landmark]
+        ys = [lm.y for hand in results.multi_hand_landmarks
+              for lm in hand.landmark]
+        bx1, by1 = min(xs) * w, min(ys) * h
+        bx2, by2 = max(xs) * w, max(ys) * h
+        # Keep the current ROI while the hands stay well inside it and
+        # fill a reasonable part of it, so the crop is stable from frame
+        # to frame.
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            pad = 0.5 * self.roi_margin * max(bx2 - bx1, by2 - by1)
+            inside = x1 <= bx1 - pad and y1 <= by1 - pad and \
+                bx2 + pad <= x2 and by2 + pad <= y2
+            large = (bx2 - bx1) * (by2 - by1) > 0.1 * (x2 - x1) * (y2 - y1)
+            if inside and large:
+                return roi
+        side = max(bx2 - bx1, by2 - by1) * (1 + 2 * self.roi_margin)
+        cx, cy = (bx1 + bx2) / 2, (by1 + by2) / 2
+        x1, y1 = max(int(cx - side / 2), 0), max(int(cy - side / 2), 0)
+        x2, y2 = min(int(cx + side / 2), w), min(int(cy + side / 2), h)
+        if x2 - x1 < 32 or y2 - y1 < 32:
+            return None
+        if (x2 - x1) * (y2 - y1) > 0.8 * w * h:
+            # Not worth cropping.
+            return None
+        return x1, y1, x2, y2
+
     def get_landmarks(self, img, draw=False):
         results = self.find_hands(img, draw)
         return results.multi_hand_landmarks
 
+    def get_landmark_array(self, img, draw=False, timestamp=None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if self.scheduler is not None and \
+                not self.scheduler.should_detect(timestamp):
+            return self.scheduler.predict(self.landmark_array, timestamp)
+        start = time.perf_counter()
+        results = self.find_hands(img, draw)
+        self.landmark_array.update(results, img.shape)
+        if self.mirror:
+            self.landmark_array.mirror()
+        if self.scheduler is not None:
+            self.scheduler.update(self.landmark_array, timestamp,
+                                  time.perf_counter() - start)
+        return self.landmark_array
+
 
 class Hands:
-    def __init__(self, detector: HandDetector, img):
-        self.landmarks = detector.get_landmarks(img)
+    def __init__(self, detector: HandDetector, img, timestamp=None,
+                 tracker=None, rgb=None):
+        # MediaPipe expects RGB: rgb is img converted, when the caller has
+        # it (Camera.read_frames()); img is what gets drawn on, if any.
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.timestamp = timestamp
+        self.landmarks = detector.get_landmark_array(
+            img if rgb is None else rgb, timestamp=timestamp)
+        # Optional HandTracker: Hands only lives for one frame, the tracker
+        # keeps every hand's ID and pinch state across frames.
+        self.tracker = tracker
+        if tracker is not None:
+            tracker.update(self.landmarks, timestamp)
         self.is_pinching = False
         self.img = img
         self.pinch_pos = (0, 0)
+        # Fingertip of the first hand as measured and as extrapolated by a
+        # PinchPredictor, when one is given to the gesture methods.
+        self.raw_pos = (0, 0)
+        self.predicted_pos = (0, 0)
         self.pinch_length = 50
         self.pinch_length_open = 100
 
-    def draw(self, thickness=20, color=(0, 255, 0)):
-        lm = self.landmarks[0]
-        h, w, c = self.img.shape
-        for i in range(21):
-            if i < 4:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-            if i == 4:
-                start = (int(lm.landmark[1].x * w),
-                         int(lm.landmark[1].y * h))
-                end = (int(lm.landmark[5].x * w),
-                       int(lm.landmark[5].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-            if 4 < i < 8:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-
-            if i == 8:
-                start = (int(lm.landmark[5].x * w),
-                         int(lm.landmark[5].y * h))
-                end = (int(lm.landmark[9].x * w),
-                       int(lm.landmark[9].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-
-            if 8 < i < 12:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-
-            if i == 12:
-                start = (int(lm.landmark[9].x * w),
-                         int(lm.landmark[9].y * h))
-                end = (int(lm.landmark[13].x * w),
-                       int(lm.landmark[13].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-
-            if 12 < i < 16:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-
-            if i == 16:
-                start = (int(lm.landmark[13].x * w),
-                         int(lm.landmark[13].y * h))
-                end = (int(lm.landmark[17].x * w),
-                       int(lm.landmark[17].y * h))
-                cv2.line(self.img, start, end, color, thickness)
-
-            if 16 < i < 20:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(self.img, start, end, color, thickness)
-            if i == 17:
-                start = (int(lm.landmark[17].x * w),
-                         int(lm.landmark[17].y * h))
-                end = (int(lm.landmark[0].x * w),
-                       int(lm.landmark[0].y * h))
-                cv2.line(self.img, start, end, color, thickness)
+    def draw(self, thickness=20, color=(0, 255, 0), img=None,
+             joint_radius=0, joint_color=(0, 0, 255)):
+        if img is None:
+            img = self.img
+        if img is None:
+            return
+        draw_hands(img, self.landmarks, thickness, color, joint_radius,
+                   joint_color)
 
     def draw_on_img(self, img, thickness=20, color=(0, 255, 0)):
-        lm = self.landmarks[0]
-        h, w, c = self.img.shape
-        for i in range(21):
-            if i < 4:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-            if i == 4:
-                start = (int(lm.landmark[1].x * w),
-                         int(lm.landmark[1].y * h))
-                end = (int(lm.landmark[5].x * w),
-                       int(lm.landmark[5].y * h))
-                cv2.line(img, start, end, color, thickness)
-            if 4 < i < 8:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-
-            if i == 8:
-                start = (int(lm.landmark[5].x * w),
-                         int(lm.landmark[5].y * h))
-                end = (int(lm.landmark[9].x * w),
-                       int(lm.landmark[9].y * h))
-                cv2.line(img, start, end, color, thickness)
-
-            if 8 < i < 12:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-
-            if i == 12:
-                start = (int(lm.landmark[9].x * w),
-                         int(lm.landmark[9].y * h))
-                end = (int(lm.landmark[13].x * w),
-                       int(lm.landmark[13].y * h))
-                cv2.line(img, start, end, color, thickness)
-
-            if 12 < i < 16:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-
-            if i == 16:
-                start = (int(lm.landmark[13].x * w),
-                         int(lm.landmark[13].y * h))
-                end = (int(lm.landmark[17].x * w),
-                       int(lm.landmark[17].y * h))
-                cv2.line(img, start, end, color, thickness)
-
-            if 16 < i < 20:
-                start, end = draw_line(lm, i, w, h)
-                cv2.line(img, start, end, color, thickness)
-            if i == 17:
-                start = (int(lm.landmark[17].x * w),
-                         int(lm.landmark[17].y * h))
-                end = (int(lm.landmark[0].x * w),
-                       int(lm.landmark[0].y * h))
-                cv2.line(img, start, end, color, thickness)
+        self.draw(thickness, color, img=img)
 
     def get_pinch_pos(self, send_data=True, server_url="http://127.0.0.1:8080",
-                      data=None):
-        tx, ty = 0, 0
-        cx, cy = 0, 0
-        if self.landmarks:
-            for hand_landmarks in self.landmarks:
-                self.draw()
-                for i, lm in enumerate(hand_landmarks.landmark):
-                    h, w, c = self.img.shape
-                    cx, cy = int(lm.x * w), int(lm.y * h)
-                    if i == 4:
-                        tx, ty = cx, cy
-
-                    if i == 8:
-                        length = ((cx - tx) ** 2 + (cy - ty) ** 2) ** 0.5
-                        if length < self.pinch_length and not self.is_pinching:
-                            self.is_pinching = True
-                            self.pinch_pos = (cx, cy)
-                            print(
-                                f"DEBUG | {time.time()} | x: {cx}, y: {cy}")
-                            print(
-                                f"pinch: {self.is_pinching}, length: {length}")
-                        elif length > self.pinch_length_open and self.is_pinching:
-                            self.is_pinching = False
-                if send_data:
-                    if data is None:
-                        data = {'x': cx, 'y': cy, 'pinch': self.is_pinching}
-                    print("DATA:", data)
-                    try:
-                        requests.post(server_url, json=data)
-                    except requests.exceptions.RequestException as e:
-                        print(e)
+                      data=None, sender=None, policy=None, predictor=None,
+                      engine=None):
+        self._update_pinch(4, 8, 'pinch', send_data, server_url, data, sender,
+                           policy, predictor, engine, log=True)
 
     def get_grab_pos(self, send_data=True, server_url="http://127.0.0.1:8080",
-                     data=None):
-        tx, ty = 0, 0
-        cx, cy = 0, 0
+                     data=None, sender=None, policy=None, predictor=None,
+                     engine=None):
+        self._update_pinch(0, 12, 'grab', send_data, server_url, data, sender,
+                           policy, predictor, engine)
+
+    def _update_pinch(self, base, tip, gesture, send_data, server_url, data,
+                      sender, policy, predictor, engine, log=False):
+        # With a GestureEngine the gesture state comes from its
+        # hand-size-relative thresholds and hysteresis instead of the
+        # pinch_length / pinch_length_open pixel distances.
+        # With a HandTracker every hand pinches on its own, and the
+        # predictor follows the oldest hand in view rather than whichever
+        # MediaPipe lists first.
+        tracker = self.tracker
+        slots = tracker.slots if tracker is not None else None
+        if engine is not None:
+            engine.update(self.landmarks, self.timestamp, slots)
+            if tracker is None:
+                active = engine.active(gesture).tolist()
+            else:
+                active = [bool(engine.state[slot, engine.index[gesture]])
+                          if slot >= 0 else False
+                          for slot in slots[:self.landmarks.count].tolist()]
+        if policy is not None and tracker is None:
+            self.is_pinching = policy.is_pinching
+        primary = 0 if tracker is None else tracker.primary()
+        if predictor is not None and (not self.landmarks or (
+                tracker is not None and tracker.primary_changed)):
+            predictor.reset()
         if self.landmarks:
-            for hand_landmarks in self.landmarks:
-                self.draw()
-                for i, lm in enumerate(hand_landmarks.landmark):
-                    h, w, c = self.img.shape
-                    cx, cy = int(lm.x * w), int(lm.y * h)
-                    if i == 0:
-                        tx, ty = cx, cy
-
-                    if i == 12:
-                        length = ((cx - tx) ** 2 + (cy - ty) ** 2) ** 0.5
-                        if length < self.pinch_length and not self.is_pinching:
-                            self.is_pinching = True
-                            self.pinch_pos = (cx, cy)
-                        elif length > self.pinch_length_open and self.is_pinching:
-                            self.is_pinching = False
+            lengths = self.landmarks.distances(base, tip).tolist()
+            tips = self.landmarks.points(tip).tolist()
+            self.raw_pos = tuple(tips[max(primary, 0)])
+            self.predicted_pos = self.raw_pos
+            if predictor is not None:
+                self.predicted_pos = predictor.update(*self.raw_pos,
+                                                      self.timestamp)
+            self.draw()
+            for hand, (length, (cx, cy)) in enumerate(zip(lengths, tips)):
+                slot = -1 if tracker is None else tracker.slot(hand)
+                if tracker is not None:
+                    if slot < 0:
+                        continue
+                    self.is_pinching = bool(tracker.pinching[slot])
+                if engine is not None:
+                    closed, opened = active[hand], not active[hand]
+                else:
+                    closed = length < self.pinch_length
+                    opened = length > self.pinch_length_open
+                if closed and not self.is_pinching:
+                    self.is_pinching = True
+                    self.pinch_pos = (cx, cy)
+                    if slot >= 0:
+                        tracker.pinch_pos[slot] = (cx, cy)
+                    if log:
+                        event_log.debug('pinch', x=cx, y=cy, length=length)
+                elif opened and self.is_pinching:
+                    self.is_pinching = False
+                if slot >= 0:
+                    tracker.pinching[slot] = self.is_pinching
                 if send_data:
-                    if data is None:
-                        data = {'x': cx, 'y': cy, 'pinch': self.is_pinching}
-                    print("DATA:", data)
-                    try:
-                        requests.post(server_url, json=data)
-                    except requests.exceptions.RequestException as e:
-                        print(e)
+                    # A caller's data goes out as is; otherwise every hand
+                    # sends its own position.
+                    message = data
+                    if message is None:
+                        message = {'x': cx, 'y': cy,
+                                   'pinch': self.is_pinching}
+                        if slot >= 0:
+                            message['hand'] = int(tracker.ids[slot])
+                        if predictor is not None and hand == primary:
+                            message['raw_x'], message['raw_y'] = self.raw_pos
+                            message['pred_x'], message['pred_y'] = \
+                                self.predicted_pos
+                            if predictor.send_predicted:
+                                message['x'], message['y'] = \
+                                    self.predicted_pos
+                    if policy is None or policy.should_emit(
+                            message, size=(self.landmarks.width,
+                                           self.landmarks.height),
+                            slot=slot if slot >= 0 else hand):
+                        sender = self._send(message, sender, server_url)
+        if send_data and policy is not None:
+            # Moves held back by the rate limit, even once a hand is still
+            # or gone.
+            for message in policy.flush():
+                sender = self._send(message, sender, server_url)
+        if tracker is not None:
+            # Any hand pinching counts, for the games that follow one pinch.
+            self.is_pinching = bool(tracker.pinching[tracker.ids >= 0].any())
+        if policy is not None:
+            policy.is_pinching = self.is_pinching
+
+    @staticmethod
+    def _send(message, sender, server_url):
+        event_log.debug('data', **message)
+        if sender is None:
+            sender = get_sender(server_url)
+        sender.send(message)
+        return sender
 
     def is_pinched_inside(self, r):
         x, y = self.pinch_pos
@@ -368,18 +585,14 @@ class Hands:
         pass
 
     def get_center(self):
-        cx, cy = 0, 0
-        for hand_landmarks in self.landmarks:
-            for i, lm in enumerate(hand_landmarks.landmark):
-                h, w, c = self.img.shape
-                cx += int(lm.x * w)
-                cy += int(lm.y * h)
+        if not self.landmarks:
+            return 0, 0
+        cx, cy = self.landmarks.hands[:, :, :2].astype(np.int32).sum(
+            axis=(0, 1)).tolist()
         return cx // 21, cy // 21
 
     def get_top_left(self):
-        top_left = (0, 0)
-        for hand_landmarks in self.landmarks:
-            for i, lm in enumerate(hand_landmarks.landmark):
-                h, w, c = self.img.shape
-                top_left = (int(lm.x * w), int(lm.y * h))
-        return top_left
+        if not self.landmarks:
+            return 0, 0
+        x1, y1 = self.landmarks.bounding_boxes()[:, :2].min(axis=0)
+        return int(x1), int(y1)
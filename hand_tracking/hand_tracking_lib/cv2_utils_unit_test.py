@@ -0,0 +1,227 @@
+import queue
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from hand_tracking.hand_tracking_lib import cv2_utils
+
+
+class FakeGraph:
+    # Sees a hand at a fixed place of the full frame and reports it in the
+    # normalized coordinates of whatever image it is given.
+    def __init__(self, hand_box, frame_size):
+        self.hand_box = hand_box
+        self.frame_size = frame_size
+        self.inputs = []
+        self.crop = (0, 0) + frame_size
+
+    def process(self, img):
+        self.inputs.append(img.shape)
+        x1, y1, x2, y2 = self.crop
+        hx1, hy1, hx2, hy2 = self.hand_box
+        if hx1 < x1 or hy1 < y1 or hx2 > x2 or hy2 > y2:
+            return SimpleNamespace(multi_hand_landmarks=None,
+                                   multi_handedness=None)
+        points = [(hx1 + (hx2 - hx1) * i / 20, hy1 + (hy2 - hy1) * i / 20)
+                  for i in range(21)]
+        landmark = [SimpleNamespace(x=(x - x1) / (x2 - x1),
+                                    y=(y - y1) / (y2 - y1), z=0.0)
+                    for x, y in points]
+        return SimpleNamespace(
+            multi_hand_landmarks=[SimpleNamespace(landmark=landmark)],
+            multi_handedness=None)
+
+
+def make_detector(graph, **kwargs):
+    hands = SimpleNamespace(Hands=lambda **_: graph)
+    with mock.patch.object(cv2_utils, 'mp',
+                           SimpleNamespace(solutions=SimpleNamespace(
+                               hands=hands))):
+        return cv2_utils.HandDetector(max_num_hands=1, **kwargs)
+
+
+class FakeCapture:
+    # A VideoCapture that delivers the frames pushed into it, each filled
+    # with its number, and no frame while none is pushed.
+    def __init__(self, shape=(48, 64, 3)):
+        self.shape = shape
+        self.frames = queue.Queue()
+        self.reads = 0
+        self.opened = True
+
+    def push(self, *values):
+        for value in values:
+            self.frames.put(value)
+
+    def read(self, image=None):
+        self.reads += 1
+        try:
+            value = self.frames.get(timeout=0.005)
+        except queue.Empty:
+            return False, None
+        if image is None:
+            image = np.empty(self.shape, np.uint8)
+        image[:] = value
+        return True, image
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: self.shape[1],
+                cv2.CAP_PROP_FRAME_HEIGHT: self.shape[0],
+                cv2.CAP_PROP_FPS: 30.0}.get(prop, 0.0)
+
+    def set(self, prop, value):
+        return False
+
+    def isOpened(self):
+        return self.opened
+
+    def release(self):
+        self.opened = False
+
+    def getBackendName(self):
+        return 'FAKE'
+
+
+def wait_for(condition, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.001)
+
+
+class TestThreadedCamera(unittest.TestCase):
+    def setUp(self):
+        self.capture = FakeCapture()
+        with mock.patch.object(cv2_utils, 'open_source',
+                               return_value=self.capture):
+            self.camera = cv2_utils.Camera(threaded=True)
+
+    def tearDown(self):
+        self.camera.close()
+
+    def delivered(self, n):
+        # Waits until the capture thread has taken the first n frames.
+        wait_for(lambda: self.camera._latest_seq == n)
+
+    def test_the_latest_frame_replaces_the_older_ones(self):
+        self.capture.push(1)
+        frame = self.camera.read_latest()
+        self.assertEqual(frame[0, 0, 0], 1)
+        self.assertEqual((self.camera.frame_seq, self.camera.last_dropped),
+                         (1, 0))
+
+        self.capture.push(2, 3, 4)
+        self.delivered(4)
+        frame = self.camera.read_latest()
+        self.assertEqual(frame[0, 0, 0], 4)
+        self.assertEqual(self.camera.frame_seq, 4)
+        self.assertEqual(self.camera.last_dropped, 2)
+
+        # No new frame: the same one again, nothing dropped.
+        self.assertIs(self.camera.read_latest(), frame)
+        self.assertEqual(self.camera.last_dropped, 0)
+
+        self.capture.push(5, 6)
+        self.delivered(6)
+        self.assertEqual(self.camera.read_latest()[0, 0, 0], 6)
+        self.assertEqual(self.camera.dropped_frames, 3)
+
+    def test_wait_new_blocks_until_the_next_frame(self):
+        self.capture.push(1)
+        frame = self.camera.read_latest(wait_new=True)
+        self.assertEqual(frame[0, 0, 0], 1)
+
+        start = time.monotonic()
+        self.assertIs(self.camera.read_latest(timeout=0.05, wait_new=True),
+                      frame)
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+        timer = threading.Timer(0.05, self.capture.push, (2,))
+        timer.start()
+        frame = self.camera.read_latest(wait_new=True)
+        timer.join()
+        self.assertEqual(frame[0, 0, 0], 2)
+        self.assertEqual(self.camera.frame_seq, 2)
+
+    def test_the_frame_being_read_is_not_overwritten(self):
+        self.capture.push(1)
+        frame = self.camera.read_latest()
+        self.capture.push(*range(2, 10))
+        self.delivered(9)
+        self.assertEqual(frame[0, 0, 0], 1)
+        self.assertEqual(self.camera.read_latest()[0, 0, 0], 9)
+
+    def test_stop_ends_the_capture_thread(self):
+        self.capture.push(1)
+        self.camera.read_latest()
+        thread = self.camera._thread
+        self.camera.stop()
+        self.assertIsNone(self.camera._thread)
+        self.assertFalse(thread.is_alive())
+
+        reads = self.capture.reads
+        self.capture.push(2)
+        time.sleep(0.05)
+        self.assertEqual(self.capture.reads, reads)
+        self.assertEqual(self.camera.read_latest()[0, 0, 0], 1)
+
+        self.camera.close()
+        self.assertFalse(self.capture.isOpened())
+
+
+class TestRoiTracking(unittest.TestCase):
+    def test_landmarks_are_mapped_back_to_the_full_frame(self):
+        graph = FakeGraph((300, 200, 380, 300), (640, 480))
+        detector = make_detector(graph, roi_tracking=True)
+        img = np.zeros((480, 640, 3), np.uint8)
+
+        detector.get_landmark_array(img)
+        self.assertIsNotNone(detector.roi)
+        graph.crop = detector.roi
+        array = detector.get_landmark_array(img)
+
+        x1, y1, x2, y2 = detector.roi
+        self.assertEqual(graph.inputs[-1], (y2 - y1, x2 - x1, 3))
+        np.testing.assert_allclose(array.bounding_boxes()[0],
+                                   [300, 200, 380, 300], atol=1e-3)
+
+    def test_lost_hand_falls_back_to_the_full_frame(self):
+        graph = FakeGraph((20, 20, 100, 120), (640, 480))
+        detector = make_detector(graph, roi_tracking=True)
+        detector.roi = (300, 200, 400, 320)
+        graph.crop = detector.roi
+        detector.find_hands(np.zeros((480, 640, 3), np.uint8))
+        self.assertEqual(graph.inputs, [(120, 100, 3), (480, 640, 3)])
+        self.assertIsNone(detector.roi)
+
+    def test_inference_size_downscales_the_input(self):
+        graph = FakeGraph((300, 200, 380, 300), (640, 480))
+        detector = make_detector(graph, inference_size=320)
+        array = detector.get_landmark_array(np.zeros((480, 640, 3),
+                                                     np.uint8))
+        self.assertEqual(graph.inputs[-1], (240, 320, 3))
+        np.testing.assert_allclose(array.bounding_boxes()[0],
+                                   [300, 200, 380, 300], atol=1e-3)
+
+    def test_mirror_flips_the_landmarks_not_the_roi(self):
+        graph = FakeGraph((300, 200, 380, 300), (640, 480))
+        detector = make_detector(graph, roi_tracking=True, mirror=True)
+        img = np.zeros((480, 640, 3), np.uint8)
+        detector.get_landmark_array(img)
+        x1, y1, x2, y2 = detector.roi
+        self.assertTrue(x1 < 300 and 380 < x2)
+
+        graph.crop = detector.roi
+        array = detector.get_landmark_array(img)
+        np.testing.assert_allclose(array.bounding_boxes()[0],
+                                   [260, 200, 340, 300], atol=1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import struct
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+# Where the frame loops show their frames and read their keys. Window is
+# the usual OpenCV window; HeadlessDisplay opens none and does not pump
+# GUI events, it hands the shown frames to a sink and takes its keys from
+# a script, so a loop runs as fast as it can without a display server:
+#   null                  frames are only counted
+#   file:out.mkv          frames are written to a video file
+#   shm, shm:NAME         the latest frame is kept in shared memory
+# A key script is "FRAME:KEY,...": KEY is pressed at the FRAME-th poll,
+# e.g. "120:r,300:q"; "esc" stands for the escape key.
+
+NO_KEY = -1
+KEY_NAMES = {'esc': 27, 'space': 32, 'enter': 13}
+
+FRAMES_NAME = "theraduty_frames"
+FRAMES_MAGIC = b'TF'
+# magic, version, frame shape, seq of the latest frame
+FRAMES_HEADER = struct.Struct('<2sBxHHH6xQ')
+FRAMES_HEADER_SIZE = 64
+
+
+class Window:
+    def __init__(self, name, size=None):
+        self.name = name
+        if size is not None:
+            cv2.namedWindow(name, cv2.WINDOW_NORMAL)
+            cv2.resizeWindow(name, *size)
+
+    def set_title(self, title):
+        cv2.setWindowTitle(self.name, title)
+
+    def show(self, img):
+        cv2.imshow(self.name, img)
+
+    def poll(self):
+        key = cv2.waitKey(1)
+        return NO_KEY if key == -1 else key & 0xFF
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class KeyScript:
+    def __init__(self, spec=''):
+        self.keys = {}
+        for item in filter(None, spec.split(',')):
+            frame, _, key = item.partition(':')
+            self.keys[int(frame)] = KEY_NAMES[key] if key in KEY_NAMES \
+                else ord(key)
+        self.polls = 0
+
+    def poll(self):
+        key = self.keys.get(self.polls, NO_KEY)
+        self.polls += 1
+        return key
+
+
+class NullSink:
+    def write(self, img):
+        pass
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    def __init__(self, path, fps=30, fourcc='FFV1'):
+        # The writer is opened with the size of the first frame.
+        self.path = path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.writer = None
+
+    def write(self, img):
+        if self.writer is None:
+            h, w = img.shape[:2]
+            self.writer = cv2.VideoWriter(
+                self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps,
+                (w, h))
+            if not self.writer.isOpened():
+                raise IOError("cannot write to %s" % self.path)
+        self.writer.write(img)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+
+class SharedMemorySink:
+    def __init__(self, name=FRAMES_NAME):
+        # Two frame buffers after FRAMES_HEADER: the latest frame is in
+        # buffer seq % 2, the other one is being written. Created with the
+        # shape of the first frame.
+        self.name = name
+        self.shm = None
+        self.seq = 0
+
+    def _create(self, shape):
+        size = FRAMES_HEADER_SIZE + 2 * int(np.prod(shape))
+        try:
+            stale = shared_memory.SharedMemory(self.name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = shared_memory.SharedMemory(self.name, create=True,
+                                              size=size)
+        self.frames = np.ndarray((2,) + shape, np.uint8, self.shm.buf,
+                                 FRAMES_HEADER_SIZE)
+
+    def write(self, img):
+        if self.shm is None:
+            self._create(img.shape)
+        self.frames[(self.seq + 1) % 2] = img
+        self.seq += 1
+        FRAMES_HEADER.pack_into(self.shm.buf, 0, FRAMES_MAGIC, 1,
+                                *img.shape, self.seq)
+
+    def close(self):
+        if self.shm is None:
+            return
+        del self.frames
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+
+def read_shared_frame(shm):
+    # The latest frame of a SharedMemorySink, as a copy, or None.
+    magic, _, h, w, c, seq = FRAMES_HEADER.unpack_from(shm.buf)
+    if magic != FRAMES_MAGIC or not seq:
+        return None
+    frames = np.ndarray((2, h, w, c), np.uint8, shm.buf, FRAMES_HEADER_SIZE)
+    return frames[seq % 2].copy()
+
+
+def open_sink(spec='null'):
+    kind, _, arg = spec.partition(':')
+    if kind == 'null':
+        return NullSink()
+    if kind == 'file':
+        return FileSink(arg)
+    if kind == 'shm':
+        return SharedMemorySink(arg or FRAMES_NAME)
+    raise ValueError("unknown frame sink: %s" % spec)
+
+
+class HeadlessDisplay:
+    def __init__(self, sink=None, keys=None):
+        self.sink = sink or NullSink()
+        self.keys = keys or KeyScript()
+        self.title = ''
+        self.frames = 0
+
+    def set_title(self, title):
+        self.title = title
+
+    def show(self, img):
+        self.sink.write(img)
+        self.frames += 1
+
+    def poll(self):
+        return self.keys.poll()
+
+    def close(self):
+        self.sink.close()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from hand_tracking.hand_tracking_lib.display import (NO_KEY, FileSink,
+                                                     HeadlessDisplay,
+                                                     KeyScript, NullSink,
+                                                     SharedMemorySink,
+                                                     open_sink,
+                                                     read_shared_frame)
+
+
+def frames(n, shape=(48, 64, 3)):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, shape, np.uint8) for _ in range(n)]
+
+
+class TestKeyScript(unittest.TestCase):
+    def test_keys_come_at_their_poll(self):
+        keys = KeyScript('1:r,3:q,4:esc')
+        self.assertEqual([keys.poll() for _ in range(6)],
+                         [NO_KEY, ord('r'), NO_KEY, ord('q'), 27, NO_KEY])
+
+    def test_empty_script_presses_nothing(self):
+        keys = KeyScript()
+        self.assertEqual({keys.poll() for _ in range(10)}, {NO_KEY})
+
+
+class TestHeadlessDisplay(unittest.TestCase):
+    def test_counts_frames_and_reads_the_script(self):
+        display = HeadlessDisplay(keys=KeyScript('2:q'))
+        display.set_title("Menu")
+        polled = []
+        for img in frames(3):
+            display.show(img)
+            polled.append(display.poll())
+        display.close()
+        self.assertEqual(display.frames, 3)
+        self.assertEqual(display.title, "Menu")
+        self.assertEqual(polled, [NO_KEY, NO_KEY, ord('q')])
+
+    def test_sinks(self):
+        self.assertIsInstance(open_sink('null'), NullSink)
+        self.assertIsInstance(open_sink('file:out.mkv'), FileSink)
+        self.assertEqual(open_sink('shm').name, 'theraduty_frames')
+        self.assertEqual(open_sink('shm:other').name, 'other')
+        with self.assertRaises(ValueError):
+            open_sink('window')
+
+
+class TestSinks(unittest.TestCase):
+    def test_file_sink_writes_every_frame(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "shown.mkv")
+            sink = FileSink(path)
+            shown = frames(3)
+            for img in shown:
+                sink.write(img)
+            sink.close()
+
+            capture = cv2.VideoCapture(path)
+            for img in shown:
+                ret, frame = capture.read()
+                self.assertTrue(ret)
+                np.testing.assert_array_equal(frame, img)
+            self.assertFalse(capture.read()[0])
+            capture.release()
+
+    def test_shared_memory_keeps_the_latest_frame(self):
+        sink = SharedMemorySink("theraduty_frames_test_%d" % os.getpid())
+        try:
+            for img in frames(3):
+                sink.write(img)
+                np.testing.assert_array_equal(read_shared_frame(sink.shm),
+                                              img)
+            self.assertEqual(sink.seq, 3)
+        finally:
+            sink.close()
+        self.assertIsNone(sink.shm)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import time
+
+
+class EmissionPolicy:
+    def __init__(self, max_rate=20, deadband=8, norm_deadband=None,
+                 max_hands=2):
+        # Cursor moves are sent at most max_rate times per second and only
+        # once they moved more than deadband pixels from the last sent one.
+        # norm_deadband is the same in fractions of the frame width and
+        # height, the same at every camera resolution; it replaces deadband
+        # when set.
+        self.min_interval = 1.0 / max_rate if max_rate else 0.0
+        self.deadband = deadband
+        self.norm_deadband = norm_deadband
+
+        # Hands is rebuilt every frame, so the pinch state lives here to
+        # survive from one frame to the next.
+        self.is_pinching = False
+
+        # What was last sent, per hand: the HandTracker slot, or the
+        # index of the hand in the detection without a tracker. A slot
+        # taken over by another track ID starts afresh. Hands past
+        # max_hands are not sent; size it like the detector.
+        self.last_hand = [None] * max_hands
+        self.last_pos = [None] * max_hands
+        self.last_pinch = [None] * max_hands
+        self.last_time = [0.0] * max_hands
+        # The latest move held back by the rate limit, sent by flush().
+        self.pending = [None] * max_hands
+        self.emitted = 0
+        self.suppressed = 0
+
+    def _distance(self, pos, slot, size):
+        dx = pos[0] - self.last_pos[slot][0]
+        dy = pos[1] - self.last_pos[slot][1]
+        if self.norm_deadband is not None and size:
+            return ((dx / size[0]) ** 2 + (dy / size[1]) ** 2) ** 0.5 \
+                < self.norm_deadband
+        return (dx ** 2 + dy ** 2) ** 0.5 < self.deadband
+
+    def should_emit(self, data, now=None, size=None, slot=0):
+        # size: (width, height) of the frame, for norm_deadband.
+        if now is None:
+            now = time.monotonic()
+        if not 0 <= slot < len(self.last_pos):
+            self.suppressed += 1
+            return False
+        pos = (data['x'], data['y'])
+        pinch = data['pinch']
+        hand = data.get('hand')
+
+        self.pending[slot] = None
+        if pinch != self.last_pinch[slot] or self.last_pos[slot] is None \
+                or hand != self.last_hand[slot]:
+            # Pinch-down / pinch-up transitions and new hands always go
+            # out immediately.
+            emit = True
+        elif self._distance(pos, slot, size):
+            emit = False
+        else:
+            # Moves inside the rate window are coalesced: the latest one is
+            # held back and goes out with the next allowed message, or
+            # from flush() once the window is over.
+            emit = now - self.last_time[slot] >= self.min_interval
+            if not emit:
+                self.pending[slot] = data
+
+        if emit:
+            self._sent(data, slot, now)
+        else:
+            self.suppressed += 1
+        return emit
+
+    def flush(self, now=None):
+        # The moves held back by the rate limit whose window is over: the
+        # last position of a hand still goes out when it stops or leaves
+        # the frame.
+        if now is None:
+            now = time.monotonic()
+        due = []
+        for slot, data in enumerate(self.pending):
+            if data is not None and \
+                    now - self.last_time[slot] >= self.min_interval:
+                self.pending[slot] = None
+                self._sent(data, slot, now)
+                due.append(data)
+        return due
+
+    def _sent(self, data, slot, now):
+        self.last_hand[slot] = data.get('hand')
+        self.last_pos[slot] = (data['x'], data['y'])
+        self.last_pinch[slot] = data['pinch']
+        self.last_time[slot] = now
+        self.emitted += 1
@@ -0,0 +1,84 @@
+import unittest
+
+from hand_tracking.hand_tracking_lib.emission import EmissionPolicy
+
+
+class TestEmissionPolicy(unittest.TestCase):
+    def test_still_hand_is_sent_once(self):
+        policy = EmissionPolicy(max_rate=20, deadband=8)
+        sent = [policy.should_emit({'x': 100 + i % 3, 'y': 100,
+                                    'pinch': False}, now=i / 30)
+                for i in range(30)]
+        self.assertEqual(sum(sent), 1)
+
+    def test_pinch_transitions_bypass_rate_limit(self):
+        policy = EmissionPolicy(max_rate=1, deadband=8)
+        self.assertTrue(policy.should_emit({'x': 0, 'y': 0, 'pinch': False},
+                                           now=0.0))
+        self.assertTrue(policy.should_emit({'x': 0, 'y': 0, 'pinch': True},
+                                           now=0.01))
+        self.assertTrue(policy.should_emit({'x': 0, 'y': 0, 'pinch': False},
+                                           now=0.02))
+
+    def test_moves_are_throttled_to_max_rate(self):
+        policy = EmissionPolicy(max_rate=10, deadband=0)
+        sent = [policy.should_emit({'x': i * 10, 'y': 0, 'pinch': False},
+                                   now=i / 100)
+                for i in range(100)]
+        self.assertEqual(sum(sent), 10)
+
+    def test_last_move_is_flushed_after_the_rate_window(self):
+        policy = EmissionPolicy(max_rate=10, deadband=0)
+        self.assertTrue(policy.should_emit({'x': 0, 'y': 0, 'pinch': False},
+                                           now=0.0))
+        self.assertFalse(policy.should_emit({'x': 50, 'y': 0,
+                                             'pinch': False}, now=0.03))
+        # The hand stops there: nothing more comes to should_emit.
+        self.assertEqual(policy.flush(now=0.05), [])
+        self.assertEqual([d['x'] for d in policy.flush(now=0.1)], [50])
+        self.assertEqual(policy.flush(now=0.5), [])
+        self.assertEqual(policy.emitted, 2)
+
+    def test_hands_are_throttled_separately(self):
+        # One hand pinching, the other not, both still: each is sent once.
+        policy = EmissionPolicy(max_rate=20, deadband=8)
+        sent = 0
+        for i in range(100):
+            sent += policy.should_emit({'x': 100, 'y': 100, 'pinch': True,
+                                        'hand': 1}, now=i / 30, slot=0)
+            sent += policy.should_emit({'x': 400, 'y': 100, 'pinch': False,
+                                        'hand': 2}, now=i / 30, slot=1)
+        self.assertEqual(sent, 2)
+
+    def test_a_new_hand_in_a_slot_is_sent_at_once(self):
+        policy = EmissionPolicy(max_rate=1, deadband=8)
+        self.assertTrue(policy.should_emit({'x': 0, 'y': 0, 'pinch': False,
+                                            'hand': 1}, now=0.0))
+        self.assertTrue(policy.should_emit({'x': 0, 'y': 0, 'pinch': False,
+                                            'hand': 3}, now=0.1))
+
+    def test_hands_past_max_hands_are_dropped(self):
+        policy = EmissionPolicy(max_hands=2)
+        message = {'x': 0, 'y': 0, 'pinch': True}
+        self.assertTrue(policy.should_emit(message, now=0.0, slot=1))
+        self.assertFalse(policy.should_emit(message, now=0.0, slot=2))
+        self.assertEqual(policy.suppressed, 1)
+        self.assertEqual(policy.flush(now=1.0), [])
+
+    def test_normalized_deadband_follows_the_frame_size(self):
+        policy = EmissionPolicy(max_rate=0, deadband=1, norm_deadband=0.02)
+        policy.should_emit({'x': 0, 'y': 0, 'pinch': False}, now=0.0)
+        # 10 px is 1.5% of 640 but 0.5% of 1920.
+        self.assertFalse(policy.should_emit({'x': 10, 'y': 0,
+                                             'pinch': False},
+                                            now=1.0, size=(640, 480)))
+        self.assertTrue(policy.should_emit({'x': 20, 'y': 0,
+                                            'pinch': False},
+                                           now=2.0, size=(640, 480)))
+        self.assertFalse(policy.should_emit({'x': 50, 'y': 0,
+                                             'pinch': False},
+                                            now=3.0, size=(1920, 1080)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+
+# Structured event log for the frame loop. log() only checks the level and
+# the category's sampling and appends to a ring buffer; a background thread
+# formats the events as JSON lines and writes them in one go, so the loop
+# never waits on stdout (or on the launcher reading it).
+
+LEVELS = {'debug': logging.DEBUG, 'info': logging.INFO,
+          'warning': logging.WARNING, 'error': logging.ERROR}
+
+
+class EventLog:
+    def __init__(self, level=logging.INFO, sampling=None, capacity=1024,
+                 flush_interval=0.5, stream=None):
+        self.level = level
+        # category -> N: only one event in N of that category is kept.
+        self.sampling = dict(sampling or {})
+        self.stream = stream
+        self.flush_interval = flush_interval
+        self.buffer = deque(maxlen=capacity)
+        self.counts = {}
+        self.logged = 0
+        self.sampled_out = 0
+        self.overwritten = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def log(self, level, category, **fields):
+        if level < self.level:
+            return False
+        every = self.sampling.get(category)
+        if every:
+            count = self.counts.get(category, 0)
+            self.counts[category] = count + 1
+            if count % every:
+                self.sampled_out += 1
+                return False
+        if len(self.buffer) == self.buffer.maxlen:
+            self.overwritten += 1
+        self.buffer.append((time.time(), level, category, fields))
+        self.logged += 1
+        if self._thread is None:
+            self.start()
+        return True
+
+    def debug(self, category, **fields):
+        return self.log(logging.DEBUG, category, **fields)
+
+    def info(self, category, **fields):
+        return self.log(logging.INFO, category, **fields)
+
+    def warning(self, category, **fields):
+        return self.log(logging.WARNING, category, **fields)
+
+    def error(self, category, **fields):
+        return self.log(logging.ERROR, category, **fields)
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._flush_loop,
+                                            daemon=True)
+            self._thread.start()
+
+    def _flush_loop(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        lines = []
+        while True:
+            try:
+                t, level, category, fields = self.buffer.popleft()
+            except IndexError:
+                break
+            event = {'t': round(t, 3),
+                     'level': logging.getLevelName(level).lower(),
+                     'cat': category}
+            event.update(fields)
+            lines.append(json.dumps(event, default=str))
+        if lines:
+            stream = self.stream or sys.stdout
+            stream.write('\n'.join(lines) + '\n')
+            stream.flush()
+        return len(lines)
+
+    def close(self):
+        self._running = False
+        if self._thread is not None:
+            self._wake.set()
+            self._thread.join(timeout=1)
+            self._thread = None
+        self.flush()
+
+    def get_stats(self):
+        return {'logged': self.logged, 'sampled_out': self.sampled_out,
+                'overwritten': self.overwritten,
+                'pending': len(self.buffer)}
+
+
+def parse_sampling(text):
+    # "data=30,pinch=1" -> {'data': 30, 'pinch': 1}
+    sampling = {}
+    for item in filter(None, text.split(',')):
+        category, every = item.split('=')
+        sampling[category.strip()] = int(every)
+    return sampling
+
+
+# Shared by the whole process. Position messages are debug detail, kept
+# one in 30 when debug is on; a dead server fails every send.
+event_log = EventLog(sampling={'data': 30, 'send_error': 100})
@@ -0,0 +1,55 @@
+import io
+import json
+import logging
+import unittest
+
+from hand_tracking.hand_tracking_lib.eventlog import EventLog, parse_sampling
+
+
+class TestEventLog(unittest.TestCase):
+    def test_events_below_the_level_are_dropped(self):
+        log = EventLog(level=logging.INFO, stream=io.StringIO())
+        self.assertFalse(log.debug('pinch', x=1))
+        self.assertTrue(log.info('pinch', x=1))
+        self.assertEqual(len(log.buffer), 1)
+        log.close()
+
+    def test_sampling_keeps_one_event_in_n(self):
+        log = EventLog(level=logging.DEBUG, sampling={'data': 3},
+                       stream=io.StringIO())
+        kept = [log.debug('data', x=i) for i in range(7)]
+        self.assertEqual(kept, [True, False, False, True, False, False,
+                                True])
+        self.assertEqual(log.sampled_out, 4)
+        log.close()
+
+    def test_flush_writes_json_lines(self):
+        stream = io.StringIO()
+        log = EventLog(level=logging.DEBUG, stream=stream)
+        log.debug('data', x=3, y=4, pinch=True)
+        log.warning('send_error', error="refused")
+        log.close()
+        events = [json.loads(line) for line in
+                  stream.getvalue().splitlines()]
+        self.assertEqual(events[0]['cat'], 'data')
+        self.assertEqual(events[0]['level'], 'debug')
+        self.assertEqual((events[0]['x'], events[0]['pinch']), (3, True))
+        self.assertEqual(events[1]['level'], 'warning')
+        self.assertEqual(log.get_stats()['pending'], 0)
+
+    def test_full_buffer_overwrites_the_oldest_events(self):
+        log = EventLog(capacity=2, flush_interval=60, stream=io.StringIO())
+        for i in range(5):
+            log.info('pinch', x=i)
+        self.assertEqual([e[3]['x'] for e in log.buffer], [3, 4])
+        self.assertEqual(log.overwritten, 3)
+        log.close()
+
+    def test_parse_sampling(self):
+        self.assertEqual(parse_sampling("data=30, pinch=1"),
+                         {'data': 30, 'pinch': 1})
+        self.assertEqual(parse_sampling(""), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
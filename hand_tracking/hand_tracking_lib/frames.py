@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+
+
+class FramePool:
+    def __init__(self, size=3):
+        # Preallocated frames, sized from the first capture: `size` raw
+        # buffers that VideoCapture.read() decodes into, and two pairs of
+        # mirrored frames, one BGR to show and one RGB for MediaPipe. The
+        # pairs alternate, so the frames of one convert() stay valid until
+        # the next one but one. A steady stream allocates no frame at all.
+        self.raw = [None] * size
+        self.display = [None, None]
+        self.rgb = [None, None]
+        self.index = 0
+        self.allocations = 0
+
+    def __len__(self):
+        return len(self.raw)
+
+    def read(self, capture, i=0):
+        # Same contract as capture.read(), into raw buffer i.
+        buf = self.raw[i]
+        if buf is None:
+            ret, frame = capture.read()
+        else:
+            ret, frame = capture.read(image=buf)
+        if not ret:
+            return False, None
+        if frame is not buf:
+            # First frame, or the capture changed resolution.
+            self.raw[i] = frame
+            self.allocations += 1
+        return True, frame
+
+    def convert(self, frame, mirror=True):
+        # Mirror and BGR -> RGB into the next pair of buffers. Without
+        # mirror, the frame itself is returned with its RGB copy.
+        self.index ^= 1
+        display = self.display[self.index]
+        if display is None or display.shape != frame.shape:
+            display = self.display[self.index] = np.empty_like(frame)
+            self.rgb[self.index] = np.empty_like(frame)
+            self.allocations += 1
+        rgb = self.rgb[self.index]
+        if not mirror:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            return frame, rgb
+        cv2.flip(frame, 1, dst=display)
+        cv2.cvtColor(display, cv2.COLOR_BGR2RGB, dst=rgb)
+        return display, rgb
+
+    def mirror(self, frame):
+        # Mirrored copy of a frame from convert(frame, mirror=False), for
+        # when it is shown after all.
+        display = self.display[self.index]
+        if display is None or display.shape != frame.shape:
+            return cv2.flip(frame, 1)
+        return cv2.flip(frame, 1, dst=display)
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from hand_tracking.hand_tracking_lib.frames import FramePool
+from hand_tracking.hand_tracking_lib.recording import FrameRecorder
+
+
+def gradient(i):
+    frame = np.zeros((48, 64, 3), np.uint8)
+    frame[:, :, 0] = np.arange(64)  # blue grows to the right
+    frame[:, :, 2] = i
+    return frame
+
+
+class TestFramePool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "session")
+        recorder = FrameRecorder(path)
+        for i in range(6):
+            recorder.write(gradient(i), i / 30)
+        recorder.close()
+        self.capture = cv2.VideoCapture(path + '.mkv')
+
+    def tearDown(self):
+        self.capture.release()
+        self.tmp.cleanup()
+
+    def test_frames_are_mirrored_and_converted(self):
+        pool = FramePool()
+        ret, frame = pool.read(self.capture)
+        display, rgb = pool.convert(frame)
+        np.testing.assert_array_equal(display, cv2.flip(gradient(0), 1))
+        np.testing.assert_array_equal(rgb, display[:, :, ::-1])
+        # Blue, now on the left, is the last channel in RGB.
+        self.assertEqual(rgb[0, 0, 2], 63)
+
+    def test_unmirrored_frames_are_flipped_only_on_demand(self):
+        pool = FramePool()
+        ret, frame = pool.read(self.capture)
+        img, rgb = pool.convert(frame, mirror=False)
+        self.assertIs(img, frame)
+        np.testing.assert_array_equal(rgb, gradient(0)[:, :, ::-1])
+        shown = pool.mirror(img)
+        np.testing.assert_array_equal(shown, cv2.flip(gradient(0), 1))
+        self.assertIs(shown, pool.display[pool.index])
+
+    def test_steady_stream_reuses_the_buffers(self):
+        pool = FramePool()
+        buffers = set()
+        for i in range(6):
+            ret, frame = pool.read(self.capture, i % len(pool))
+            self.assertTrue(ret)
+            display, rgb = pool.convert(frame)
+            self.assertEqual(int(rgb[0, 0, 0]), i)
+            buffers.update(id(b) for b in (frame, display, rgb))
+        # Three raw buffers, two display/RGB pairs.
+        self.assertEqual(len(buffers), 7)
+        self.assertEqual(pool.allocations, 5)
+
+    def test_frames_stay_valid_until_the_next_convert_but_one(self):
+        pool = FramePool()
+        first = pool.convert(pool.read(self.capture)[1])[1]
+        pool.convert(pool.read(self.capture)[1])
+        self.assertEqual(first[0, 0, 0], 0)
+        pool.convert(pool.read(self.capture)[1])
+        self.assertEqual(first[0, 0, 0], 2)
+
+    def test_end_of_stream(self):
+        pool = FramePool()
+        for _ in range(6):
+            pool.read(self.capture)
+        self.assertEqual(pool.read(self.capture), (False, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
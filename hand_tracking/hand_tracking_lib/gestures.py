@@ -0,0 +1,140 @@
+from collections import namedtuple
+
+import numpy as np
+
+# A gesture holds while all its conditions hold. A condition compares the
+# distance between two landmarks, in hand sizes (wrist to middle finger
+# MCP), with a threshold: below=True means the landmarks must be closer
+# than it. A gesture starts when every distance passes `on` and only ends
+# once one of them crosses `off`, so it does not flicker at the boundary.
+Condition = namedtuple('Condition', 'a b below on off')
+Gesture = namedtuple('Gesture', 'name anchor conditions')
+# type is 'start' or 'end', or the direction of a swipe.
+GestureEvent = namedtuple('GestureEvent', 'name type hand x y timestamp')
+
+
+def pinch_gesture(on=0.35, off=0.5):
+    # Thumb tip to index tip, closer than `on` hand sizes.
+    if not 0 < on < off:
+        raise ValueError("a pinch needs 0 < on < off, got %s, %s"
+                         % (on, off))
+    return Gesture('pinch', 8, [Condition(4, 8, True, on, off)])
+
+
+PINCH = pinch_gesture()
+GRAB = Gesture('grab', 9, [Condition(0, 8, True, 1.0, 1.3),
+                           Condition(0, 12, True, 1.0, 1.3)])
+POINT = Gesture('point', 8, [Condition(0, 8, False, 1.6, 1.4),
+                             Condition(0, 12, True, 1.1, 1.3),
+                             Condition(0, 16, True, 1.1, 1.3)])
+DEFAULT_GESTURES = [PINCH, GRAB, POINT]
+
+
+class GestureEngine:
+    def __init__(self, gestures=DEFAULT_GESTURES, max_hands=2,
+                 swipe_speed=4.0, swipe_rearm=2.0):
+        # Every condition of every gesture is evaluated for all hands in
+        # one pass over the landmark array.
+        self.gestures = list(gestures)
+        self.index = {g.name: i for i, g in enumerate(self.gestures)}
+        conditions = [c for g in self.gestures for c in g.conditions]
+        self._a = np.array([c.a for c in conditions])
+        self._b = np.array([c.b for c in conditions])
+        # Flipping the sign of "above" conditions makes every test a "<".
+        sign = np.array([1.0 if c.below else -1.0 for c in conditions])
+        self._on = sign * [c.on for c in conditions]
+        self._off = sign * [c.off for c in conditions]
+        self._sign = sign
+        self._groups = np.cumsum([0] + [len(g.conditions)
+                                        for g in self.gestures[:-1]])
+        self._anchors = np.array([g.anchor for g in self.gestures])
+
+        # Swipe: the palm moving faster than swipe_speed hand sizes per
+        # second; it fires once and re-arms below swipe_rearm.
+        self.swipe_speed = swipe_speed
+        self.swipe_rearm = swipe_rearm
+
+        self.state = np.zeros((max_hands, len(self.gestures)), bool)
+        self.positions = np.zeros((max_hands, len(self.gestures), 2))
+        self.swiping = np.zeros(max_hands, bool)
+        self.rows = np.zeros(0, np.int64)
+        self.timestamp = None
+        self.events = []
+        self._palms = np.zeros((max_hands, 2))
+        self._palm_seen = np.zeros(max_hands, bool)
+        self._palm_time = None
+
+    def active(self, name):
+        # Per hand of the last update: whether the gesture currently holds.
+        return self.state[self.rows, self.index[name]]
+
+    def update(self, landmarks, timestamp, slots=None):
+        # Called by every gesture method of a frame: evaluated once. The
+        # state of hand i is kept in row i, or in row slots[i] when a
+        # HandTracker gives every hand a stable slot; `hand` in the events
+        # is that row.
+        if timestamp == self.timestamp:
+            return self.events
+        self.timestamp = timestamp
+        events = []
+        count = min(landmarks.count, len(self.state))
+        rows = np.arange(count) if slots is None else \
+            np.asarray(slots[:count])
+        visible = rows >= 0
+        rows = rows[visible]
+        px = landmarks.px[:count, :, :2][visible]
+        size = np.maximum(np.hypot(*(px[:, 0] - px[:, 9]).T), 1.0)
+
+        diff = px[:, self._a] - px[:, self._b]
+        signed = np.hypot(diff[..., 0], diff[..., 1]) / size[:, None] * \
+            self._sign
+        if len(rows):
+            can_start = np.logical_and.reduceat(signed < self._on,
+                                                self._groups, axis=1)
+            can_stay = np.logical_and.reduceat(signed < self._off,
+                                               self._groups, axis=1)
+        else:
+            can_start = can_stay = np.zeros((0, len(self.gestures)), bool)
+        before = self.state.copy()
+        # Gestures of hands that disappeared end where they were last seen.
+        self.state[:] = False
+        self.state[rows] = np.where(before[rows], can_stay, can_start)
+        self.positions[rows] = px[:, self._anchors]
+
+        for hand, g in zip(*np.nonzero(before != self.state)):
+            x, y = self.positions[hand, g].tolist()
+            events.append(GestureEvent(
+                self.gestures[g].name,
+                'start' if self.state[hand, g] else 'end',
+                int(hand), int(x), int(y), timestamp))
+
+        palms = px[:, 9].astype(np.float64)
+        seen = np.zeros_like(self._palm_seen)
+        seen[rows] = True
+        if self._palm_time is not None and timestamp > self._palm_time:
+            # Only hands also seen on the previous update have a speed.
+            known = self._palm_seen[rows]
+            velocity = (palms - self._palms[rows]) / \
+                (timestamp - self._palm_time) / size[:, None]
+            speed = np.hypot(velocity[:, 0], velocity[:, 1])
+            swiping = self.swiping[rows]
+            fired = known & (speed > self.swipe_speed) & ~swiping
+            self.swiping[rows] = known & np.where(
+                swiping, speed > self.swipe_rearm, speed > self.swipe_speed)
+            for i in np.nonzero(fired)[0]:
+                vx, vy = velocity[i]
+                if abs(vx) > abs(vy):
+                    direction = 'right' if vx > 0 else 'left'
+                else:
+                    direction = 'down' if vy > 0 else 'up'
+                x, y = palms[i].tolist()
+                events.append(GestureEvent('swipe', direction, int(rows[i]),
+                                           int(x), int(y), timestamp))
+        self.swiping[~seen] = False
+        self._palms[rows] = palms
+        self._palm_seen = seen
+        self._palm_time = timestamp
+
+        self.rows = rows
+        self.events = events
+        return events
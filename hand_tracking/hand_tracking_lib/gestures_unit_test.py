@@ -0,0 +1,124 @@
+import unittest
+
+import numpy as np
+
+from hand_tracking.hand_tracking_lib.cv2_utils import Hands
+from hand_tracking.hand_tracking_lib.gestures import (GRAB, POINT,
+                                                      GestureEngine,
+                                                      pinch_gesture)
+from hand_tracking.hand_tracking_lib.landmarks import HandLandmarks
+from hand_tracking.hand_tracking_lib.landmarks_unit_test import make_results
+
+SHAPE = (480, 640, 3)
+# Wrist to middle finger MCP: 96 px, one hand size.
+HAND_SIZE = 96
+
+
+def open_hand(dx=0.0, pinch=None, point=False, grab=False):
+    points = [(0.5, 0.7)] * 21
+    points[0] = (0.5, 0.8)
+    points[9] = (0.5, 0.6)
+    points[8] = (0.45, 0.4)
+    points[12] = (0.5, 0.4)
+    points[16] = (0.55, 0.42)
+    points[4] = (0.4, 0.55)
+    if pinch is not None:
+        # Thumb `pinch` hand sizes to the right of the index tip.
+        points[4] = (0.45 + pinch * HAND_SIZE / 640, 0.4)
+    if point or grab:
+        points[12] = (0.5, 0.7)
+        points[16] = (0.55, 0.7)
+    if grab:
+        points[8] = (0.45, 0.7)
+    return [(x + dx, y) for x, y in points]
+
+
+def frame(*hands):
+    return HandLandmarks().update(make_results(list(hands),
+                                               ["Right"] * len(hands)),
+                                  SHAPE)
+
+
+class FakeDetector:
+    def __init__(self, landmarks):
+        self.landmarks = landmarks
+
+    def get_landmark_array(self, img, timestamp=None):
+        return self.landmarks
+
+
+class TestGestureEngine(unittest.TestCase):
+    def test_pinch_has_hysteresis(self):
+        engine = GestureEngine()
+        types = []
+        for t, gap in enumerate([0.8, 0.3, 0.4, 0.45, 0.55, 0.4]):
+            events = engine.update(frame(open_hand(pinch=gap)), t)
+            types.append([e.type for e in events if e.name == 'pinch'])
+        self.assertEqual(types, [[], ['start'], [], [], ['end'], []])
+
+    def test_pinch_thresholds_are_configurable(self):
+        engine = GestureEngine([pinch_gesture(1.3, 1.5), GRAB, POINT])
+        types = []
+        for t, gap in enumerate([1.6, 1.2, 1.4, 1.6]):
+            events = engine.update(frame(open_hand(pinch=gap)), t)
+            types.append([e.type for e in events if e.name == 'pinch'])
+        self.assertEqual(types, [[], ['start'], [], ['end']])
+        with self.assertRaises(ValueError):
+            pinch_gesture(0.5, 0.35)
+
+    def test_all_gestures_for_all_hands_in_one_pass(self):
+        engine = GestureEngine()
+        events = engine.update(frame(open_hand(point=True),
+                                     open_hand(grab=True)), 0)
+        started = {(e.name, e.hand) for e in events if e.type == 'start'}
+        self.assertEqual(started, {('point', 0), ('grab', 1)})
+        self.assertEqual(engine.active('point').tolist(), [True, False])
+
+        # The index tip of the pointing hand, in pixels.
+        point = [e for e in events if e.name == 'point'][0]
+        self.assertEqual((point.x, point.y), (288, 192))
+
+    def test_thresholds_follow_the_hand_size(self):
+        engine = GestureEngine()
+        small = HandLandmarks().update(
+            make_results([open_hand(pinch=0.3)], ["Right"]), (240, 320, 3))
+        self.assertEqual([e.type for e in engine.update(small, 0)],
+                         ['start'])
+
+    def test_lost_hand_ends_its_gestures(self):
+        engine = GestureEngine()
+        engine.update(frame(open_hand(grab=True)), 0)
+        events = engine.update(frame(), 1)
+        self.assertEqual([(e.name, e.type) for e in events],
+                         [('grab', 'end')])
+
+    def test_swipe_fires_once_per_move(self):
+        engine = GestureEngine()
+        swipes = []
+        for t, dx in enumerate([0, 0.2, 0.4, 0.6, 0.6, 0.6, 0.4]):
+            events = engine.update(frame(open_hand(dx=dx - 0.3)), t * 0.1)
+            swipes.append([e.type for e in events if e.name == 'swipe'])
+        self.assertEqual(swipes, [[], ['right'], [], [], [], [], ['left']])
+
+    def test_events_are_computed_once_per_frame(self):
+        engine = GestureEngine()
+        landmarks = frame(open_hand(pinch=0.3))
+        events = engine.update(landmarks, 1.0)
+        self.assertIs(engine.update(landmarks, 1.0), events)
+
+
+class TestHandsWithEngine(unittest.TestCase):
+    def test_pinch_state_comes_from_the_engine(self):
+        engine = GestureEngine()
+        img = np.zeros(SHAPE, np.uint8)
+        pinching = []
+        for t, gap in enumerate([0.8, 0.3, 0.45, 0.6]):
+            hands = Hands(FakeDetector(frame(open_hand(pinch=gap))), img,
+                          timestamp=t)
+            hands.get_pinch_pos(send_data=False, engine=engine)
+            pinching.append(hands.is_pinching)
+        self.assertEqual(pinching, [False, True, True, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+# Values stored in HandLandmarks.handedness
+LEFT = 0
+RIGHT = 1
+
+
+class HandLandmarks:
+    def __init__(self, max_hands=2):
+        # Filled once per frame from the MediaPipe result, then reused: all
+        # geometry below works on these arrays instead of the protobufs.
+        self.norm = np.zeros((max_hands, NUM_LANDMARKS, 3), np.float32)
+        self.px = np.zeros((max_hands, NUM_LANDMARKS, 3), np.float32)
+        self.handedness = np.full(max_hands, -1, np.int8)
+        self.count = 0
+        self.width = 0
+        self.height = 0
+        self._scale = np.ones(3, np.float32)
+
+    def __len__(self):
+        return self.count
+
+    def update(self, results, shape):
+        self.height, self.width = shape[:2]
+        hands = results.multi_hand_landmarks or []
+        handedness = results.multi_handedness or []
+        self.count = min(len(hands), len(self.norm))
+        for i in range(self.count):
+            self.norm[i] = [(lm.x, lm.y, lm.z) for lm in hands[i].landmark]
+            if i < len(handedness):
+                label = handedness[i].classification[0].label
+                self.handedness[i] = RIGHT if label == "Right" else LEFT
+            else:
+                self.handedness[i] = -1
+        self.update_pixels()
+        return self
+
+    def mirror(self):
+        # As if the frame had been flipped horizontally before detection.
+        # MediaPipe labels handedness assuming a mirrored (selfie) frame,
+        # so the labels swap too.
+        count = self.count
+        np.subtract(1.0, self.norm[:count, :, 0], out=self.norm[:count, :, 0])
+        known = self.handedness[:count] >= 0
+        self.handedness[:count][known] = 1 - self.handedness[:count][known]
+        self.update_pixels()
+        return self
+
+    def update_pixels(self):
+        # MediaPipe's z uses roughly the same scale as x.
+        self._scale[:] = (self.width, self.height, self.width)
+        np.multiply(self.norm[:self.count], self._scale,
+                    out=self.px[:self.count])
+
+    def copy(self):
+        other = HandLandmarks(len(self.norm))
+        other.norm[:] = self.norm
+        other.px[:] = self.px
+        other.handedness[:] = self.handedness
+        other.count = self.count
+        other.width = self.width
+        other.height = self.height
+        return other
+
+    @property
+    def hands(self):
+        return self.px[:self.count]
+
+    def points(self, index):
+        # Integer pixel position of one landmark for every hand.
+        return self.px[:self.count, index, :2].astype(np.int32)
+
+    def distances(self, a, b):
+        diff = self.px[:self.count, a, :2] - self.px[:self.count, b, :2]
+        return np.sqrt((diff * diff).sum(axis=1))
+
+    def centers(self):
+        return self.px[:self.count, :, :2].mean(axis=1)
+
+    def bounding_boxes(self):
+        # (hands, 4) array of x1, y1, x2, y2 in pixels.
+        xy = self.px[:self.count, :, :2]
+        return np.concatenate((xy.min(axis=1), xy.max(axis=1)), axis=1)
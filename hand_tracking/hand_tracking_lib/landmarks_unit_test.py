@@ -0,0 +1,82 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from hand_tracking.hand_tracking_lib.cv2_utils import HAND_BONES, draw_hands
+from hand_tracking.hand_tracking_lib.landmarks import (LEFT, RIGHT,
+                                                       HandLandmarks)
+
+
+def make_results(hands, labels):
+    landmarks = [SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=0.0)
+                                           for x, y in hand])
+                 for hand in hands]
+    handedness = [SimpleNamespace(
+        classification=[SimpleNamespace(label=label)]) for label in labels]
+    return SimpleNamespace(multi_hand_landmarks=landmarks or None,
+                           multi_handedness=handedness or None)
+
+
+def straight_hand(x0):
+    return [(x0 + i * 0.01, 0.5) for i in range(21)]
+
+
+class TestHandLandmarks(unittest.TestCase):
+    def test_update_fills_normalized_and_pixel_arrays(self):
+        array = HandLandmarks(max_hands=2)
+        array.update(make_results([straight_hand(0.1)], ["Right"]),
+                     (480, 640, 3))
+        self.assertEqual(len(array), 1)
+        self.assertEqual(array.hands.shape, (1, 21, 3))
+        self.assertEqual(array.px.dtype, np.float32)
+        self.assertAlmostEqual(float(array.px[0, 0, 0]), 64, places=3)
+        self.assertAlmostEqual(float(array.px[0, 0, 1]), 240, places=3)
+        self.assertEqual(array.handedness[0], RIGHT)
+
+    def test_geometry_is_vectorized_over_hands(self):
+        array = HandLandmarks(max_hands=2)
+        array.update(make_results([straight_hand(0.1), straight_hand(0.5)],
+                                  ["Left", "Right"]), (100, 1000, 3))
+        np.testing.assert_allclose(array.distances(4, 8), [40, 40],
+                                   rtol=1e-5)
+        self.assertEqual(array.bounding_boxes().shape, (2, 4))
+        self.assertEqual(array.handedness[0], LEFT)
+        self.assertEqual(array.points(8).tolist(), [[180, 50], [580, 50]])
+
+    def test_mirror_flips_x_and_handedness(self):
+        array = HandLandmarks(max_hands=2)
+        array.update(make_results([straight_hand(0.1), straight_hand(0.5)],
+                                  ["Left", "Right"]), (100, 1000, 3))
+        array.mirror()
+        self.assertAlmostEqual(float(array.px[0, 0, 0]), 900, places=2)
+        self.assertAlmostEqual(float(array.norm[1, 20, 0]), 0.3, places=5)
+        self.assertEqual(array.handedness[:2].tolist(), [RIGHT, LEFT])
+
+    def test_empty_result_and_copy(self):
+        array = HandLandmarks()
+        array.update(make_results([straight_hand(0.1)], ["Left"]),
+                     (100, 100, 3))
+        snapshot = array.copy()
+        array.update(make_results([], []), (100, 100, 3))
+        self.assertFalse(array)
+        self.assertEqual(len(snapshot), 1)
+
+
+class TestDrawHands(unittest.TestCase):
+    def test_bone_table_covers_every_landmark(self):
+        self.assertEqual(set(HAND_BONES.ravel().tolist()), set(range(21)))
+
+    def test_draws_every_hand(self):
+        array = HandLandmarks(max_hands=2)
+        array.update(make_results([straight_hand(0.1), straight_hand(0.6)],
+                                  ["Left", "Right"]), (100, 1000, 3))
+        img = np.zeros((100, 1000, 3), np.uint8)
+        draw_hands(img, array, thickness=3, joint_radius=2)
+        self.assertTrue(img[50, 150].any())
+        self.assertTrue(img[50, 650].any())
+        self.assertFalse(img[50, 400].any())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import cv2
+import numpy as np
+
+# Per-stage timings of the frame loop:
+#   with metrics.span('detect'):
+#       ...
+# Every stage keeps a rolling window of its last durations. A disabled
+# Metrics hands out one shared no-op span, so the hooks can stay in the
+# loop for good.
+
+
+class RollingHistogram:
+    def __init__(self, size=300):
+        self.values = np.zeros(size, np.float64)
+        self.count = 0
+
+    def add(self, value):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def window(self):
+        return self.values[:min(self.count, len(self.values))]
+
+    def stats(self):
+        ms = 1000 * self.window()
+        if not len(ms):
+            return {'count': 0}
+        p50, p95 = np.percentile(ms, (50, 95))
+        return {'count': self.count, 'mean_ms': float(ms.mean()),
+                'p50_ms': float(p50), 'p95_ms': float(p95),
+                'max_ms': float(ms.max())}
+
+
+class Span:
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.add(time.perf_counter() - self.start)
+        return False
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Metrics:
+    def __init__(self, enabled=True, window=300):
+        self.enabled = enabled
+        self.window = window
+        self.stages = {}
+        self.frames = RollingHistogram(window)
+        self._last_frame = None
+        self._server = None
+        self._stop_dump = threading.Event()
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        histogram = self.stages.get(name)
+        if histogram is None:
+            histogram = self.stages[name] = RollingHistogram(self.window)
+        return Span(histogram)
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        histogram = self.stages.get(name)
+        if histogram is None:
+            histogram = self.stages[name] = RollingHistogram(self.window)
+        histogram.add(seconds)
+
+    def frame(self):
+        # Called once per loop iteration; the intervals give the FPS.
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self.frames.add(now - self._last_frame)
+        self._last_frame = now
+
+    def fps(self):
+        intervals = self.frames.window()
+        if not len(intervals) or not intervals.sum():
+            return 0.0
+        return len(intervals) / intervals.sum()
+
+    def snapshot(self):
+        return {'time': time.time(), 'fps': self.fps(),
+                'frame': self.frames.stats(),
+                'stages': {name: histogram.stats()
+                           for name, histogram in self.stages.items()}}
+
+    def draw_overlay(self, img, origin=(10, 30), color=(0, 255, 255)):
+        if not self.enabled:
+            return img
+        x, y = origin
+        lines = ["%.1f FPS" % self.fps()]
+        for name, histogram in self.stages.items():
+            stats = histogram.stats()
+            if stats['count']:
+                lines.append("%s %.1f / %.1f ms" % (name, stats['p50_ms'],
+                                                    stats['p95_ms']))
+        for i, line in enumerate(lines):
+            cv2.putText(img, line, (x, y + 25 * i), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.6, color, 2)
+        return img
+
+    def serve(self, port=9100, host="127.0.0.1"):
+        # GET on any path returns the snapshot as JSON.
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(metrics.snapshot()).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = HTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever,
+                         daemon=True).start()
+        return self._server.server_address[1]
+
+    def dump_every(self, path, interval=5.0):
+        threading.Thread(target=self._dump_loop, args=(path, interval),
+                         daemon=True).start()
+
+    def dump(self, path):
+        # Written aside and renamed so readers never see half a file.
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def _dump_loop(self, path, interval):
+        while not self._stop_dump.wait(interval):
+            self.dump(path)
+
+    def close(self):
+        self._stop_dump.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
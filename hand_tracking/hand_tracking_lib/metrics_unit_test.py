@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+
+import numpy as np
+
+from hand_tracking.hand_tracking_lib.metrics import (NULL_SPAN, Metrics,
+                                                     RollingHistogram)
+
+
+class TestMetrics(unittest.TestCase):
+    def test_disabled_metrics_record_nothing(self):
+        metrics = Metrics(enabled=False)
+        self.assertIs(metrics.span('detect'), NULL_SPAN)
+        with metrics.span('detect'):
+            pass
+        metrics.frame()
+        metrics.record('post', 0.1)
+        self.assertEqual(metrics.stages, {})
+        img = np.zeros((100, 200, 3), np.uint8)
+        self.assertFalse(metrics.draw_overlay(img).any())
+
+    def test_spans_fill_rolling_histograms(self):
+        metrics = Metrics(window=4)
+        for _ in range(6):
+            metrics.frame()
+            with metrics.span('detect'):
+                pass
+        histogram = metrics.stages['detect']
+        self.assertEqual(histogram.count, 6)
+        self.assertEqual(len(histogram.window()), 4)
+        self.assertGreater(metrics.fps(), 0)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['stages']['detect']['count'], 6)
+
+    def test_histogram_percentiles(self):
+        histogram = RollingHistogram(size=100)
+        for i in range(1, 101):
+            histogram.add(i / 1000)
+        stats = histogram.stats()
+        self.assertAlmostEqual(stats['p50_ms'], 50.5)
+        self.assertAlmostEqual(stats['max_ms'], 100)
+
+    def test_overlay_and_exports(self):
+        metrics = Metrics()
+        metrics.record('detect', 0.01)
+        img = np.zeros((100, 300, 3), np.uint8)
+        self.assertTrue(metrics.draw_overlay(img).any())
+
+        port = metrics.serve(0)
+        with urllib.request.urlopen("http://127.0.0.1:%d/" % port) as r:
+            self.assertIn('detect', json.load(r)['stages'])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.json")
+            metrics.dump(path)
+            with open(path) as f:
+                self.assertIn('fps', json.load(f))
+        metrics.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
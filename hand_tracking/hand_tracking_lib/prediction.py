@@ -0,0 +1,56 @@
+import time
+from collections import deque
+
+import numpy as np
+
+
+class PinchPredictor:
+    def __init__(self, history=5, extra_latency=0.0, max_horizon=0.12,
+                 send_predicted=True):
+        # Extrapolates the fingertip to "now" from its last positions and
+        # the measured capture-to-output latency, plus extra_latency for
+        # what happens after us (network, game rendering). The horizon is
+        # capped so a bad velocity estimate cannot throw the cursor away.
+        self.extra_latency = extra_latency
+        self.max_horizon = max_horizon
+        self.send_predicted = send_predicted
+        self.times = deque(maxlen=history)
+        self.positions = deque(maxlen=history)
+        self.latency = 0.0
+        self.velocity = (0.0, 0.0)
+
+    def reset(self):
+        self.times.clear()
+        self.positions.clear()
+        self.velocity = (0.0, 0.0)
+
+    def update(self, x, y, timestamp, now=None):
+        if now is None:
+            now = time.monotonic()
+        if self.times and timestamp <= self.times[-1]:
+            # Same frame seen twice (e.g. threaded camera), nothing new.
+            return self.predict()
+        self.times.append(timestamp)
+        self.positions.append((x, y))
+        measured = max(now - timestamp, 0.0)
+        self.latency = measured if len(self.times) == 1 else \
+            0.8 * self.latency + 0.2 * measured
+
+        if len(self.times) >= 2:
+            # Least-squares velocity over the history window.
+            t = np.array(self.times) - self.times[-1]
+            xy = np.array(self.positions, np.float64)
+            t_centered = t - t.mean()
+            denom = (t_centered * t_centered).sum()
+            if denom > 0:
+                vx, vy = (t_centered @ (xy - xy.mean(axis=0))) / denom
+                self.velocity = (float(vx), float(vy))
+        return self.predict()
+
+    def predict(self):
+        if not self.positions:
+            return 0, 0
+        x, y = self.positions[-1]
+        horizon = min(self.latency + self.extra_latency, self.max_horizon)
+        return (int(round(x + self.velocity[0] * horizon)),
+                int(round(y + self.velocity[1] * horizon)))
@@ -0,0 +1,30 @@
+import unittest
+
+from hand_tracking.hand_tracking_lib.prediction import PinchPredictor
+
+
+class TestPinchPredictor(unittest.TestCase):
+    def test_extrapolates_by_measured_latency(self):
+        predictor = PinchPredictor(history=5)
+        for i in range(5):
+            t = i / 30
+            # 600 px/s to the right, seen 50 ms after capture.
+            predicted = predictor.update(100 + 20 * i, 200, t, now=t + 0.05)
+        self.assertEqual(predicted, (210, 200))
+
+    def test_horizon_is_capped(self):
+        predictor = PinchPredictor(extra_latency=1.0, max_horizon=0.1)
+        predictor.update(0, 0, 0.0, now=0.0)
+        self.assertEqual(predictor.update(10, 0, 0.01, now=0.01), (110, 0))
+
+    def test_still_finger_and_reset(self):
+        predictor = PinchPredictor(extra_latency=0.05)
+        for i in range(5):
+            predicted = predictor.update(50, 60, i / 30, now=i / 30)
+        self.assertEqual(predicted, (50, 60))
+        predictor.reset()
+        self.assertEqual(predictor.predict(), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
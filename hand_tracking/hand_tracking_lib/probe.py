@@ -0,0 +1,121 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from .capture import BACKENDS, negotiate, open_capture, parse_resolution
+
+# Tries the usual capture modes of a camera and times each of them:
+#   python -m hand_tracking_lib.probe --backend v4l2
+#   python -m hand_tracking_lib.probe --resolutions 640x480 --fourccs MJPG
+# A mode the driver does not have falls back to one it does; every mode
+# actually granted is measured once.
+
+RESOLUTIONS = [(320, 240), (640, 480), (800, 600), (1280, 720), (1920, 1080)]
+FOURCCS = ['MJPG', 'YUYV']
+FRAMERATES = [15, 30, 60]
+
+
+def measure_mode(capture, frames=60, warmup=5):
+    # read() blocks until the driver has the next frame: its duration is
+    # the capture latency seen by the frame loop, frames over the total
+    # time is the throughput.
+    for _ in range(warmup):
+        capture.read()
+    latencies = np.zeros(frames)
+    received = 0
+    start = time.perf_counter()
+    for i in range(frames):
+        before = time.perf_counter()
+        ret, _ = capture.read()
+        latencies[i] = time.perf_counter() - before
+        received += bool(ret)
+    total = time.perf_counter() - start
+    ms = 1000 * latencies
+    return {'frames': received,
+            'fps': received / total if total else 0.0,
+            'read_p50_ms': float(np.percentile(ms, 50)),
+            'read_p95_ms': float(np.percentile(ms, 95)),
+            'read_max_ms': float(ms.max())}
+
+
+def probe(device=0, backend=None, resolutions=RESOLUTIONS, fourccs=FOURCCS,
+          framerates=FRAMERATES, frames=60, opener=open_capture):
+    results = []
+    measured = set()
+    for fourcc in fourccs:
+        for resolution in resolutions:
+            for framerate in framerates:
+                # Reopened for every mode: some drivers only apply a new
+                # format to a fresh stream.
+                capture = opener(device, backend)
+                try:
+                    if not capture.isOpened():
+                        raise IOError("cannot open camera %s" % device)
+                    settings = negotiate(capture, resolution, framerate,
+                                         fourcc, buffer_size=1)
+                    mode = (settings['fourcc'], settings['width'],
+                            settings['height'], settings['fps'])
+                    if mode in measured:
+                        continue
+                    measured.add(mode)
+                    result = {'requested': {'fourcc': fourcc,
+                                            'width': resolution[0],
+                                            'height': resolution[1],
+                                            'fps': framerate},
+                              'settings': settings}
+                    result.update(measure_mode(capture, frames))
+                    results.append(result)
+                finally:
+                    capture.release()
+    return results
+
+
+def format_table(results):
+    lines = ["%-6s %-11s %6s %8s %9s %9s" % ('fourcc', 'size', 'fps',
+                                             'got fps', 'read p50',
+                                             'read p95')]
+    for result in sorted(results, key=lambda r: -r['fps']):
+        settings = result['settings']
+        lines.append("%-6s %-11s %6.1f %8.1f %7.1fms %7.1fms" % (
+            settings['fourcc'],
+            "%dx%d" % (settings['width'], settings['height']),
+            settings['fps'], result['fps'], result['read_p50_ms'],
+            result['read_p95_ms']))
+    return '\n'.join(lines)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="hand_tracking_lib.probe")
+    parser.add_argument('--device', default='0',
+                        help="camera index or device path")
+    parser.add_argument('--backend', choices=sorted(BACKENDS))
+    parser.add_argument('--resolutions', metavar='WxH,...',
+                        default=','.join("%dx%d" % r for r in RESOLUTIONS))
+    parser.add_argument('--fourccs', default=','.join(FOURCCS))
+    parser.add_argument('--fps', default=','.join(map(str, FRAMERATES)))
+    parser.add_argument('--frames', type=int, default=60,
+                        help="frames timed per mode")
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+
+    device = int(args.device) if args.device.isdigit() else args.device
+    try:
+        results = probe(device, args.backend,
+                        [parse_resolution(r)
+                         for r in args.resolutions.split(',')],
+                        args.fourccs.split(','),
+                        [float(f) for f in args.fps.split(',')],
+                        args.frames)
+    except IOError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(json.dumps(results, indent=2) if args.json
+          else format_table(results))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,44 @@
+import unittest
+
+from hand_tracking.hand_tracking_lib import probe
+from hand_tracking.hand_tracking_lib.capture_unit_test import FakeDriver
+
+
+class TestProbe(unittest.TestCase):
+    def test_every_granted_mode_is_measured_once(self):
+        drivers = []
+
+        def opener(device, backend):
+            drivers.append(FakeDriver())
+            return drivers[-1]
+
+        results = probe.probe(resolutions=[(640, 480), (1280, 720)],
+                              fourccs=['MJPG', 'YUYV'],
+                              framerates=[30, 60], frames=10,
+                              opener=opener)
+        # One fresh capture per requested mode; 60 FPS falls back to 30.
+        self.assertEqual(len(drivers), 8)
+        modes = [(r['settings']['fourcc'], r['settings']['width'],
+                  r['settings']['fps']) for r in results]
+        self.assertEqual(modes, [('MJPG', 640, 30.0), ('MJPG', 1280, 30.0),
+                                 ('YUYV', 640, 30.0), ('YUYV', 1280, 10.0)])
+        for result in results:
+            self.assertEqual(result['frames'], 10)
+            self.assertGreater(result['fps'], 0)
+            self.assertLessEqual(result['read_p50_ms'],
+                                 result['read_p95_ms'])
+        self.assertEqual(drivers[0].reads, 15)
+
+        table = probe.format_table(results)
+        self.assertEqual(len(table.splitlines()), 5)
+        self.assertIn('1280x720', table)
+
+    def test_closed_camera_is_an_error(self):
+        driver = FakeDriver()
+        driver.isOpened = lambda: False
+        with self.assertRaises(IOError):
+            probe.probe(opener=lambda device, backend: driver)
+
+
+if __name__ == '__main__':
+    unittest.main()
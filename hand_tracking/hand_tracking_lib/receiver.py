@@ -0,0 +1,193 @@
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse
+
+from .transport import FRAME, decode_frame, make_transport
+
+# Local stand-in for the game engine so the transports can be compared on
+# one machine:
+#   python -m hand_tracking_lib.receiver udp://127.0.0.1:8081
+#   python -m hand_tracking_lib.receiver --bench 2000
+
+BENCH_URLS = ["http://127.0.0.1:8090", "udp://127.0.0.1:8091",
+              "unix:///tmp/theraduty_bench.sock"]
+
+
+class Receiver:
+    def __init__(self, url):
+        self.url = url
+        self.parsed = urlparse(url)
+        self.count = 0
+        self.malformed = 0
+        self.latencies = []
+        self._running = False
+        self._thread = None
+        self._server = None
+
+    def on_message(self, data):
+        self.count += 1
+        # Only the binary frames carry the sender's timestamp.
+        if 't' in data:
+            self.latencies.append(time.monotonic() - data['t'])
+
+    def on_frame(self, buf):
+        # A short or foreign datagram is counted and skipped: it must not
+        # stop the receiving thread.
+        try:
+            data = decode_frame(buf)
+        except (struct.error, ValueError):
+            self.malformed += 1
+            return
+        self.on_message(data)
+
+    def start(self):
+        self._running = True
+        scheme = self.parsed.scheme
+        if scheme == 'http':
+            target = self._serve_http
+        elif scheme == 'udp':
+            target = self._serve_udp
+        elif scheme == 'unix':
+            target = self._serve_unix
+        else:
+            raise ValueError("unsupported transport: %s" % self.url)
+        ready = threading.Event()
+        self._thread = threading.Thread(target=target, args=(ready,),
+                                        daemon=True)
+        self._thread.start()
+        ready.wait(1)
+
+    def stop(self):
+        self._running = False
+        if self._server is not None:
+            self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def _serve_http(self, ready):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers['Content-Length'])
+                receiver.on_message(json.loads(self.rfile.read(length)))
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = HTTPServer((self.parsed.hostname, self.parsed.port),
+                                  Handler)
+        ready.set()
+        self._server.serve_forever()
+        self._server.server_close()
+
+    def _serve_udp(self, ready):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind((self.parsed.hostname, self.parsed.port))
+        sock.settimeout(0.1)
+        ready.set()
+        while self._running:
+            try:
+                # Longer than a frame is not a frame: read all of it.
+                buf = sock.recv(65536)
+            except socket.timeout:
+                continue
+            self.on_frame(buf)
+        sock.close()
+
+    def _serve_unix(self, ready):
+        path = self.parsed.path
+        if os.path.exists(path):
+            os.unlink(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+        server.settimeout(0.1)
+        ready.set()
+        while self._running:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            self._read_stream(conn)
+        server.close()
+        os.unlink(path)
+
+    def _read_stream(self, conn):
+        conn.settimeout(0.1)
+        buf = b''
+        while self._running:
+            try:
+                chunk = conn.recv(4096)
+            except socket.timeout:
+                continue
+            if not chunk:
+                break
+            buf += chunk
+            while len(buf) >= FRAME.size:
+                self.on_frame(buf[:FRAME.size])
+                buf = buf[FRAME.size:]
+        conn.close()
+
+    def get_stats(self):
+        stats = {'url': self.url, 'messages': self.count,
+                 'malformed': self.malformed}
+        if self.latencies:
+            latencies = sorted(self.latencies)
+            stats['mean_latency_ms'] = 1000 * sum(latencies) / len(latencies)
+            stats['p95_latency_ms'] = 1000 * latencies[
+                int(len(latencies) * 0.95)]
+        return stats
+
+
+def bench(count=1000, urls=BENCH_URLS):
+    results = []
+    for url in urls:
+        receiver = Receiver(url)
+        receiver.start()
+        transport = make_transport(url)
+        start = time.perf_counter()
+        for i in range(count):
+            transport.send({'x': i % 640, 'y': i % 480, 'pinch': i % 2 == 0})
+        elapsed = time.perf_counter() - start
+        # Give the receiver a moment to drain what is still in flight.
+        time.sleep(0.2)
+        transport.close()
+        receiver.stop()
+        stats = receiver.get_stats()
+        stats['send_us_per_message'] = 1e6 * elapsed / count
+        results.append(stats)
+    return results
+
+
+def main(argv):
+    if argv and argv[0] == '--bench':
+        count = int(argv[1]) if len(argv) > 1 else 1000
+        for stats in bench(count):
+            print(json.dumps(stats))
+        return
+    receiver = Receiver(argv[0] if argv else "http://127.0.0.1:8080")
+    receiver.start()
+    last = 0
+    try:
+        while True:
+            time.sleep(1)
+            print(f"{receiver.count - last} msg/s", receiver.get_stats())
+            last = receiver.count
+    except KeyboardInterrupt:
+        receiver.stop()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,129 @@
+import time
+
+import cv2
+import numpy as np
+
+from .capture import get_settings
+from .frames import FramePool
+
+# A recorded session is two files next to each other:
+#   <path>.mkv  the raw (not yet mirrored) camera frames, FFV1 by default
+#               so the replay gets back exactly the captured pixels
+#   <path>.npy  the capture timestamp of every frame, in seconds
+
+
+class FrameRecorder:
+    def __init__(self, path, fps=30, fourcc='FFV1'):
+        self.path = path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.writer = None
+        self.timestamps = []
+
+    def write(self, frame, timestamp):
+        if self.writer is None:
+            h, w = frame.shape[:2]
+            self.writer = cv2.VideoWriter(
+                self.path + '.mkv', cv2.VideoWriter_fourcc(*self.fourcc),
+                self.fps, (w, h))
+            if not self.writer.isOpened():
+                raise IOError("cannot record to %s.mkv" % self.path)
+        self.writer.write(frame)
+        self.timestamps.append(timestamp)
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.writer.release()
+        self.writer = None
+        np.save(self.path + '.npy', np.array(self.timestamps, np.float64))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+
+class ReplayCamera:
+    def __init__(self, path, realtime=True, loop=False, mirror_pixels=True):
+        # Plays a recorded session through the Camera interface. With
+        # realtime the frames come at the recorded pace, otherwise as fast
+        # as they are asked for. frame_time keeps the recorded intervals
+        # either way, so everything timed from it (scheduler, predictor)
+        # behaves the same on every run.
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.timestamps = np.load(path + '.npy')
+        self.camera = cv2.VideoCapture(path + '.mkv')
+        if not self.camera.isOpened() or not len(self.timestamps):
+            raise IOError("cannot replay %s" % path)
+        self.settings = get_settings(self.camera)
+        self.threaded = False
+        self.frame_seq = 0
+        self.frame_time = 0.0
+        self.dropped_frames = 0
+        self.last_dropped = 0
+        self.finished = False
+        self.pool = FramePool(size=1)
+        self.rgb = None
+        self.mirror_pixels = mirror_pixels
+        self._index = 0
+        self._base = time.monotonic()
+        self._offset = 0.0
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        self.camera.release()
+
+    def _rewind(self):
+        self.camera.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        # Keep the clock going forward across loops.
+        self._offset += self.timestamps[-1] - self.timestamps[0] + \
+            (self.timestamps[-1] - self.timestamps[-2]
+             if len(self.timestamps) > 1 else 0.0)
+        self._index = 0
+
+    def read_latest(self, timeout=1.0, wait_new=False):
+        # Every read is a new frame.
+        if self._index == len(self.timestamps):
+            if not self.loop:
+                self.finished = True
+                return None
+            self._rewind()
+        ret, frame = self.pool.read(self.camera)
+        if not ret:
+            self.finished = True
+            return None
+        elapsed = self._offset + self.timestamps[self._index] - \
+            self.timestamps[0]
+        if self.realtime:
+            delay = self._base + elapsed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self._index += 1
+        self.frame_seq += 1
+        self.frame_time = self._base + elapsed
+        return frame
+
+    def convert(self, frame):
+        img, self.rgb = self.pool.convert(frame, self.mirror_pixels)
+        return img, self.rgb
+
+    def display(self, img):
+        return img if self.mirror_pixels else self.pool.mirror(img)
+
+    def read_frames(self, wait_new=False):
+        frame = self.read_latest()
+        if frame is None:
+            return None, None
+        return self.convert(frame)
+
+    def get_rgb_img(self):
+        return self.read_frames()[0]
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+from hand_tracking.hand_tracking_lib.recording import (FrameRecorder,
+                                                       ReplayCamera)
+
+
+class TestRecording(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "session")
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 256, (48, 64, 3), np.uint8)
+                       for _ in range(4)]
+        self.times = [10.0, 10.04, 10.07, 10.12]
+        recorder = FrameRecorder(self.path)
+        for frame, t in zip(self.frames, self.times):
+            recorder.write(frame, t)
+        recorder.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replay_gives_back_the_mirrored_frames(self):
+        camera = ReplayCamera(self.path, realtime=False)
+        for frame in self.frames:
+            np.testing.assert_array_equal(camera.get_rgb_img(),
+                                          cv2.flip(frame, 1))
+        self.assertIsNone(camera.get_rgb_img())
+        self.assertTrue(camera.finished)
+        self.assertEqual(camera.frame_seq, 4)
+        camera.close()
+
+    def test_frame_times_keep_the_recorded_intervals(self):
+        camera = ReplayCamera(self.path, realtime=False)
+        times = []
+        for _ in self.frames:
+            camera.get_rgb_img()
+            times.append(camera.frame_time)
+        np.testing.assert_allclose(np.diff(times), np.diff(self.times))
+        camera.close()
+
+    def test_realtime_replay_waits_for_the_recorded_pace(self):
+        start = time.monotonic()
+        camera = ReplayCamera(self.path, realtime=True)
+        while camera.get_rgb_img() is not None:
+            pass
+        # The last frame is due 120 ms after the first one.
+        self.assertGreaterEqual(time.monotonic() - start, 0.12)
+        camera.close()
+
+    def test_loop_restarts_with_increasing_time(self):
+        camera = ReplayCamera(self.path, realtime=False, loop=True)
+        times = []
+        for _ in range(10):
+            self.assertIsNotNone(camera.get_rgb_img())
+            times.append(camera.frame_time)
+        self.assertTrue((np.diff(times) > 0).all())
+        camera.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import math
+
+import numpy as np
+
+
+class InferenceScheduler:
+    def __init__(self, max_interval=4, frame_budget=1 / 30,
+                 motion_threshold=0.5, pinch_guard=1.0, smoothing=0.5):
+        # The detector runs every `interval` frames. In between, landmarks
+        # are extrapolated from the last detection with a constant-velocity
+        # model (normalized units per second).
+        self.max_interval = max_interval
+        self.frame_budget = frame_budget
+        # Hand speed, in hand sizes per second, above which every frame is
+        # detected.
+        self.motion_threshold = motion_threshold
+        # Thumb-index distance, in hand sizes, under which a pinch may be
+        # about to start or end: detection then runs on every frame.
+        self.pinch_guard = pinch_guard
+        self.smoothing = smoothing
+
+        self.interval = 1
+        self.frames_since_detection = 0
+        self.detect_cost = 0.0
+        self.detections = 0
+        self.predictions = 0
+        self.base = None
+        self.velocity = None
+        self.has_velocity = False
+        self.base_time = 0.0
+        # Time of the last frame seen: a threaded camera hands the same
+        # frame out again until the next one arrives, and a repeated frame
+        # is neither a new detection nor a frame skipped.
+        self.frame_time = None
+
+    def should_detect(self, now):
+        if self.base is None or len(self.base) == 0:
+            return True
+        if now == self.frame_time:
+            # The same frame again: what it gave last time still holds.
+            return False
+        return self.frames_since_detection + 1 >= self.interval
+
+    def update(self, landmarks, now, cost):
+        if self.base is not None and now <= self.base_time:
+            return
+        self.frame_time = now
+        count = landmarks.count
+        norm = landmarks.norm[:count].copy()
+        if self.base is not None and len(self.base) == count and count \
+                and now > self.base_time:
+            velocity = (norm - self.base) / (now - self.base_time)
+            if self.has_velocity:
+                velocity = self.smoothing * velocity + \
+                    (1 - self.smoothing) * self.velocity
+        else:
+            velocity = None
+        self.base = norm
+        self.velocity = np.zeros_like(norm) if velocity is None else velocity
+        self.has_velocity = velocity is not None
+        self.base_time = now
+        self.frames_since_detection = 0
+        self.detections += 1
+        self.detect_cost = cost if self.detections == 1 else \
+            0.8 * self.detect_cost + 0.2 * cost
+        # Without a velocity estimate yet, the next frame is detected too.
+        self.interval = 1 if velocity is None else \
+            self._next_interval(landmarks)
+
+    def _next_interval(self, landmarks):
+        if not landmarks.count:
+            return 1
+        size = hand_sizes(landmarks.norm[:landmarks.count])
+        speed = np.abs(self.velocity[:, :, :2]).max(axis=(1, 2)) / size
+        gap = np.hypot(*(landmarks.norm[:landmarks.count, 4, :2] -
+                         landmarks.norm[:landmarks.count, 8, :2]).T) / size
+        if (speed > self.motion_threshold).any() or \
+                (gap < self.pinch_guard).any():
+            return 1
+        # Skip as many frames as the detector cost needs to fit the frame
+        # budget, and slowly more while the hands stay still.
+        needed = math.ceil(self.detect_cost / self.frame_budget) \
+            if self.frame_budget else 1
+        return min(self.max_interval, max(needed, self.interval + 1))
+
+    def predict(self, landmarks, now):
+        if now != self.frame_time:
+            self.frame_time = now
+            self.frames_since_detection += 1
+            self.predictions += 1
+        count = len(self.base)
+        landmarks.count = count
+        np.add(self.base, self.velocity * (now - self.base_time),
+               out=landmarks.norm[:count])
+        landmarks.update_pixels()
+        return landmarks
+
+
+def hand_sizes(norm):
+    # Wrist to middle finger MCP, a size that does not depend on the pose.
+    return np.maximum(np.hypot(*(norm[:, 0, :2] - norm[:, 9, :2]).T), 1e-3)
@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+
+from hand_tracking.hand_tracking_lib.landmarks import HandLandmarks
+from hand_tracking.hand_tracking_lib.scheduler import InferenceScheduler
+
+
+def open_hand(landmarks, x):
+    # Palm length of 0.1 and thumb and index tips far apart.
+    landmarks.count = 1
+    landmarks.width, landmarks.height = 640, 480
+    landmarks.norm[0] = 0
+    landmarks.norm[0, :, 0] = x
+    landmarks.norm[0, :, 1] = 0.5
+    landmarks.norm[0, 9, 1] = 0.4
+    landmarks.norm[0, 4, 0] = x - 0.15
+    landmarks.norm[0, 8, 0] = x + 0.15
+    landmarks.update_pixels()
+
+
+class TestInferenceScheduler(unittest.TestCase):
+    def run_frames(self, scheduler, positions, fps=30):
+        landmarks = HandLandmarks(1)
+        detected = []
+        for i, x in enumerate(positions):
+            now = i / fps
+            if scheduler.should_detect(now):
+                open_hand(landmarks, x)
+                scheduler.update(landmarks, now, 0.001)
+                detected.append(i)
+            else:
+                scheduler.predict(landmarks, now)
+        return detected, landmarks
+
+    def test_still_hand_is_detected_less_often(self):
+        scheduler = InferenceScheduler(max_interval=4)
+        detected, _ = self.run_frames(scheduler, [0.5] * 40)
+        self.assertLess(len(detected), 15)
+        self.assertEqual(scheduler.interval, 4)
+
+    def test_fast_hand_is_detected_every_frame(self):
+        scheduler = InferenceScheduler(max_interval=4)
+        detected, _ = self.run_frames(scheduler,
+                                      [0.2 + i * 0.02 for i in range(30)])
+        self.assertEqual(len(detected), 30)
+
+    def test_prediction_extrapolates_constant_velocity(self):
+        scheduler = InferenceScheduler(max_interval=4, motion_threshold=100,
+                                       smoothing=1.0)
+        landmarks = HandLandmarks(1)
+        for i in range(2):
+            open_hand(landmarks, 0.5 + i * 0.01)
+            scheduler.update(landmarks, i / 30, 0.001)
+        scheduler.predict(landmarks, 3 / 30)
+        np.testing.assert_allclose(landmarks.norm[0, 0, 0], 0.53, atol=1e-5)
+        np.testing.assert_allclose(landmarks.px[0, 0, 0], 0.53 * 640,
+                                   atol=1e-2)
+
+    def test_repeated_frames_are_counted_once(self):
+        # A threaded camera returns the latest frame until a new one comes.
+        scheduler = InferenceScheduler(max_interval=4, motion_threshold=100,
+                                       smoothing=1.0)
+        landmarks = HandLandmarks(1)
+        for i in range(2):
+            open_hand(landmarks, 0.5 + i * 0.01)
+            scheduler.update(landmarks, i / 30, 0.001)
+            scheduler.update(landmarks, i / 30, 0.001)
+        self.assertTrue(scheduler.has_velocity)
+        self.assertEqual((scheduler.detections, scheduler.interval), (2, 2))
+
+        for _ in range(3):
+            self.assertFalse(scheduler.should_detect(2 / 30))
+            scheduler.predict(landmarks, 2 / 30)
+        self.assertEqual((scheduler.frames_since_detection,
+                          scheduler.predictions), (1, 1))
+        self.assertTrue(scheduler.should_detect(3 / 30))
+
+    def test_close_fingers_keep_every_frame(self):
+        scheduler = InferenceScheduler(max_interval=4)
+        landmarks = HandLandmarks(1)
+        open_hand(landmarks, 0.5)
+        landmarks.norm[0, 8, 0] = landmarks.norm[0, 4, 0] + 0.02
+        scheduler.update(landmarks, 0.0, 0.001)
+        self.assertEqual(scheduler.interval, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
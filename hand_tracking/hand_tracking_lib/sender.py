@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import deque
+
+import requests
+
+from .eventlog import event_log
+from .transport import make_transport
+
+
+class LandmarkSender:
+    def __init__(self, server_url="http://127.0.0.1:8080", max_queue=8,
+                 timeout=0.25):
+        self.server_url = server_url
+        self.timeout = timeout
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.last_error = None
+        # Optional Metrics: the time each transport send takes.
+        self.metrics = None
+
+        # One long-lived transport (keep-alive HTTP session, UDP or Unix
+        # socket) reused for every message instead of a new TCP connection
+        # per hand per frame.
+        self.transport = make_transport(server_url, timeout)
+        self.max_queue = max_queue
+        self._queue = deque()
+        self._ready = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._send_loop, daemon=True)
+        self._thread.start()
+
+    def send(self, data):
+        # Never block the frame loop. When the worker is behind, a hand's
+        # queued position is already stale and is replaced by its newest
+        # one, unless the pinch changed in between: other hands' messages
+        # and pinch transitions are never coalesced away.
+        with self._ready:
+            hand = data.get('hand')
+            for i in range(len(self._queue) - 1, -1, -1):
+                queued = self._queue[i]
+                if queued.get('hand') == hand:
+                    if queued.get('pinch') == data.get('pinch'):
+                        self._queue[i] = data
+                        self.dropped += 1
+                        return
+                    break
+            if len(self._queue) >= self.max_queue:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(data)
+            self._ready.notify()
+
+    def _send_loop(self):
+        while self._running:
+            with self._ready:
+                if not self._queue:
+                    self._ready.wait(timeout=0.1)
+                if not self._queue:
+                    continue
+                data = self._queue.popleft()
+            try:
+                start = time.perf_counter()
+                self.transport.send(data)
+                if self.metrics is not None:
+                    self.metrics.record('post', time.perf_counter() - start)
+                self.sent += 1
+            except (requests.exceptions.RequestException, OSError) as e:
+                self.failed += 1
+                self.last_error = e
+                event_log.warning('send_error', url=self.server_url,
+                                  error=str(e), failed=self.failed)
+            except Exception as e:
+                # A message that cannot be encoded (a missing field, a value
+                # that is not serializable) is lost on its own: the worker
+                # keeps sending the ones queued after it.
+                self.failed += 1
+                self.last_error = e
+                event_log.error('send_error', url=self.server_url,
+                                error=repr(e), failed=self.failed)
+
+    def get_stats(self):
+        return {'sent': self.sent, 'dropped': self.dropped,
+                'failed': self.failed, 'pending': len(self._queue)}
+
+    def close(self):
+        self._running = False
+        self._thread.join(timeout=1)
+        self.transport.close()
+
+
+_senders = {}
+
+
+def get_sender(server_url="http://127.0.0.1:8080"):
+    # Hands is rebuilt every frame, so senders are shared per server URL to
+    # keep their connection and worker alive across frames.
+    if server_url not in _senders:
+        _senders[server_url] = LandmarkSender(server_url)
+    return _senders[server_url]
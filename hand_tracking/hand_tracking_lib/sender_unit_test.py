@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from hand_tracking.hand_tracking_lib.sender import LandmarkSender
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    received = []
+
+    def do_POST(self):
+        self.received.append(json.loads(
+            self.rfile.read(int(self.headers['Content-Length']))))
+        time.sleep(0.05)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def wait_for(condition, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestLandmarkSender(unittest.TestCase):
+    def setUp(self):
+        SlowHandler.received = []
+        self.server = HTTPServer(('127.0.0.1', 0), SlowHandler)
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        self.url = "http://127.0.0.1:%d" % self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_send_does_not_block_and_drops_stale_positions(self):
+        sender = LandmarkSender(self.url)
+        start = time.monotonic()
+        for i in range(20):
+            sender.send({'x': i, 'y': i, 'pinch': False})
+        self.assertLess(time.monotonic() - start, 0.05)
+        self.assertTrue(wait_for(lambda: sender.get_stats()['pending'] == 0))
+        self.assertTrue(wait_for(
+            lambda: sender.sent + sender.dropped == 20))
+        self.assertGreater(sender.dropped, 0)
+        sender.close()
+
+    def test_hands_and_pinches_are_not_coalesced_away(self):
+        sender = LandmarkSender(self.url)
+        sender.send({'x': 0, 'y': 0, 'pinch': False, 'hand': 1})
+        # The worker is now busy with the first message.
+        self.assertTrue(wait_for(lambda: not sender.get_stats()['pending']))
+        for hand, x, pinch in [(1, 1, False), (2, 1, False), (1, 2, True),
+                               (1, 3, True), (2, 2, False)]:
+            sender.send({'x': x, 'y': 0, 'pinch': pinch, 'hand': hand})
+        self.assertTrue(wait_for(lambda: len(SlowHandler.received) == 4))
+        self.assertEqual([(m['hand'], m['x'], m['pinch'])
+                          for m in SlowHandler.received],
+                         [(1, 0, False), (1, 1, False), (2, 2, False),
+                          (1, 3, True)])
+        self.assertEqual(sender.dropped, 2)
+        sender.close()
+
+    def test_bad_message_does_not_stop_the_worker(self):
+        sender = LandmarkSender(self.url)
+        sender.send({'x': object(), 'y': 0, 'pinch': False, 'hand': 1})
+        sender.send({'x': 1, 'y': 0, 'pinch': False, 'hand': 2})
+        self.assertTrue(wait_for(lambda: sender.sent == 1))
+        self.assertEqual(sender.failed, 1)
+        self.assertIsInstance(sender.last_error, TypeError)
+        self.assertEqual(SlowHandler.received,
+                         [{'x': 1, 'y': 0, 'pinch': False, 'hand': 2}])
+        sender.close()
+
+    def test_unreachable_server_counts_failures(self):
+        sender = LandmarkSender("http://127.0.0.1:1", timeout=0.1)
+        sender.send({'x': 0, 'y': 0, 'pinch': False})
+        self.assertTrue(wait_for(lambda: sender.failed == 1))
+        self.assertEqual(sender.sent, 0)
+        sender.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
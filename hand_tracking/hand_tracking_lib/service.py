@@ -0,0 +1,329 @@
+import os
+import socket
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+import cv2
+import numpy as np
+
+from .gestures import GestureEvent
+from .landmarks import NUM_LANDMARKS, HandLandmarks
+
+# hand_tracking.py owns the camera and the detector and publishes every
+# frame here, so the games map the same memory instead of opening the
+# camera and running their own MediaPipe graph.
+#
+# Shared memory block SERVICE_NAME:
+#   HEADER (magic, version, slots, max_hands, frame shape, event slots,
+#   latest seq, number of events published), padded to HEADER_SIZE bytes,
+#   then a ring of `slots` records of slot_dtype() and a ring of
+#   `event slots` records of EVENT_DTYPE. A slot's seq is 0 while it is
+#   being written; event n is in record n % event slots, whose seq is
+#   n + 1 once written. Events have their own ring so that a subscriber
+#   reading only the latest frame still gets every gesture start and end.
+# Datagram socket /tmp/SERVICE_NAME.sock: a subscriber sends b'sub', or
+# b'sub frames' when it also reads the camera frames, from its own socket
+# and then gets the 8-byte seq of every published frame. Frames are only
+# copied while a subscriber reads them.
+
+SERVICE_NAME = "theraduty_hands"
+MAGIC = b'TH'
+VERSION = 2
+HEADER = struct.Struct('<2sBBHHHHH2xQQ')
+HEADER_SIZE = 64
+SEQ_OFFSET = 16
+EVENTS_OFFSET = 24
+EVENT_SLOTS = 64
+EVENT_DTYPE = np.dtype([('seq', '<u8'), ('timestamp', '<f8'),
+                        ('name', 'S8'), ('type', 'S8'), ('hand', '<i4'),
+                        ('x', '<i4'), ('y', '<i4')])
+NOTIFY = struct.Struct('<Q')
+
+
+def slot_dtype(max_hands, frame_shape):
+    return np.dtype([('seq', '<u8'), ('timestamp', '<f8'),
+                     ('count', '<u4'), ('pinch', '<u4'),
+                     ('pinch_pos', '<i4', 2),
+                     ('handedness', 'i1', max_hands),
+                     ('norm', '<f4', (max_hands, NUM_LANDMARKS, 3)),
+                     ('frame', 'u1', frame_shape)])
+
+
+def attach(name):
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+    # Before Python 3.13 attaching registers the block with the resource
+    # tracker too, which unlinks it when this process exits although it
+    # belongs to the publisher.
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name)
+    finally:
+        resource_tracker.register = register
+
+
+def socket_path(name):
+    return "/tmp/%s.sock" % name
+
+
+class HandPublisher:
+    def __init__(self, frame_shape=None, max_hands=2, slots=4,
+                 name=SERVICE_NAME, event_slots=EVENT_SLOTS):
+        self.name = name
+        self.frame_shape = tuple(frame_shape) if frame_shape else (0, 0, 3)
+        dtype = slot_dtype(max_hands, self.frame_shape)
+        try:
+            # Left behind by a service that did not shut down cleanly.
+            stale = shared_memory.SharedMemory(name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = shared_memory.SharedMemory(
+            name, create=True, size=HEADER_SIZE + slots * dtype.itemsize +
+            event_slots * EVENT_DTYPE.itemsize)
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION, slots, max_hands,
+                         *self.frame_shape, event_slots, 0, 0)
+        self.slots = np.ndarray(slots, dtype, self.shm.buf, HEADER_SIZE)
+        self.events_ring = np.ndarray(event_slots, EVENT_DTYPE,
+                                      self.shm.buf,
+                                      HEADER_SIZE + self.slots.nbytes)
+        self._latest = np.ndarray((), '<u8', self.shm.buf, SEQ_OFFSET)
+        self._event_count = np.ndarray((), '<u8', self.shm.buf,
+                                       EVENTS_OFFSET)
+        self.seq = 0
+        self.event_count = 0
+
+        self.sock_path = socket_path(name)
+        if os.path.exists(self.sock_path):
+            os.unlink(self.sock_path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.sock_path)
+        self.sock.setblocking(False)
+        # Subscriber address -> whether it reads the frames.
+        self.subscribers = {}
+
+    def _next_slot(self):
+        return (self.seq + 1) % len(self.slots)
+
+    def write_frame(self, frame, mirror=False):
+        # Copied before the detector runs, as Hands may draw on the image.
+        # The games get mirrored frames: an unflipped one is flipped as it
+        # is copied, for the price of the copy. Nothing is copied when no
+        # subscriber reads the frames.
+        self._receive()
+        if not any(self.subscribers.values()):
+            return
+        i = self._next_slot()
+        self.slots['seq'][i] = 0
+        if mirror:
+            cv2.flip(frame, 1, dst=self.slots['frame'][i])
+        else:
+            self.slots['frame'][i] = frame
+
+    def publish(self, landmarks, timestamp, pinch=False, pinch_pos=(0, 0),
+                events=()):
+        # events: the GestureEvents of this frame, GestureEngine.events.
+        for event in events:
+            self._write_event(event)
+        i = self._next_slot()
+        slots = self.slots
+        slots['seq'][i] = 0
+        count = landmarks.count
+        slots['timestamp'][i] = timestamp
+        slots['count'][i] = count
+        slots['pinch'][i] = pinch
+        slots['pinch_pos'][i] = pinch_pos
+        slots['handedness'][i] = landmarks.handedness
+        slots['norm'][i, :count] = landmarks.norm[:count]
+        self.seq += 1
+        slots['seq'][i] = self.seq
+        self._latest[...] = self.seq
+        self._notify()
+
+    def _write_event(self, event):
+        ring = self.events_ring
+        record = ring[self.event_count % len(ring)]
+        record['seq'] = 0
+        record['timestamp'] = event.timestamp
+        record['name'] = event.name.encode()
+        record['type'] = event.type.encode()
+        record['hand'] = event.hand
+        record['x'] = event.x
+        record['y'] = event.y
+        self.event_count += 1
+        record['seq'] = self.event_count
+        self._event_count[...] = self.event_count
+
+    def _receive(self):
+        while True:
+            try:
+                message, address = self.sock.recvfrom(16)
+            except BlockingIOError:
+                break
+            if message in (b'sub', b'sub frames'):
+                self.subscribers[address] = message == b'sub frames'
+            elif message == b'unsub':
+                self.subscribers.pop(address, None)
+
+    def _notify(self):
+        self._receive()
+        packet = NOTIFY.pack(self.seq)
+        for address in list(self.subscribers):
+            try:
+                self.sock.sendto(packet, address)
+            except BlockingIOError:
+                # A slow subscriber only reads the latest frame anyway.
+                pass
+            except (FileNotFoundError, ConnectionRefusedError):
+                self.subscribers.pop(address, None)
+
+    def close(self):
+        self.sock.close()
+        if os.path.exists(self.sock_path):
+            os.unlink(self.sock_path)
+        # The numpy views must go before the memory can be unmapped.
+        del self.slots, self.events_ring, self._latest, self._event_count
+        self.shm.close()
+        self.shm.unlink()
+
+
+class HandSubscriber:
+    def __init__(self, name=SERVICE_NAME, frames=True):
+        # Raises FileNotFoundError when the service is not running, and
+        # ConnectionRefusedError when it left its files behind. Without
+        # frames, only the landmarks and the pinch are read: the publisher
+        # then does not copy the frames for this subscriber.
+        self.shm = attach(name)
+        magic, version, slots, max_hands, h, w, c, event_slots, _, \
+            event_count = HEADER.unpack_from(self.shm.buf)
+        if magic != MAGIC or version != VERSION:
+            self.shm.close()
+            raise ValueError("not a hand tracking service: %s" % name)
+        self.frame_shape = (h, w, c)
+        self.slots = np.ndarray(slots, slot_dtype(max_hands,
+                                                  self.frame_shape),
+                                self.shm.buf, HEADER_SIZE)
+        self.events_ring = np.ndarray(event_slots, EVENT_DTYPE,
+                                      self.shm.buf,
+                                      HEADER_SIZE + self.slots.nbytes)
+        self._latest = np.ndarray((), '<u8', self.shm.buf, SEQ_OFFSET)
+        self._event_count = np.ndarray((), '<u8', self.shm.buf,
+                                       EVENTS_OFFSET)
+
+        self.landmarks = HandLandmarks(max_hands)
+        self.landmarks.width, self.landmarks.height = w, h
+        self.frames = frames
+        self.frame = np.zeros(self.frame_shape, np.uint8)
+        self.seq = 0
+        self.timestamp = 0.0
+        self.pinch = False
+        self.pinch_pos = (0, 0)
+        self.missed = 0
+        # GestureEvents published since the previous read(); the ones from
+        # before this subscriber attached are not replayed.
+        self.events = []
+        self.event_count = event_count
+        self.missed_events = 0
+
+        self.sock_path = "/tmp/%s-%d-%d.sock" % (name, os.getpid(), id(self))
+        if os.path.exists(self.sock_path):
+            os.unlink(self.sock_path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.sock_path)
+        self.service_path = socket_path(name)
+        try:
+            self.sock.sendto(b'sub frames' if frames else b'sub',
+                             self.service_path)
+        except OSError:
+            self.sock.close()
+            os.unlink(self.sock_path)
+            del self.slots, self.events_ring, self._latest, \
+                self._event_count
+            self.shm.close()
+            raise
+
+    def wait(self, timeout=1.0):
+        # Blocks until a frame newer than the last read one is published.
+        # Pending notifications are stale: only the latest frame is read.
+        self.sock.setblocking(False)
+        try:
+            while True:
+                self.sock.recv(NOTIFY.size)
+        except BlockingIOError:
+            pass
+        if int(self._latest) != self.seq:
+            return True
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.recv(NOTIFY.size)
+        except socket.timeout:
+            return False
+        return True
+
+    def read(self, frame=None):
+        if frame is None:
+            frame = self.frames
+        self.events = []
+        slots = self.slots
+        # The publisher can lap this reader while it copies: retry then.
+        for _ in range(3):
+            seq = int(self._latest)
+            if seq == self.seq:
+                return False
+            i = seq % len(slots)
+            count = int(slots['count'][i])
+            self.timestamp = float(slots['timestamp'][i])
+            self.pinch = bool(slots['pinch'][i])
+            self.pinch_pos = tuple(slots['pinch_pos'][i].tolist())
+            self.landmarks.handedness[:] = slots['handedness'][i]
+            self.landmarks.norm[:count] = slots['norm'][i, :count]
+            if frame:
+                self.frame[...] = slots['frame'][i]
+            if slots['seq'][i] == seq:
+                break
+        else:
+            return False
+        if self.seq:
+            self.missed += max(seq - self.seq - 1, 0)
+        self.seq = seq
+        self.landmarks.count = count
+        self.landmarks.update_pixels()
+        self.events = self.read_events()
+        return True
+
+    def read_events(self):
+        # Events are written before the frame they belong to is published,
+        # so the ones of every frame read so far are here.
+        ring = self.events_ring
+        end = int(self._event_count)
+        start = max(self.event_count, end - len(ring))
+        self.missed_events += start - self.event_count
+        events = []
+        for n in range(start, end):
+            record = ring[n % len(ring)].copy()
+            if record['seq'] != n + 1 or \
+                    ring['seq'][n % len(ring)] != n + 1:
+                # Overwritten by a later event meanwhile.
+                self.missed_events += 1
+                continue
+            events.append(GestureEvent(
+                record['name'].decode(), record['type'].decode(),
+                int(record['hand']), int(record['x']), int(record['y']),
+                float(record['timestamp'])))
+        self.event_count = end
+        return events
+
+    def close(self):
+        try:
+            self.sock.sendto(b'unsub', self.service_path)
+        except OSError:
+            pass
+        self.sock.close()
+        if os.path.exists(self.sock_path):
+            os.unlink(self.sock_path)
+        del self.slots, self.events_ring, self._latest, self._event_count
+        self.shm.close()
@@ -0,0 +1,139 @@
+import glob
+import os
+import socket
+import unittest
+
+import numpy as np
+
+from hand_tracking.hand_tracking_lib.gestures import GestureEvent
+from hand_tracking.hand_tracking_lib.landmarks import HandLandmarks
+from hand_tracking.hand_tracking_lib.landmarks_unit_test import (
+    make_results, straight_hand)
+from hand_tracking.hand_tracking_lib.service import (HandPublisher,
+                                                     HandSubscriber)
+
+
+class TestHandService(unittest.TestCase):
+    def setUp(self):
+        self.name = "theraduty_test_%d" % os.getpid()
+        self.publisher = HandPublisher((48, 64, 3), name=self.name)
+        self.subscriber = HandSubscriber(self.name)
+        self.landmarks = HandLandmarks().update(
+            make_results([straight_hand(0.3)], ["Right"]), (48, 64, 3))
+
+    def tearDown(self):
+        self.subscriber.close()
+        self.publisher.close()
+
+    def publish(self, value, timestamp):
+        self.publisher.write_frame(np.full((48, 64, 3), value, np.uint8))
+        self.publisher.publish(self.landmarks, timestamp, True, (10, 20))
+
+    def test_nothing_to_read_before_the_first_frame(self):
+        self.assertFalse(self.subscriber.read())
+        self.assertFalse(self.subscriber.wait(timeout=0.01))
+
+    def test_subscriber_reads_the_published_frame(self):
+        self.publish(7, 1.5)
+        self.assertTrue(self.subscriber.wait(timeout=1))
+        self.assertTrue(self.subscriber.read())
+        self.assertEqual(self.subscriber.seq, 1)
+        self.assertEqual(self.subscriber.timestamp, 1.5)
+        self.assertTrue(self.subscriber.pinch)
+        self.assertEqual(self.subscriber.pinch_pos, (10, 20))
+        self.assertEqual(len(self.subscriber.landmarks), 1)
+        np.testing.assert_array_equal(self.subscriber.landmarks.px[:1],
+                                      self.landmarks.px[:1])
+        self.assertTrue((self.subscriber.frame == 7).all())
+        # Read once: no new frame until the next publish.
+        self.assertFalse(self.subscriber.read())
+
+    def test_unflipped_frame_is_mirrored_on_the_way(self):
+        frame = np.zeros((48, 64, 3), np.uint8)
+        frame[:, :8] = 255
+        self.publisher.write_frame(frame, mirror=True)
+        self.publisher.publish(self.landmarks, 1.0)
+        self.assertTrue(self.subscriber.read())
+        self.assertTrue((self.subscriber.frame[:, 56:] == 255).all())
+        self.assertTrue((self.subscriber.frame[:, :56] == 0).all())
+
+    def test_frames_are_only_copied_for_subscribers_reading_them(self):
+        self.subscriber.close()
+        self.subscriber = HandSubscriber(self.name, frames=False)
+        self.publish(7, 1.0)
+        self.assertFalse(self.publisher.subscribers[self.subscriber.sock_path])
+        self.assertFalse(self.publisher.slots['frame'].any())
+        self.assertTrue(self.subscriber.read())
+        self.assertEqual(self.subscriber.timestamp, 1.0)
+        self.assertFalse(self.subscriber.frame.any())
+
+        reader = HandSubscriber(self.name)
+        try:
+            self.publish(8, 2.0)
+            self.assertTrue(reader.read())
+            self.assertTrue((reader.frame == 8).all())
+        finally:
+            reader.close()
+
+    def test_slow_subscriber_gets_the_latest_frame(self):
+        for i in range(6):
+            self.publish(i, float(i))
+        self.assertTrue(self.subscriber.read())
+        self.assertEqual(self.subscriber.timestamp, 5.0)
+        self.assertTrue((self.subscriber.frame == 5).all())
+        self.publish(9, 9.0)
+        self.publish(10, 10.0)
+        self.subscriber.read()
+        self.assertEqual(self.subscriber.missed, 1)
+
+    def test_gesture_events_of_skipped_frames_are_read(self):
+        start = GestureEvent('pinch', 'start', 0, 10, 20, 1.0)
+        end = GestureEvent('pinch', 'end', 0, 12, 22, 2.0)
+        self.publisher.publish(self.landmarks, 1.0, events=[start])
+        self.publisher.publish(self.landmarks, 2.0, events=[end])
+        self.publisher.publish(self.landmarks, 3.0)
+        self.assertTrue(self.subscriber.read())
+        self.assertEqual(self.subscriber.events, [start, end])
+        self.assertFalse(self.subscriber.read())
+        self.assertEqual(self.subscriber.events, [])
+
+        # A subscriber too slow for the ring only loses the oldest events.
+        for i in range(70):
+            self.publisher.publish(self.landmarks, 4.0 + i, events=[
+                GestureEvent('swipe', 'left', 1, i, 0, 4.0 + i)])
+        self.assertTrue(self.subscriber.read())
+        self.assertEqual(len(self.subscriber.events), 64)
+        self.assertEqual(self.subscriber.events[-1].x, 69)
+        self.assertEqual(self.subscriber.missed_events, 6)
+
+        # Events from before a subscriber attached are not replayed.
+        late = HandSubscriber(self.name)
+        try:
+            self.publisher.publish(self.landmarks, 80.0)
+            self.assertTrue(late.read())
+            self.assertEqual(late.events, [])
+        finally:
+            late.close()
+
+    def test_stale_service_refuses_subscribers(self):
+        # A publisher that crashed leaves its memory and socket file.
+        self.publisher.sock.close()
+        pattern = "/tmp/%s-%d-*.sock" % (self.name, os.getpid())
+        sockets = glob.glob(pattern)
+        with self.assertRaises(ConnectionRefusedError):
+            HandSubscriber(self.name)
+        self.assertEqual(glob.glob(pattern), sockets)
+        self.publisher.sock = socket.socket(socket.AF_UNIX,
+                                            socket.SOCK_DGRAM)
+
+    def test_notifications_reach_subscribers(self):
+        self.publish(1, 1.0)
+        self.assertIn(self.subscriber.sock_path,
+                      self.publisher.subscribers)
+        self.subscriber.read()
+        self.publish(2, 2.0)
+        self.assertTrue(self.subscriber.wait(timeout=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+from .capture import open_capture
+
+# Frame sources. Anything with VideoCapture's read(image=None), get(),
+# set(), isOpened() and release() can stand in for the webcam in Camera,
+# FramePool and negotiate(). open_source() picks one from a spec:
+#   0, /dev/video0          a camera, by index or device path
+#   session.mkv             a video file
+#   frames/                 a directory of images, in name order
+#   synthetic:640x480@30    generated moving test patterns
+# Files, directories and patterns loop and come at their frame rate,
+# like a camera; with realtime=False as fast as they are read, to
+# measure the throughput of everything downstream.
+
+IMAGE_EXTENSIONS = ('.bmp', '.jpeg', '.jpg', '.png', '.ppm', '.tif', '.tiff')
+
+
+class Pacer:
+    def __init__(self, fps):
+        # Holds read() back to fps frames per second; 0 never waits.
+        self.fps = fps
+        self.next_time = None
+
+    def wait(self):
+        if not self.fps:
+            return
+        now = time.monotonic()
+        if self.next_time is not None and self.next_time > now:
+            time.sleep(self.next_time - now)
+            now = self.next_time
+        # Late frames do not make the next ones come in a burst.
+        self.next_time = now + 1.0 / self.fps
+
+
+def copy_into(image, frame):
+    # read(image=buf) contract: fill the caller's buffer when it fits.
+    if image is not None and image.shape == frame.shape and \
+            image.dtype == frame.dtype:
+        np.copyto(image, frame)
+        return image
+    return frame.copy()
+
+
+class FrameSource:
+    # The capture interface over next_frame(image), which each source
+    # defines: the next frame, into image when it fits; None once finished.
+    backend = ''
+
+    def __init__(self, width, height, fps, realtime=True):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pacer = Pacer(fps if realtime else 0)
+        self.frame_index = 0
+        self.opened = True
+
+    def read(self, image=None):
+        if not self.opened:
+            return False, None
+        frame = self.next_frame(image)
+        if frame is None:
+            return False, None
+        self.pacer.wait()
+        self.frame_index += 1
+        return True, frame
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: self.width,
+                cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+                cv2.CAP_PROP_FPS: self.fps,
+                cv2.CAP_PROP_POS_FRAMES: self.frame_index}.get(prop, 0.0)
+
+    def set(self, prop, value):
+        # The mode is fixed by the spec.
+        return False
+
+    def isOpened(self):
+        return self.opened
+
+    def release(self):
+        self.opened = False
+
+    def getBackendName(self):
+        return self.backend
+
+
+class SyntheticSource(FrameSource):
+    backend = 'SYNTHETIC'
+
+    def __init__(self, resolution=(640, 480), fps=30.0, realtime=True):
+        # A gradient with a grid, a disc on a Lissajous path, a bar
+        # sweeping across and the frame number: every frame differs and
+        # all of it is drawn into the caller's buffer.
+        width, height = resolution
+        super().__init__(width, height, fps, realtime)
+        ys = np.linspace(40, 200, height, dtype=np.float32)[:, None]
+        xs = np.linspace(0, 120, width, dtype=np.float32)[None, :]
+        self.background = np.empty((height, width, 3), np.uint8)
+        self.background[:, :, 0] = ys
+        self.background[:, :, 1] = xs + ys / 4
+        self.background[:, :, 2] = 255 - ys
+        self.background[::64, :] = 255
+        self.background[:, ::64] = 255
+
+    def next_frame(self, image):
+        if image is None or image.shape != self.background.shape:
+            image = np.empty_like(self.background)
+        np.copyto(image, self.background)
+        w, h = self.width, self.height
+        t = self.frame_index / (self.fps or 30.0)
+        cx = int(w / 2 + 0.35 * w * np.sin(1.3 * t))
+        cy = int(h / 2 + 0.35 * h * np.sin(2.1 * t))
+        cv2.circle(image, (cx, cy), max(h // 10, 4), (40, 200, 255), -1)
+        x = int((t * w / 3) % w)
+        cv2.rectangle(image, (x, 0), (x + max(w // 40, 2), h - 1),
+                      (255, 255, 255), -1)
+        cv2.putText(image, str(self.frame_index), (10, h - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        return image
+
+
+class ImageDirectorySource(FrameSource):
+    backend = 'IMAGES'
+
+    def __init__(self, path, fps=30.0, realtime=True, loop=True,
+                 preload=False):
+        # preload decodes every image once up front, so that decoding is
+        # not part of what is measured.
+        self.paths = sorted(os.path.join(path, name)
+                            for name in os.listdir(path)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise IOError("no images in %s" % path)
+        self.loop = loop
+        self.images = [self.load(p) for p in self.paths] if preload \
+            else None
+        first = self.images[0] if preload else self.load(self.paths[0])
+        height, width = first.shape[:2]
+        super().__init__(width, height, fps, realtime)
+        self.position = 0
+
+    @staticmethod
+    def load(path):
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            raise IOError("cannot read %s" % path)
+        return image
+
+    def next_frame(self, image):
+        if self.position == len(self.paths):
+            if not self.loop:
+                return None
+            self.position = 0
+        i = self.position
+        self.position += 1
+        if self.images is not None:
+            return copy_into(image, self.images[i])
+        frame = self.load(self.paths[i])
+        return frame if image is None else copy_into(image, frame)
+
+
+class VideoFileSource(FrameSource):
+    backend = 'FILE'
+
+    def __init__(self, path, fps=None, realtime=True, loop=True):
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise IOError("cannot open %s" % path)
+        self.loop = loop
+        super().__init__(int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                         int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                         fps or self.capture.get(cv2.CAP_PROP_FPS) or 30.0,
+                         realtime)
+
+    def next_frame(self, image):
+        ret, frame = self.capture.read(image=image)
+        if not ret and self.loop and self.frame_index:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read(image=image)
+        return frame if ret else None
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FOURCC:
+            return self.capture.get(prop)
+        return super().get(prop)
+
+    def release(self):
+        super().release()
+        self.capture.release()
+
+
+def parse_synthetic(spec):
+    # "synthetic", "synthetic:1280x720" or "synthetic:1280x720@60"
+    _, _, mode = spec.partition(':')
+    size, _, fps = mode.partition('@')
+    width, height = map(int, size.lower().split('x')) if size \
+        else (640, 480)
+    return (width, height), float(fps) if fps else 30.0
+
+
+def open_source(spec=0, backend=None, realtime=True):
+    if isinstance(spec, int) or str(spec).isdigit():
+        return open_capture(int(spec), backend)
+    if spec.startswith('synthetic'):
+        resolution, fps = parse_synthetic(spec)
+        return SyntheticSource(resolution, fps, realtime)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, realtime=realtime)
+    if os.path.isfile(spec) and not spec.startswith('/dev/'):
+        return VideoFileSource(spec, realtime=realtime)
+    # Device paths, stream URLs, GStreamer pipelines.
+    return open_capture(spec, backend)
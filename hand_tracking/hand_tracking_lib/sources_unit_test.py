@@ -0,0 +1,119 @@
+import os
+import tempfile
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+from hand_tracking.hand_tracking_lib.capture import negotiate
+from hand_tracking.hand_tracking_lib.cv2_utils import Camera
+from hand_tracking.hand_tracking_lib.recording import FrameRecorder
+from hand_tracking.hand_tracking_lib.sources import (ImageDirectorySource,
+                                                     Pacer, SyntheticSource,
+                                                     VideoFileSource,
+                                                     open_source,
+                                                     parse_synthetic)
+
+
+class TestSyntheticSource(unittest.TestCase):
+    def test_frames_move_and_fill_the_given_buffer(self):
+        source = SyntheticSource((64, 48), realtime=False)
+        buf = np.zeros((48, 64, 3), np.uint8)
+        ret, first = source.read(image=buf)
+        self.assertTrue(ret)
+        self.assertIs(first, buf)
+        first = first.copy()
+        ret, second = source.read(image=buf)
+        self.assertIs(second, buf)
+        self.assertFalse(np.array_equal(first, second))
+        self.assertEqual(source.get(cv2.CAP_PROP_POS_FRAMES), 2)
+
+    def test_mode_comes_from_the_spec(self):
+        self.assertEqual(parse_synthetic('synthetic'), ((640, 480), 30.0))
+        self.assertEqual(parse_synthetic('synthetic:320x240@60'),
+                         ((320, 240), 60.0))
+        source = open_source('synthetic:320x240@60')
+        settings = negotiate(source, (1280, 720), 30, 'MJPG', buffer_size=1)
+        self.assertEqual((settings['width'], settings['height'],
+                          settings['fps'], settings['backend']),
+                         (320, 240, 60.0, 'SYNTHETIC'))
+        source.release()
+        self.assertEqual(source.read(), (False, None))
+
+    def test_camera_reads_a_synthetic_source(self):
+        camera = Camera(device='synthetic:64x48@1000', resolution=None)
+        img = camera.get_rgb_img()
+        self.assertEqual(img.shape, (48, 64, 3))
+        self.assertEqual(camera.settings['backend'], 'SYNTHETIC')
+        camera.close()
+
+
+class TestPacer(unittest.TestCase):
+    def test_holds_reads_to_the_frame_rate(self):
+        pacer = Pacer(100)
+        start = time.monotonic()
+        for _ in range(6):
+            pacer.wait()
+        self.assertGreaterEqual(time.monotonic() - start, 0.045)
+
+    def test_zero_never_waits(self):
+        pacer = Pacer(0)
+        start = time.monotonic()
+        for _ in range(100):
+            pacer.wait()
+        self.assertLess(time.monotonic() - start, 0.01)
+
+
+class TestFileSources(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 256, (48, 64, 3), np.uint8)
+                       for _ in range(3)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_images_are_read_in_name_order_and_loop(self):
+        # Written out of order; lossless so the pixels come back exactly.
+        for i in (2, 0, 1):
+            cv2.imwrite(os.path.join(self.tmp.name, "%03d.png" % i),
+                        self.frames[i])
+        source = open_source(self.tmp.name, realtime=False)
+        self.assertIsInstance(source, ImageDirectorySource)
+        buf = np.zeros((48, 64, 3), np.uint8)
+        for i in (0, 1, 2, 0):
+            ret, frame = source.read(image=buf)
+            self.assertTrue(ret)
+            self.assertIs(frame, buf)
+            np.testing.assert_array_equal(frame, self.frames[i])
+
+        once = ImageDirectorySource(self.tmp.name, realtime=False,
+                                    loop=False, preload=True)
+        self.assertEqual(sum(once.read()[0] for _ in range(5)), 3)
+
+    def test_empty_directory_is_an_error(self):
+        with self.assertRaises(IOError):
+            ImageDirectorySource(self.tmp.name)
+
+    def test_video_file_loops(self):
+        path = os.path.join(self.tmp.name, "session")
+        recorder = FrameRecorder(path, fps=25)
+        for i, frame in enumerate(self.frames):
+            recorder.write(frame, i / 25)
+        recorder.close()
+
+        source = open_source(path + '.mkv', realtime=False)
+        self.assertIsInstance(source, VideoFileSource)
+        self.assertEqual((source.get(cv2.CAP_PROP_FRAME_WIDTH),
+                          source.get(cv2.CAP_PROP_FPS)), (64, 25.0))
+        for i in (0, 1, 2, 0, 1):
+            ret, frame = source.read()
+            self.assertTrue(ret)
+            np.testing.assert_array_equal(frame, self.frames[i])
+        source.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import numpy as np
+
+
+class HandTracker:
+    def __init__(self, max_hands=2, max_distance=0.25, handedness_cost=0.15,
+                 max_missed=5):
+        # Long-lived: one slot per tracked hand, so a hand keeps its ID and
+        # gesture state from frame to frame even when MediaPipe reorders
+        # its detections. Detections are matched to the tracks by palm
+        # distance (fraction of the frame diagonal), plus handedness_cost
+        # when the handedness differs, since MediaPipe's label sometimes
+        # flips for a frame. A track survives max_missed frames without a
+        # detection.
+        self.max_distance = max_distance
+        self.handedness_cost = handedness_cost
+        self.max_missed = max_missed
+
+        self.ids = np.full(max_hands, -1, np.int64)
+        self.handedness = np.full(max_hands, -1, np.int8)
+        self.centers = np.zeros((max_hands, 2), np.float32)
+        self.missed = np.zeros(max_hands, np.int32)
+        self.last_seen = np.zeros(max_hands, np.float64)
+        self.pinching = np.zeros(max_hands, bool)
+        self.pinch_pos = np.zeros((max_hands, 2), np.int32)
+        # Slot of every detection of the last update, -1 past the count.
+        self.slots = np.full(max_hands, -1, np.int64)
+        self.count = 0
+        self.next_id = 0
+        self.primary_id = -1
+        self.primary_changed = False
+
+    def __len__(self):
+        return int((self.ids >= 0).sum())
+
+    def update(self, landmarks, timestamp):
+        count = min(landmarks.count, len(self.ids))
+        self.slots[:] = -1
+        live = np.nonzero(self.ids >= 0)[0]
+        centers = landmarks.px[:count, 9, :2]
+        if count and len(live):
+            diagonal = max(np.hypot(landmarks.width, landmarks.height), 1.0)
+            diff = centers[:, None] - self.centers[live][None]
+            cost = np.hypot(diff[..., 0], diff[..., 1]) / diagonal
+            cost += self.handedness_cost * (
+                landmarks.handedness[:count, None] !=
+                self.handedness[live][None])
+            # Greedy on the cheapest pairs: with at most a few hands this
+            # is as good as a full assignment.
+            for flat in np.argsort(cost, axis=None).tolist():
+                hand, track = divmod(flat, len(live))
+                if cost[hand, track] > self.max_distance:
+                    break
+                slot = live[track]
+                if self.slots[hand] < 0 and slot not in self.slots:
+                    self.slots[hand] = slot
+        for hand in range(count):
+            if self.slots[hand] < 0:
+                free = np.nonzero(self.ids < 0)[0]
+                if not len(free):
+                    continue
+                slot = free[0]
+                self.ids[slot] = self.next_id
+                self.next_id += 1
+                self.pinching[slot] = False
+                self.slots[hand] = slot
+
+        seen = self.slots[:count]
+        seen = seen[seen >= 0]
+        self.missed[self.ids >= 0] += 1
+        self.missed[seen] = 0
+        self.last_seen[seen] = timestamp
+        matched = self.slots[:count] >= 0
+        self.centers[seen] = centers[matched]
+        self.handedness[seen] = landmarks.handedness[:count][matched]
+
+        lost = (self.ids >= 0) & (self.missed > self.max_missed)
+        self.ids[lost] = -1
+        self.handedness[lost] = -1
+        self.pinching[lost] = False
+        self.count = count
+        primary = self.primary()
+        primary_id = self.track_id(primary) if primary >= 0 else -1
+        self.primary_changed = primary_id != self.primary_id
+        self.primary_id = primary_id
+        return self.slots[:count]
+
+    def slot(self, hand):
+        return int(self.slots[hand])
+
+    def track_id(self, hand):
+        slot = self.slots[hand]
+        return int(self.ids[slot]) if slot >= 0 else -1
+
+    def primary(self):
+        # Detection of the oldest track in view, the one that drives a
+        # single-cursor game; -1 without hands.
+        best = -1
+        for hand in range(self.count):
+            slot = self.slots[hand]
+            if slot >= 0 and (best < 0 or
+                              self.ids[slot] < self.ids[self.slots[best]]):
+                best = hand
+        return best
+
+    def reset(self):
+        self.ids[:] = -1
+        self.handedness[:] = -1
+        self.missed[:] = 0
+        self.pinching[:] = False
+        self.slots[:] = -1
+        self.count = 0
+        self.primary_id = -1
+        self.primary_changed = False
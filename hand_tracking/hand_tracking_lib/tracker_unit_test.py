@@ -0,0 +1,121 @@
+import unittest
+
+import numpy as np
+
+from hand_tracking.hand_tracking_lib.cv2_utils import Hands
+from hand_tracking.hand_tracking_lib.emission import EmissionPolicy
+from hand_tracking.hand_tracking_lib.gestures import GestureEngine
+from hand_tracking.hand_tracking_lib.gestures_unit_test import (SHAPE,
+                                                                FakeDetector,
+                                                                open_hand)
+from hand_tracking.hand_tracking_lib.landmarks import HandLandmarks
+from hand_tracking.hand_tracking_lib.landmarks_unit_test import make_results
+from hand_tracking.hand_tracking_lib.tracker import HandTracker
+
+
+def frame(hands, labels):
+    return HandLandmarks().update(make_results(hands, labels), SHAPE)
+
+
+LEFT_HAND = open_hand(dx=-0.3)
+RIGHT_HAND = open_hand(dx=0.3)
+
+
+class FakeSender:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+
+
+class TestHandTracker(unittest.TestCase):
+    def test_ids_follow_the_hands_when_detections_swap(self):
+        tracker = HandTracker()
+        tracker.update(frame([LEFT_HAND, RIGHT_HAND], ["Left", "Right"]), 0)
+        ids = [tracker.track_id(0), tracker.track_id(1)]
+        tracker.update(frame([RIGHT_HAND, LEFT_HAND], ["Right", "Left"]), 1)
+        self.assertEqual([tracker.track_id(1), tracker.track_id(0)], ids)
+        self.assertEqual(len(tracker), 2)
+
+    def test_handedness_flicker_keeps_the_id(self):
+        tracker = HandTracker()
+        tracker.update(frame([RIGHT_HAND], ["Right"]), 0)
+        tracker.update(frame([RIGHT_HAND], ["Left"]), 1)
+        self.assertEqual(tracker.track_id(0), 0)
+
+    def test_far_detection_is_a_new_hand(self):
+        tracker = HandTracker(max_hands=1, max_missed=0)
+        tracker.update(frame([LEFT_HAND], ["Right"]), 0)
+        tracker.update(frame([RIGHT_HAND], ["Right"]), 1)
+        self.assertEqual(tracker.track_id(0), -1)
+        tracker.update(frame([RIGHT_HAND], ["Right"]), 2)
+        self.assertEqual(tracker.track_id(0), 1)
+
+    def test_track_survives_short_dropouts(self):
+        tracker = HandTracker(max_missed=2)
+        tracker.update(frame([RIGHT_HAND], ["Right"]), 0)
+        tracker.pinching[tracker.slot(0)] = True
+        for t in (1, 2):
+            tracker.update(frame([], []), t)
+        self.assertEqual(len(tracker), 1)
+        tracker.update(frame([RIGHT_HAND], ["Right"]), 3)
+        self.assertEqual(tracker.track_id(0), 0)
+        self.assertTrue(tracker.pinching[tracker.slot(0)])
+
+        for t in (4, 5, 6):
+            tracker.update(frame([], []), t)
+        self.assertEqual(len(tracker), 0)
+
+    def test_primary_is_the_oldest_hand(self):
+        tracker = HandTracker()
+        tracker.update(frame([RIGHT_HAND], ["Right"]), 0)
+        tracker.update(frame([LEFT_HAND, RIGHT_HAND], ["Left", "Right"]), 1)
+        self.assertEqual(tracker.primary(), 1)
+        self.assertFalse(tracker.primary_changed)
+
+
+class TestHandsWithTracker(unittest.TestCase):
+    def pinch(self, tracker, engine, hands, t, policy=None):
+        sender = FakeSender()
+        landmarks = frame(hands, ["Left", "Right"][:len(hands)])
+        hand = Hands(FakeDetector(landmarks), np.zeros(SHAPE, np.uint8), t,
+                     tracker)
+        hand.get_pinch_pos(sender=sender, engine=engine, policy=policy)
+        return hand, sender.sent
+
+    def test_each_hand_keeps_its_own_pinch(self):
+        tracker = HandTracker()
+        engine = GestureEngine()
+        left = open_hand(dx=-0.3, pinch=0.3)
+        hand, sent = self.pinch(tracker, engine, [left, RIGHT_HAND], 0)
+        self.assertTrue(hand.is_pinching)
+        self.assertEqual([(d['hand'], d['pinch']) for d in sent],
+                         [(0, True), (1, False)])
+
+        # Reordered detections: still the left hand pinching, no new pinch.
+        hand, sent = self.pinch(tracker, engine, [RIGHT_HAND, left], 1)
+        self.assertEqual([(d['hand'], d['pinch']) for d in sent],
+                         [(1, False), (0, True)])
+        self.assertEqual(engine.events, [])
+
+        hand, sent = self.pinch(tracker, engine, [LEFT_HAND, RIGHT_HAND], 2)
+        self.assertFalse(hand.is_pinching)
+
+    def test_still_hands_are_sent_once_each(self):
+        # One pinching, one not: neither looks like a transition to the
+        # other's emission state.
+        tracker = HandTracker()
+        engine = GestureEngine()
+        policy = EmissionPolicy()
+        left = open_hand(dx=-0.3, pinch=0.3)
+        sent = []
+        for t in range(100):
+            sent += self.pinch(tracker, engine, [left, RIGHT_HAND], t / 30,
+                               policy)[1]
+        self.assertEqual([(d['hand'], d['pinch']) for d in sent],
+                         [(0, True), (1, False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import socket
+import struct
+import time
+from urllib.parse import urlparse
+
+import requests
+
+# Compact binary frame used by the socket transports, little-endian, 44
+# bytes: magic, version, flags, sequence number, hand (the HandTracker
+# ID, -1 without one), x, y, raw_x, raw_y, pred_x, pred_y and the
+# sender's monotonic timestamp. Flag bit 0 is the pinch; bit 1 says the
+# raw and predicted positions (PinchPredictor) are set.
+FRAME = struct.Struct('<2sBBIh2xffffffd')
+FRAME_MAGIC = b'TD'
+FRAME_VERSION = 2
+FLAG_PINCH = 0x01
+FLAG_PREDICTION = 0x02
+
+
+def encode_frame(data, seq=0, timestamp=None):
+    if timestamp is None:
+        timestamp = time.monotonic()
+    flags = FLAG_PINCH if data.get('pinch') else 0
+    if 'pred_x' in data:
+        flags |= FLAG_PREDICTION
+    return FRAME.pack(FRAME_MAGIC, FRAME_VERSION, flags,
+                      seq & 0xFFFFFFFF, data.get('hand', -1),
+                      data['x'], data['y'],
+                      data.get('raw_x', 0), data.get('raw_y', 0),
+                      data.get('pred_x', 0), data.get('pred_y', 0),
+                      timestamp)
+
+
+def decode_frame(buf):
+    (magic, version, flags, seq, hand, x, y, raw_x, raw_y, pred_x, pred_y,
+     timestamp) = FRAME.unpack(buf)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError("not a tracking frame")
+    data = {'x': x, 'y': y, 'pinch': bool(flags & FLAG_PINCH), 'seq': seq,
+            't': timestamp}
+    if hand >= 0:
+        data['hand'] = hand
+    if flags & FLAG_PREDICTION:
+        data.update(raw_x=raw_x, raw_y=raw_y, pred_x=pred_x, pred_y=pred_y)
+    return data
+
+
+class HttpTransport:
+    def __init__(self, url, timeout=0.25):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, data):
+        self.session.post(self.url, json=data, timeout=self.timeout)
+
+    def close(self):
+        self.session.close()
+
+
+class UdpTransport:
+    def __init__(self, host, port):
+        self.address = (host, port)
+        self.seq = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.connect(self.address)
+
+    def send(self, data):
+        self.seq += 1
+        self.sock.send(encode_frame(data, self.seq))
+
+    def close(self):
+        self.sock.close()
+
+
+class UnixSocketTransport:
+    def __init__(self, path, timeout=0.25):
+        self.path = path
+        self.timeout = timeout
+        self.seq = 0
+        self.sock = None
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self.sock = sock
+
+    def send(self, data):
+        self.seq += 1
+        if self.sock is None:
+            self._connect()
+        try:
+            self.sock.sendall(encode_frame(data, self.seq))
+        except OSError:
+            # Reconnect on the next message if the receiver went away.
+            self.close()
+            raise
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+def make_transport(url, timeout=0.25):
+    parsed = urlparse(url)
+    if parsed.scheme in ('http', 'https'):
+        return HttpTransport(url, timeout)
+    if parsed.scheme == 'udp':
+        return UdpTransport(parsed.hostname, parsed.port)
+    if parsed.scheme == 'unix':
+        return UnixSocketTransport(parsed.path, timeout)
+    raise ValueError("unsupported transport: %s" % url)
@@ -0,0 +1,73 @@
+import socket
+import time
+import unittest
+
+from hand_tracking.hand_tracking_lib.receiver import Receiver
+from hand_tracking.hand_tracking_lib.transport import (FRAME, UdpTransport,
+                                                       decode_frame,
+                                                       encode_frame,
+                                                       make_transport)
+
+
+class TestTransport(unittest.TestCase):
+    def test_frame_round_trip(self):
+        buf = encode_frame({'x': 320, 'y': 240, 'pinch': True}, seq=7,
+                           timestamp=1.5)
+        self.assertEqual(len(buf), FRAME.size)
+        self.assertEqual(decode_frame(buf), {'x': 320, 'y': 240,
+                                             'pinch': True, 'seq': 7,
+                                             't': 1.5})
+
+    def test_frame_carries_the_hand_and_the_prediction(self):
+        data = {'x': 320, 'y': 240, 'pinch': False, 'hand': 3,
+                'raw_x': 310, 'raw_y': 236, 'pred_x': 324, 'pred_y': 242}
+        decoded = decode_frame(encode_frame(data, seq=8, timestamp=2.0))
+        self.assertEqual(decoded, dict(data, seq=8, t=2.0))
+
+    def test_older_frames_are_rejected(self):
+        buf = bytearray(encode_frame({'x': 0, 'y': 0, 'pinch': False}))
+        buf[2] = 1
+        with self.assertRaises(ValueError):
+            decode_frame(bytes(buf))
+
+    def test_make_transport_picks_backend_from_scheme(self):
+        transport = make_transport("udp://127.0.0.1:9")
+        self.assertIsInstance(transport, UdpTransport)
+        transport.close()
+        with self.assertRaises(ValueError):
+            make_transport("ftp://127.0.0.1")
+
+    def test_unix_socket_messages_reach_receiver(self):
+        url = "unix:///tmp/theraduty_unit_test.sock"
+        receiver = Receiver(url)
+        receiver.start()
+        transport = make_transport(url)
+        for i in range(10):
+            transport.send({'x': i, 'y': i, 'pinch': False})
+        end = time.monotonic() + 2
+        while receiver.count < 10 and time.monotonic() < end:
+            time.sleep(0.01)
+        transport.close()
+        receiver.stop()
+        self.assertEqual(receiver.count, 10)
+
+    def test_malformed_datagrams_do_not_stop_the_receiver(self):
+        url = "udp://127.0.0.1:8093"
+        receiver = Receiver(url)
+        receiver.start()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        good = encode_frame({'x': 1, 'y': 2, 'pinch': False})
+        for buf in (b'TD', b'XX' + good[2:], good + b'extra', good):
+            sock.sendto(buf, ('127.0.0.1', 8093))
+        end = time.monotonic() + 2
+        while receiver.count < 1 and time.monotonic() < end:
+            time.sleep(0.01)
+        sock.close()
+        receiver.stop()
+        self.assertEqual(receiver.count, 1)
+        self.assertEqual(receiver.malformed, 3)
+        self.assertEqual(receiver.get_stats()['malformed'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()